@@ -0,0 +1,205 @@
+"""
+Hyperopt indicator benchmark for `StochEMA`: recomputing every indicator each epoch (the previous
+`populate_indicators`) against computing every candidate once per pair and selecting its series each epoch.
+
+Epochs run as in hyperopt: the strategy is loaded by path, each pair's dataframe is dumped to a file once (after
+`populate_indicators` for the precomputed path), and every epoch is sent to a joblib `Parallel` worker as a
+cloudpickled bound method, along with the strategy, then loads the dataframes. Workers build the candidates the
+first time they need them, which is timed with their epochs. Each epoch draws random parameters
+from the search space, and the selected series and entry signals are checked to be bit-identical between both paths.
+
+Usage (from `freqtrade/`, with freqtrade and TA-Lib installed, e.g. in the freqtrade image):
+
+    python -m benchmarks.hyperopt_indicators --pairs 4 --candles 4320 --epochs 200 --jobs 2
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cloudpickle
+import freqtrade.vendor.qtpylib.indicators as qtpylib
+import numpy as np
+import pandas as pd
+import talib.abstract as ta
+from freqtrade.enums import HyperoptState
+from freqtrade.optimize.hyperopt_tools import HyperoptStateContainer
+from freqtrade.strategy import IStrategy
+from joblib import Parallel, delayed, dump, load, wrap_non_picklable_objects
+from pandas import DataFrame
+
+STRATEGIES = Path(__file__).parent.parent / "strategies"
+
+PARAMETERS = ("ema_fast", "ema_mid", "ema_slow", "stoch_k", "stoch_d", "rsi_length", "stoch_length")
+COLUMNS = ("ema_fast", "ema_mid", "ema_slow", "rsi", "srsi_k", "srsi_d", "enter_long")
+
+
+def candles(count: int, seed: int) -> DataFrame:
+    """
+    A random walk of hourly candles.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    spread = np.abs(rng.normal(0, 0.005, count)) * close
+    return DataFrame(
+        {
+            "date": pd.date_range("2024-01-01", periods=count, freq="1h", tz="UTC"),
+            "open": np.roll(close, 1),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.uniform(1000, 5000, count),
+        }
+    )
+
+
+def legacy_indicators(dataframe: DataFrame, params: dict) -> DataFrame:
+    """
+    `StochEMA.populate_indicators` and `populate_entry_trend` before precomputation, recomputed every epoch, with
+    StochRSI as the original pandas formula.
+    """
+    dataframe["ema_fast"] = ta.EMA(dataframe, timeperiod=params["ema_fast"])
+    dataframe["ema_mid"] = ta.EMA(dataframe, timeperiod=params["ema_mid"])
+    dataframe["ema_slow"] = ta.EMA(dataframe, timeperiod=params["ema_slow"])
+
+    dataframe["rsi"] = ta.RSI(dataframe, timeperiod=params["rsi_length"])
+
+    # StochRSI - https://github.com/freqtrade/freqtrade/issues/2961
+    period = params["stoch_length"]
+    rsi = dataframe["rsi"]
+    stochrsi = (rsi - rsi.rolling(period).min()) / (rsi.rolling(period).max() - rsi.rolling(period).min())
+    dataframe["srsi_k"] = stochrsi.rolling(params["stoch_k"]).mean() * 100
+    dataframe["srsi_d"] = dataframe["srsi_k"].rolling(params["stoch_d"]).mean()
+
+    dataframe.loc[
+        (
+            (dataframe["ema_fast"] > dataframe["ema_mid"])
+            & (dataframe["ema_mid"] > dataframe["ema_slow"])
+            & qtpylib.crossed_above(dataframe["srsi_k"], dataframe["srsi_d"])
+        ),
+        "enter_long",
+    ] = 1
+
+    return dataframe
+
+
+def digest(dataframe: DataFrame) -> list[bytes]:
+    return [hashlib.sha256(dataframe[column].to_numpy(dtype=np.float64).tobytes()).digest() for column in COLUMNS]
+
+
+def load_strategy() -> type[IStrategy]:
+    """
+    Load `StochEMA` by path as freqtrade's resolver does, so it's pickled by value rather than by name, as in hyperopt.
+    """
+    spec = importlib.util.spec_from_file_location("stoch_ema", STRATEGIES / "stoch_ema.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.StochEMA
+
+
+class Optimizer:
+    """
+    Runs epochs as hyperopt's `HyperOptimizer` does: pickled along with the strategy for every epoch sent to a
+    worker, which loads every pair's dataframe from `data_file`.
+
+    Args:
+        strategy (IStrategy): The strategy, as it's left by hyperopt's indicator phase for the precomputed path.
+        data_file (Path): Every pair's dataframe, as dumped by the main process.
+        legacy (bool): Recompute every indicator each epoch, rather than selecting candidates.
+    """
+
+    def __init__(self, strategy: IStrategy, data_file: Path, legacy: bool):
+        self.strategy = strategy
+        self.data_file = data_file
+        self.legacy = legacy
+
+    @delayed
+    @wrap_non_picklable_objects
+    def epoch_wrapped(self, params: dict) -> dict[str, list[bytes]]:
+        return self.epoch(params)
+
+    def epoch(self, params: dict) -> dict[str, list[bytes]]:
+        """
+        Returns:
+            dict[str, list[bytes]]: A digest of each pair's selected series and entry signals.
+        """
+        HyperoptStateContainer.set_state(HyperoptState.OPTIMIZE)
+        for name, value in params.items():
+            getattr(self.strategy, name).value = value
+        with self.data_file.open("rb") as f:
+            data = load(f)
+
+        if self.legacy:
+            return {pair: digest(legacy_indicators(df, params)) for pair, df in data.items()}
+        return {pair: digest(self.strategy.populate_entry_trend(df, {"pair": pair})) for pair, df in data.items()}
+
+
+def run(optimizer: Optimizer, epochs: list[dict], jobs: int) -> tuple[float, list[dict[str, list[bytes]]]]:
+    with Parallel(n_jobs=jobs) as parallel:
+        # Workers are started once for a whole hyperopt run, so aren't timed
+        parallel(delayed(abs)(i) for i in range(jobs))
+        start = time.perf_counter()
+        results = parallel(optimizer.epoch_wrapped(params) for params in epochs)
+        return time.perf_counter() - start, results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=4)
+    parser.add_argument("--candles", type=int, default=4320, help="Per pair, 4320 is 180 days of 1h candles")
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=2, help="Worker processes, as hyperopt's --job-workers")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    data = {f"PAIR{i}/USDT": candles(args.candles, args.seed + i) for i in range(args.pairs)}
+    strategy_class = load_strategy()
+    strategy = strategy_class({})
+    parameters = {name: getattr(strategy, name) for name in PARAMETERS}
+    rng = random.Random(args.seed)
+    epochs = [{name: rng.randint(p.low, p.high) for name, p in parameters.items()} for _ in range(args.epochs)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        data_file = Path(directory) / "data.pkl"
+        dump(data, data_file)
+        legacy_s, legacy = run(Optimizer(strategy_class({}), data_file, legacy=True), epochs, args.jobs)
+
+        # As in hyperopt, indicators are computed once for the whole search space, then each epoch sets values
+        for parameter in parameters.values():
+            parameter.in_space = True
+        HyperoptStateContainer.set_state(HyperoptState.INDICATORS)
+        precomputed = {pair: strategy.populate_indicators(df.copy(), {"pair": pair}) for pair, df in data.items()}
+        HyperoptStateContainer.set_state(HyperoptState.OPTIMIZE)
+        dump(precomputed, data_file)
+
+        optimizer = Optimizer(strategy, data_file, legacy=False)
+        cached_s, cached = run(optimizer, epochs, args.jobs)
+        pickled = len(cloudpickle.dumps(optimizer))
+        space = strategy.search_space()
+        candidates = len(cloudpickle.dumps({pair: strategy.candidate_matrix(df, **space) for pair, df in data.items()}))
+
+    mismatches = sum(
+        a != b
+        for legacy_epoch, cached_epoch in zip(legacy, cached, strict=True)
+        for pair in data
+        for a, b in zip(legacy_epoch[pair], cached_epoch[pair], strict=True)
+    )
+    print(f"{args.epochs} epochs, {args.pairs} pairs of {args.candles} candles, {args.jobs} workers")
+    print(f"  recomputed: {legacy_s:8.2f}s  ({legacy_s / args.epochs * 1000:7.2f}ms per epoch)")
+    print(f"precomputed: {cached_s:8.2f}s  ({cached_s / args.epochs * 1000:7.2f}ms per epoch)")
+    print(f"    speedup: {legacy_s / cached_s:8.2f}x")
+    print(
+        f"pickled per epoch: {pickled / 1024:.0f}KB, candidates built in the workers: {candidates / 1024 / 1024:.1f}MB"
+    )
+    print(f"mismatched columns: {mismatches}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
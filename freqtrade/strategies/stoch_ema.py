@@ -1,11 +1,25 @@
 import logging
+import sys
+from pathlib import Path
+from typing import Iterable
 
 import freqtrade.vendor.qtpylib.indicators as qtpylib
 import pandas as pd
 import talib.abstract as ta
+from freqtrade.enums import HyperoptState
+from freqtrade.optimize.hyperopt_tools import HyperoptStateContainer
 from freqtrade.strategy import IntParameter, IStrategy
 from pandas import DataFrame
 
+# Freqtrade only adds the strategy directory to the path while loading strategies, hyperopt workers need it too. Only
+# added once, freqtrade loads the module again each time it resolves a strategy. Its modules are prefixed with the
+# strategy's name, so they're never confused with another strategy's or package's.
+_STRATEGY_DIR = str(Path(__file__).parent)
+if _STRATEGY_DIR not in sys.path:
+    sys.path.append(_STRATEGY_DIR)
+from stoch_ema_candidates import CandidateMatrix, memoised  # noqa: E402
+from stoch_ema_indicators import smooth, stochastic  # noqa: E402
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,35 +50,130 @@ class StochEMA(IStrategy):
 
     stoploss = -0.40
 
+    def __init__(self, config: dict) -> None:
+        super().__init__(config)
+        self.candidates: dict[str, CandidateMatrix] = {}
+
+    def __getstate__(self) -> dict:
+        # Hyperopt pickles the strategy for every epoch it sends to a worker, which builds its own candidates instead
+        # (see `select_indicators`) rather than receiving every pair's matrix each time
+        state = self.__dict__.copy()
+        state["candidates"] = {}
+        return state
+
     def informative_pairs(self):
         pairs = self.dp.current_whitelist()
         informative_pairs = [(pair, self.informative_timeframe) for pair in pairs]
         return informative_pairs
 
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
-        dataframe["ema_fast"] = ta.EMA(dataframe, timeperiod=self.ema_fast.value)
-        dataframe["ema_mid"] = ta.EMA(dataframe, timeperiod=self.ema_mid.value)
-        dataframe["ema_slow"] = ta.EMA(dataframe, timeperiod=self.ema_slow.value)
+        """
+        Computes every candidate series once per pair, following freqtrade's `.range` pattern, so each hyperopt
+        epoch only selects series in `populate_entry_trend` rather than recomputing indicators. Outside of hyperopt,
+        `.range` only holds each parameter's value and just the series in use are computed.
+
+        Candidates are kept in a matrix per pair rather than as dataframe columns, as freqtrade copies the dataframe
+        every epoch and a few hundred extra columns would cost more to copy than the indicators do to compute.
+
+        In hyperopt's indicator phase nothing is computed: the matrices would be left out of every epoch sent to a
+        worker (see `__getstate__`), which builds its own on first use instead, see `select_indicators`.
+        """
+        if HyperoptStateContainer.state == HyperoptState.INDICATORS:
+            return dataframe
+
+        self.candidates[metadata["pair"]] = self.candidate_matrix(
+            dataframe,
+            ema_periods=set(self.ema_fast.range) | set(self.ema_mid.range) | set(self.ema_slow.range),
+            rsi_lengths=self.rsi_length.range,
+            stoch_lengths=self.stoch_length.range,
+        )
+
+        return dataframe
+
+    def search_space(self) -> dict[str, tuple[int, ...]]:
+        """
+        Every value of each parameter being optimized, as `.range` is during hyperopt's indicator phase, but also
+        while optimizing, when `.range` is just the current value.
+        """
+
+        def values(parameter: IntParameter) -> tuple[int, ...]:
+            if parameter.in_space and parameter.optimize:
+                return tuple(range(parameter.low, parameter.high + 1))
+            return (parameter.value,)
+
+        return {
+            "ema_periods": tuple(
+                sorted(set(values(self.ema_fast)) | set(values(self.ema_mid)) | set(values(self.ema_slow)))
+            ),
+            "rsi_lengths": values(self.rsi_length),
+            "stoch_lengths": values(self.stoch_length),
+        }
+
+    @staticmethod
+    def candidate_matrix(
+        dataframe: DataFrame, ema_periods: Iterable[int], rsi_lengths: Iterable[int], stoch_lengths: Iterable[int]
+    ) -> "CandidateMatrix":
+        series = {("ema", period): ta.EMA(dataframe, timeperiod=period) for period in sorted(ema_periods)}
 
         # StochRSI - https://github.com/freqtrade/freqtrade/issues/2961
-        dataframe["rsi"] = ta.RSI(dataframe, timeperiod=self.rsi_length.value)
-        period = self.stoch_length.value
-        smooth_d = self.stoch_d.value
-        smooth_k = self.stoch_k.value
-        stochrsi = (dataframe["rsi"] - dataframe["rsi"].rolling(period).min()) / (
-            dataframe["rsi"].rolling(period).max() - dataframe["rsi"].rolling(period).min()
+        for rsi_length in rsi_lengths:
+            rsi = ta.RSI(dataframe, timeperiod=rsi_length)
+            series[("rsi", rsi_length)] = rsi
+            for period in stoch_lengths:
+                series[("stochrsi", rsi_length, period)] = stochastic(rsi.to_numpy(), period)
+
+        return CandidateMatrix(dataframe["date"].values, series)
+
+    def select_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        """
+        Select the precomputed series for the current parameter values, see `populate_indicators`. Should the pair
+        have no candidates covering `dataframe`, e.g. during hyperopt (see `populate_indicators`), every candidate in
+        the search space is computed from `dataframe` once per process and memoised for later epochs.
+        """
+        dates = dataframe["date"].values
+        candidates = self.candidates.get(metadata["pair"])
+        offset = candidates.offset(dates) if candidates is not None else None
+        if offset is None:
+            space = self.search_space()
+            candidates, offset = (
+                memoised(
+                    (type(self).__name__, metadata["pair"], *space.values()),
+                    dates,
+                    lambda: self.candidate_matrix(dataframe, **space),
+                ),
+                0,
+            )
+
+        rows = slice(offset, offset + len(dataframe))
+        # Smoothing is cheap next to the rolling extrema, so it's computed per epoch to keep the matrix small. Over the
+        # whole series rather than `rows`, so values match the full history's.
+        srsi_k, srsi_d = smooth(
+            candidates[("stochrsi", self.rsi_length.value, self.stoch_length.value)],
+            self.stoch_k.value,
+            self.stoch_d.value,
+        )
+        selected = DataFrame(
+            {
+                "ema_fast": candidates[("ema", self.ema_fast.value)][rows],
+                "ema_mid": candidates[("ema", self.ema_mid.value)][rows],
+                "ema_slow": candidates[("ema", self.ema_slow.value)][rows],
+                "rsi": candidates[("rsi", self.rsi_length.value)][rows],
+                "srsi_k": srsi_k[rows],
+                "srsi_d": srsi_d[rows],
+            },
+            index=dataframe.index,
         )
-        dataframe["srsi_k"] = stochrsi.rolling(smooth_k).mean() * 100
-        dataframe["srsi_d"] = dataframe["srsi_k"].rolling(smooth_d).mean()
 
-        return dataframe
+        # Added at once, inserting columns one at a time costs more than selecting them
+        return pd.concat([dataframe.drop(columns=selected.columns, errors="ignore"), selected], axis=1)
 
     def populate_entry_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        dataframe = self.select_indicators(dataframe, metadata)
         dataframe.loc[
             (
                 (dataframe["ema_fast"] > dataframe["ema_mid"])
                 & (dataframe["ema_mid"] > dataframe["ema_slow"])
-                & qtpylib.crossed_above(dataframe["srsi_k"], dataframe["srsi_d"]),
+                & qtpylib.crossed_above(dataframe["srsi_k"], dataframe["srsi_d"])
             ),
             "enter_long",
         ] = 1
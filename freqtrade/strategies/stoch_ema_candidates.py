@@ -0,0 +1,69 @@
+"""
+`StochEMA`'s candidate indicator series, precomputed for hyperopt, see `StochEMA.populate_indicators`.
+
+Kept apart from the strategies, as freqtrade loads strategy modules by path and hyperopt pickles their classes by
+value for every epoch, while this module is imported by name in hyperopt's worker processes. Its memo therefore lasts
+as long as a worker does, see `memoised`.
+"""
+
+from typing import Callable, Hashable
+
+import numpy as np
+import pandas as pd
+
+
+class CandidateMatrix:
+    """
+    Every candidate series of a pair's indicators, as one float matrix with a row per series.
+
+    Args:
+        dates (np.ndarray): The candle dates the series are aligned to.
+        series (dict[tuple, pd.Series | np.ndarray]): Each series, keyed by indicator name and period(s), e.g. `("ema", 12)`.
+    """
+
+    def __init__(self, dates: np.ndarray, series: dict[tuple, pd.Series | np.ndarray]):
+        self.dates = dates
+        self.rows = {key: row for row, key in enumerate(series)}
+        self.values = np.vstack([np.asarray(s, dtype=np.float64) for s in series.values()])
+
+    def __getitem__(self, key: tuple) -> np.ndarray:
+        return self.values[self.rows[key]]
+
+    def offset(self, dates: np.ndarray) -> int | None:
+        """
+        Returns:
+            int | None: Where `dates` start in the matrix, or None if they aren't a contiguous part of it.
+        """
+        if not len(dates):
+            return None
+        offset = int(self.dates.searchsorted(dates[0]))
+        end = offset + len(dates) - 1
+        if end >= len(self.dates) or self.dates[offset] != dates[0] or self.dates[end] != dates[-1]:
+            return None
+
+        return offset
+
+
+# Matrices built by this process, by key and the date range they were built over
+_memo: dict[Hashable, tuple[tuple, CandidateMatrix]] = {}
+
+
+def memoised(key: Hashable, dates: np.ndarray, build: Callable[[], CandidateMatrix]) -> CandidateMatrix:
+    """
+    The matrix built for `key` (e.g. a strategy, pair and search space) over `dates`, calling `build` the first time.
+    Only the latest date range is kept for each key, e.g. as live candles arrive.
+
+    Args:
+        key (Hashable): What the matrix was built for.
+        dates (np.ndarray): The candle dates it's built over.
+        build (Callable[[], CandidateMatrix]): Builds the matrix over `dates`.
+
+    Returns:
+        CandidateMatrix: The memoised matrix.
+    """
+    span = (dates[0], dates[-1], len(dates)) if len(dates) else ()
+    cached = _memo.get(key)
+    if cached is None or cached[0] != span:
+        cached = _memo[key] = (span, build())
+
+    return cached[1]
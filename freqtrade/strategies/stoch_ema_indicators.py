@@ -0,0 +1,75 @@
+"""
+`StochEMA`'s StochRSI indicators, as NumPy kernels over plain arrays.
+
+Rolling extrema use bottleneck's `move_min`/`move_max`, a single pass over a monotonic deque (O(n) regardless of the
+window), matching pandas' `rolling(window)` NaN handling: a window holding any NaN, or fewer than `window` values, is
+NaN. Rolling means are pandas' own, so results are bit-identical to the pandas formulation.
+"""
+
+import bottleneck as bn
+import numpy as np
+import pandas as pd
+
+
+def stochastic(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Where each value sits within the range of its trailing `period` values, e.g. StochRSI when `values` is RSI.
+
+    Args:
+        values (np.ndarray): The series, e.g. RSI.
+        period (int): Length of the trailing window.
+
+    Returns:
+        np.ndarray: Between 0 and 1, NaN where the window is incomplete or flat.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    low = bn.move_min(values, period, min_count=period)
+    spread = bn.move_max(values, period, min_count=period)
+    # Reuse both buffers rather than allocating intermediates: spread = high - low, low = (values - low) / spread
+    np.subtract(spread, low, out=spread)
+    np.subtract(values, low, out=low)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(low, spread, out=low)
+
+    return low
+
+
+def smooth(stoch: np.ndarray, k: int, d: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    %K and %D lines of a stochastic oscillator.
+
+    Args:
+        stoch (np.ndarray): The raw stochastic, between 0 and 1, see `stochastic`.
+        k (int): Smoothing of %K, the stochastic's moving average.
+        d (int): Smoothing of %D, %K's moving average.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: %K and %D, between 0 and 100.
+    """
+    # pandas' rolling mean rather than bottleneck's `move_mean`, which sums in a different order, and a last bit of
+    # difference moves K & D crossovers (e.g. where both are flat at 100) to other candles than the pandas formula's
+    srsi_k = pd.Series(stoch).rolling(k).mean() * 100
+
+    return srsi_k.to_numpy(), srsi_k.rolling(d).mean().to_numpy()
+
+
+def stoch_rsi(rsi: np.ndarray, period: int, k: int, d: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    StochRSI %K and %D, see https://github.com/freqtrade/freqtrade/issues/2961.
+
+    Bit-identical to the pandas formulation, without its repeated rolling extrema:
+
+        stochrsi = (rsi - rsi.rolling(period).min()) / (rsi.rolling(period).max() - rsi.rolling(period).min())
+        srsi_k = stochrsi.rolling(k).mean() * 100
+        srsi_d = srsi_k.rolling(d).mean()
+
+    Args:
+        rsi (np.ndarray): RSI values.
+        period (int): Stochastic window.
+        k (int): Smoothing of %K.
+        d (int): Smoothing of %D.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: %K and %D, between 0 and 100.
+    """
+    return smooth(stochastic(rsi, period), k, d)
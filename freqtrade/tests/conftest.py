@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Strategies are loaded by path rather than as a package, import them the same way
+sys.path.append(str(Path(__file__).parent.parent / "strategies"))
@@ -0,0 +1,157 @@
+import cloudpickle
+import freqtrade.vendor.qtpylib.indicators as qtpylib
+import numpy as np
+import pandas as pd
+import pytest
+import talib.abstract as ta
+from freqtrade.enums import HyperoptState
+from freqtrade.optimize.hyperopt_tools import HyperoptStateContainer
+
+import stoch_ema_candidates
+from stoch_ema import StochEMA
+
+PARAMETERS = ["ema_fast", "ema_mid", "ema_slow", "stoch_k", "stoch_d", "rsi_length", "stoch_length"]
+COLUMNS = ["ema_fast", "ema_mid", "ema_slow", "rsi", "srsi_k", "srsi_d", "enter_long"]
+
+
+def candles(count: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    return pd.DataFrame(
+        {
+            "date": pd.date_range("2024-01-01", periods=count, freq="1h", tz="UTC"),
+            "open": close,
+            "high": close * 1.005,
+            "low": close * 0.995,
+            "close": close,
+            "volume": 1000.0,
+        }
+    )
+
+
+def pandas_indicators(dataframe: pd.DataFrame, params: dict) -> pd.DataFrame:
+    """
+    `StochEMA`'s indicators and entries before precomputation, with StochRSI as the original pandas formula.
+    """
+    dataframe["ema_fast"] = ta.EMA(dataframe, timeperiod=params["ema_fast"])
+    dataframe["ema_mid"] = ta.EMA(dataframe, timeperiod=params["ema_mid"])
+    dataframe["ema_slow"] = ta.EMA(dataframe, timeperiod=params["ema_slow"])
+
+    dataframe["rsi"] = ta.RSI(dataframe, timeperiod=params["rsi_length"])
+    period = params["stoch_length"]
+    stochrsi = (dataframe["rsi"] - dataframe["rsi"].rolling(period).min()) / (
+        dataframe["rsi"].rolling(period).max() - dataframe["rsi"].rolling(period).min()
+    )
+    dataframe["srsi_k"] = stochrsi.rolling(params["stoch_k"]).mean() * 100
+    dataframe["srsi_d"] = dataframe["srsi_k"].rolling(params["stoch_d"]).mean()
+
+    dataframe.loc[
+        (
+            (dataframe["ema_fast"] > dataframe["ema_mid"])
+            & (dataframe["ema_mid"] > dataframe["ema_slow"])
+            & qtpylib.crossed_above(dataframe["srsi_k"], dataframe["srsi_d"])
+        ),
+        "enter_long",
+    ] = 1
+
+    return dataframe
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {
+            "ema_fast": 12,
+            "ema_mid": 25,
+            "ema_slow": 32,
+            "stoch_k": 7,
+            "stoch_d": 3,
+            "rsi_length": 9,
+            "stoch_length": 14,
+        },
+        {"ema_fast": 7, "ema_mid": 15, "ema_slow": 26, "stoch_k": 3, "stoch_d": 3, "rsi_length": 14, "stoch_length": 9},
+        {
+            "ema_fast": 15,
+            "ema_mid": 26,
+            "ema_slow": 36,
+            "stoch_k": 9,
+            "stoch_d": 9,
+            "rsi_length": 11,
+            "stoch_length": 12,
+        },
+    ],
+)
+def test_precomputed_candidates_match_pandas_indicators(monkeypatch: pytest.MonkeyPatch, params: dict):
+    data = candles(2000)
+    strategy = StochEMA({})
+    for name in PARAMETERS:
+        monkeypatch.setattr(getattr(strategy, name), "in_space", True)
+    HyperoptStateContainer.set_state(HyperoptState.INDICATORS)
+    try:
+        precomputed = strategy.populate_indicators(data.copy(), {"pair": "SOL/USDT"})
+    finally:
+        HyperoptStateContainer.set_state(HyperoptState.OPTIMIZE)
+
+    for name, value in params.items():
+        monkeypatch.setattr(getattr(strategy, name), "value", value)
+    selected = strategy.populate_entry_trend(precomputed.copy(), {"pair": "SOL/USDT"})
+    recomputed = pandas_indicators(data.copy(), params)
+
+    pd.testing.assert_frame_equal(selected[COLUMNS], recomputed[COLUMNS], check_exact=True)
+    assert selected["enter_long"].sum() > 0
+
+
+def test_precomputed_candidates_match_computing_in_place():
+    data = candles(600)
+    strategy = StochEMA({})
+    computed = strategy.populate_entry_trend(data.copy(), {"pair": "BTC/USDT"})
+
+    # As in hyperopt, candidates for the whole search space then an epoch's values
+    for name in PARAMETERS:
+        getattr(strategy, name).in_space = True
+    HyperoptStateContainer.set_state(HyperoptState.INDICATORS)
+    try:
+        strategy.populate_indicators(data.copy(), {"pair": "BTC/USDT"})
+    finally:
+        HyperoptStateContainer.set_state(HyperoptState.OPTIMIZE)
+
+    selected = strategy.populate_entry_trend(data.copy(), {"pair": "BTC/USDT"})
+    pd.testing.assert_frame_equal(selected[COLUMNS], computed[COLUMNS], check_exact=True)
+    assert selected["enter_long"].sum() > 0
+
+    # Outside of hyperopt, a later window of the same candles is aligned to the series populated over all of them
+    strategy.populate_indicators(data.copy(), {"pair": "BTC/USDT"})
+    trimmed = strategy.populate_entry_trend(data.iloc[200:].copy(), {"pair": "BTC/USDT"})
+    pd.testing.assert_frame_equal(trimmed[COLUMNS], selected[COLUMNS].iloc[200:], check_exact=True)
+
+
+def test_hyperopt_workers_build_candidates_once(monkeypatch: pytest.MonkeyPatch):
+    data = candles(600)
+    strategy = StochEMA({})
+    for name in PARAMETERS:
+        monkeypatch.setattr(getattr(strategy, name), "in_space", True)
+    monkeypatch.setattr(stoch_ema_candidates, "_memo", {})
+    built = []
+    candidate_matrix = StochEMA.candidate_matrix
+
+    def counted(*args, **kwargs):
+        built.append(kwargs)
+        return candidate_matrix(*args, **kwargs)
+
+    monkeypatch.setattr(StochEMA, "candidate_matrix", staticmethod(counted))
+    HyperoptStateContainer.set_state(HyperoptState.INDICATORS)
+    try:
+        populated = strategy.populate_indicators(data.copy(), {"pair": "ETH/USDT"})
+    finally:
+        HyperoptStateContainer.set_state(HyperoptState.OPTIMIZE)
+    # Left to the workers, which wouldn't receive them
+    assert built == [] and strategy.candidates == {}
+
+    expected = pandas_indicators(data.copy(), {name: getattr(strategy, name).value for name in PARAMETERS})
+    # Hyperopt sends the strategy to a worker for every epoch
+    for _ in range(3):
+        worker = cloudpickle.loads(cloudpickle.dumps(strategy))
+        selected = worker.populate_entry_trend(populated.copy(), {"pair": "ETH/USDT"})
+        pd.testing.assert_frame_equal(selected[COLUMNS], expected[COLUMNS], check_exact=True)
+
+    assert len(built) == 1
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+import talib
+
+from stoch_ema_indicators import stoch_rsi, stochastic
+
+
+def pandas_stoch_rsi(rsi: pd.Series, period: int, k: int, d: int) -> tuple[pd.Series, pd.Series, pd.Series]:
+    stochrsi = (rsi - rsi.rolling(period).min()) / (rsi.rolling(period).max() - rsi.rolling(period).min())
+    srsi_k = stochrsi.rolling(k).mean() * 100
+    return stochrsi, srsi_k, srsi_k.rolling(d).mean()
+
+
+def rsi(count: int, length: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return talib.RSI(100 * np.exp(np.cumsum(rng.normal(0, 0.01, count))), timeperiod=length)
+
+
+@pytest.mark.parametrize("length,period,k,d", [(9, 14, 7, 3), (14, 9, 3, 9), (11, 12, 5, 5), (9, 1, 1, 1)])
+def test_matches_pandas(length, period, k, d):
+    values = rsi(2000, length)
+    expected_stoch, expected_k, expected_d = pandas_stoch_rsi(pd.Series(values), period, k, d)
+
+    # The same operations on the same extrema, so exactly equal
+    assert stochastic(values, period).tobytes() == expected_stoch.to_numpy().tobytes()
+
+    srsi_k, srsi_d = stoch_rsi(values, period, k, d)
+    assert srsi_k.tobytes() == expected_k.to_numpy().tobytes()
+    assert srsi_d.tobytes() == expected_d.to_numpy().tobytes()
+
+
+def test_flat_and_missing_windows_match_pandas():
+    values = rsi(300, 9, seed=1)
+    # A flat stretch has no range, and a gap poisons every window it's in
+    values[100:130] = 50.0
+    values[200] = np.nan
+
+    _, expected_k, expected_d = pandas_stoch_rsi(pd.Series(values), 14, 3, 3)
+    srsi_k, srsi_d = stoch_rsi(values, 14, 3, 3)
+    assert np.isnan(srsi_k).any()
+    assert srsi_k.tobytes() == expected_k.to_numpy().tobytes()
+    assert srsi_d.tobytes() == expected_d.to_numpy().tobytes()
+
+
+def test_flat_k_and_d_cross_where_pandas_does():
+    values = rsi(300, 9, seed=2)
+    # A steady climb holds the stochastic at its top, so K and D both flatten at 100
+    values[100:160] = np.linspace(40.0, 90.0, 60)
+
+    _, expected_k, expected_d = pandas_stoch_rsi(pd.Series(values), 14, 3, 3)
+    srsi_k, srsi_d = stoch_rsi(values, 14, 3, 3)
+    assert (srsi_k[130:160] == srsi_d[130:160]).any()
+    assert srsi_k.tobytes() == expected_k.to_numpy().tobytes()
+    assert srsi_d.tobytes() == expected_d.to_numpy().tobytes()
+    # Crossovers compare K and D strictly, so equal values have to be equal in the same places
+    assert np.array_equal(srsi_k > srsi_d, (expected_k > expected_d).to_numpy())
+
+
+def test_does_not_modify_input():
+    values = rsi(200, 9)
+    original = values.copy()
+    stoch_rsi(values, 14, 3, 3)
+
+    assert values.tobytes() == original.tobytes()
@@ -0,0 +1,179 @@
+"""
+Throughput benchmark for the standalone server (`server.py`) against the local mock exchange.
+
+Starts the mock exchange and the server with `--workers` processes, then keeps `--concurrency` alerts in flight
+until `--alerts` have been sent, reporting alerts/sec and latency percentiles as seen by the client.
+
+Each ticker's alerts are sent in order, each `--stagger-ms` after the previous one without waiting for its response,
+so a ticker's alerts still overlap across workers. Every ticker's final mock position is then checked against its
+last alert's intended position, any divergence means alerts raced on stale account state.
+
+Usage (from `tradingview-python-connector/`):
+
+    python -m benchmarks.load --workers 4 --concurrency 64 --alerts 5000 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import aiohttp
+from eth_account import Account
+
+from benchmarks.mock_exchange import DEFAULT_UNIVERSE, MockExchange, MockExchangeServer
+from benchmarks.replay import divergence, intended_positions
+from benchmarks.run import RESULTS_DIR, SCENARIOS, alert_stream, git_commit, summarise
+
+
+async def wait_healthy(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(url + "/healthz") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+
+    raise TimeoutError("Server didn't become healthy in time")
+
+
+async def drive(url: str, alerts: list[dict], concurrency: int, stagger_ms: float) -> tuple[list[float], int, float]:
+    latencies: list[float] = []
+    errors = 0
+    in_flight = asyncio.Semaphore(concurrency)
+    lanes: dict[str, list[dict]] = {}
+    for item in alerts:
+        lanes.setdefault(item["ticker"], []).append(item)
+
+    async def send(session: aiohttp.ClientSession, item: dict):
+        nonlocal errors
+        try:
+            start = time.perf_counter()
+            async with session.post(url, data=json.dumps(item)) as response:
+                await response.read()
+                if response.status != 200:
+                    errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            in_flight.release()
+
+    async def lane(session: aiohttp.ClientSession, items: list[dict]):
+        sends = []
+        for item in items:
+            await in_flight.acquire()
+            sends.append(asyncio.create_task(send(session, item)))
+            # Long enough for the alert to reach a worker before the ticker's next one
+            await asyncio.sleep(stagger_ms / 1000)
+        await asyncio.gather(*sends)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(lane(session, items) for items in lanes.values()))
+        return latencies, errors, time.perf_counter() - start
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=SCENARIOS, default="mixed")
+    parser.add_argument("--alerts", type=int, default=2000)
+    parser.add_argument("--tickers", type=int, default=len(DEFAULT_UNIVERSE))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=64, help="Alerts kept in flight")
+    parser.add_argument("--stagger-ms", type=float, default=5.0, help="Delay between sending a ticker's alerts")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Mean mock exchange latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--rate-limit", type=int, default=0, help="Request weight per minute, the mock never throttles so 0 disables"
+    )
+    parser.add_argument("--output", help="Result path, defaults to a timestamped file in benchmarks/results/")
+    args = parser.parse_args(argv)
+
+    universe = DEFAULT_UNIVERSE[: args.tickers]
+    mock = MockExchange(universe)
+    exchange = MockExchangeServer(mock, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms).start()
+
+    Account.enable_unaudited_hdwallet_features()
+    _, mnemonic = Account.create_with_mnemonic()
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as secret:
+        secret.write(mnemonic)
+
+    env = {
+        **os.environ,
+        "HYPERLIQUID_API_URL": exchange.url,
+        "HYPERLIQUID_SECRET_FILE": secret.name,
+        "HYPERLIQUID_RATE_LIMIT": str(args.rate_limit),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "server.py", "--workers", str(args.workers), "--port", str(args.port), "--host", "127.0.0.1"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    url = f"http://127.0.0.1:{args.port}"
+    try:
+        asyncio.run(wait_healthy(url))
+        mock.calls.clear()
+        alerts = alert_stream(args.scenario, args.alerts, universe, args.seed)
+        latencies, errors, wall = asyncio.run(drive(url + "/", alerts, args.concurrency, args.stagger_ms))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+        exchange.stop()
+        os.unlink(secret.name)
+
+    calls = dict(sorted(mock.calls.items()))
+    positions = dict(sorted(mock.positions.items()))
+    diverged = divergence(intended_positions(alerts), positions, universe)
+    result = {
+        "timestamp": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "alerts": len(alerts),
+        "errors": errors,
+        "wall_s": wall,
+        "alerts_per_s": len(alerts) / wall,
+        "latency": summarise(latencies),
+        "exchange_calls": calls,
+        "calls_per_alert": sum(calls.values()) / len(alerts),
+        "positions": positions,
+        "divergence": diverged,
+    }
+
+    print(
+        f"{args.workers} workers, {args.concurrency} in flight: {len(alerts)} alerts in {wall:.2f}s, "
+        f"{result['alerts_per_s']:.1f} alerts/s, {errors} errors"
+    )
+    print(f"p50 {result['latency']['p50_ms']:.2f}ms  p99 {result['latency']['p99_ms']:.2f}ms")
+    if diverged:
+        print(f"{len(diverged)} tickers diverged from their last alert:")
+        for ticker, sizes in diverged.items():
+            print(f"{ticker:>10}: intended {sizes['intended']:g}, actual {sizes['actual']:g}")
+    else:
+        print(f"Final positions match every ticker's last alert ({len(positions)} open)")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-server.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Saved results to {output}")
+
+    return 1 if errors or diverged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
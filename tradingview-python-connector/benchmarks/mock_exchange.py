@@ -0,0 +1,193 @@
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_UNIVERSE = [
+    {"name": "BTC", "szDecimals": 5, "maxLeverage": 50, "mid": 65000.0},
+    {"name": "ETH", "szDecimals": 4, "maxLeverage": 50, "mid": 3500.0},
+    {"name": "SOL", "szDecimals": 2, "maxLeverage": 20, "mid": 150.0},
+    {"name": "AVAX", "szDecimals": 2, "maxLeverage": 10, "mid": 35.0},
+    {"name": "NEAR", "szDecimals": 1, "maxLeverage": 10, "mid": 7.0},
+    {"name": "SUI", "szDecimals": 1, "maxLeverage": 10, "mid": 1.5},
+    {"name": "APT", "szDecimals": 2, "maxLeverage": 10, "mid": 9.0},
+    {"name": "TIA", "szDecimals": 1, "maxLeverage": 10, "mid": 8.0},
+    {"name": "INJ", "szDecimals": 1, "maxLeverage": 10, "mid": 25.0},
+    {"name": "WIF", "szDecimals": 0, "maxLeverage": 5, "mid": 2.5},
+    {"name": "SEI", "szDecimals": 0, "maxLeverage": 5, "mid": 0.5},
+    {"name": "TAO", "szDecimals": 3, "maxLeverage": 5, "mid": 400.0},
+]
+
+
+class MockExchange:
+    """
+    Simulated Hyperliquid account state, answering the `/info` and `/exchange` requests the connector makes.
+
+    Positions and resting orders are tracked per coin. Limit orders fill immediately at their limit price unless
+    `rest_limit_orders` is set, IoC orders always fill and trigger orders always rest. Reduce-only orders are
+    clamped to the open position. Signatures aren't verified.
+
+    Args:
+        universe (list[dict]): Perp assets, as in `meta()["universe"]` plus a `mid` price.
+        rest_limit_orders (bool): Leave GTC limit orders resting instead of filling them.
+    """
+
+    def __init__(self, universe: list[dict] = DEFAULT_UNIVERSE, rest_limit_orders: bool = False):
+        self.universe = universe
+        self.rest_limit_orders = rest_limit_orders
+        self.positions: dict[str, float] = {}
+        self.orders: dict[int, dict] = {}
+        self.calls: Counter = Counter()
+        self._next_oid = 1
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.positions.clear()
+            self.orders.clear()
+            self.calls.clear()
+
+    def info(self, payload: dict):
+        request_type = payload["type"]
+        self.calls[f"info.{request_type}"] += 1
+        with self._lock:
+            if request_type == "meta":
+                return {"universe": [{k: v for k, v in asset.items() if k != "mid"} for asset in self.universe]}
+            if request_type == "spotMeta":
+                return {"universe": [], "tokens": []}
+            if request_type == "allMids":
+                return {asset["name"]: str(asset["mid"]) for asset in self.universe}
+            if request_type == "clearinghouseState":
+                return {
+                    "assetPositions": [
+                        {"position": {"coin": coin, "szi": str(size)}, "type": "oneWay"}
+                        for coin, size in self.positions.items()
+                    ]
+                }
+            if request_type == "openOrders":
+                return list(self.orders.values())
+
+        raise ValueError(f"Unsupported info request: {request_type}")
+
+    def exchange(self, payload: dict):
+        action = payload["action"]
+        self.calls[f"exchange.{action['type']}"] += 1
+        with self._lock:
+            if action["type"] == "order":
+                statuses = [self._order(wire) for wire in action["orders"]]
+            elif action["type"] == "cancel":
+                statuses = [self._cancel(cancel["o"]) for cancel in action["cancels"]]
+            else:
+                return {"status": "err", "response": f"Unsupported action: {action['type']}"}
+
+        return {"status": "ok", "response": {"type": action["type"], "data": {"statuses": statuses}}}
+
+    def _order(self, wire: dict) -> dict:
+        coin = self.universe[wire["a"]]["name"]
+        is_buy, size, price = wire["b"], float(wire["s"]), float(wire["p"])
+        oid = self._next_oid
+        self._next_oid += 1
+
+        if "trigger" in wire["t"] or (self.rest_limit_orders and wire["t"]["limit"]["tif"] != "Ioc"):
+            self.orders[oid] = {
+                "coin": coin,
+                "side": "B" if is_buy else "A",
+                "limitPx": wire["p"],
+                "sz": wire["s"],
+                "oid": oid,
+                "timestamp": int(time.time() * 1000),
+                "reduceOnly": wire["r"],
+            }
+            return {"resting": {"oid": oid}}
+
+        position = self.positions.get(coin, 0.0)
+        if wire["r"]:
+            # Reduce only orders can't increase or flip the position
+            if position == 0 or (position > 0) == is_buy:
+                return {"error": "Reduce only order would increase position."}
+            size = min(size, abs(position))
+
+        position += size if is_buy else -size
+        if abs(position) < 1e-12:
+            self.positions.pop(coin, None)
+        else:
+            self.positions[coin] = position
+
+        return {"filled": {"totalSz": str(size), "avgPx": str(price), "oid": oid}}
+
+    def _cancel(self, oid: int):
+        if self.orders.pop(oid, None) is None:
+            return {"error": "Order was never placed, already canceled, or filled."}
+
+        return "success"
+
+
+class MockExchangeServer:
+    """
+    Serves a `MockExchange` over HTTP on localhost, with configurable latency and jitter per request.
+
+    Args:
+        exchange (MockExchange): The simulated account state.
+        latency_ms (float): Mean latency added to every request.
+        jitter_ms (float): Maximum random deviation from `latency_ms`.
+        port (int): Port to listen on, 0 picks a free one.
+    """
+
+    def __init__(self, exchange: MockExchange, latency_ms: float = 0.0, jitter_ms: float = 0.0, port: int = 0):
+        self.exchange = exchange
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, avoid Nagle delaying the body by a delayed ACK
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                delay = server.latency_ms + random.uniform(-server.jitter_ms, server.jitter_ms)
+                if delay > 0:
+                    time.sleep(delay / 1000)
+
+                try:
+                    if self.path == "/info":
+                        response = server.exchange.info(payload)
+                    elif self.path == "/exchange":
+                        response = server.exchange.exchange(payload)
+                    else:
+                        self.send_error(404)
+                        return
+                except (KeyError, ValueError) as e:
+                    body = json.dumps({"code": 400, "msg": str(e)}).encode()
+                    self._respond(400, body)
+                    return
+
+                self._respond(200, json.dumps(response).encode())
+
+            def _respond(self, status: int, body: bytes):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "MockExchangeServer":
+        threading.Thread(target=self.httpd.serve_forever, name="mock-exchange", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,257 @@
+"""
+Replay captured alert traffic (see `HYPERLIQUID_CAPTURE`) through `main.entrypoint` and `main.batch_entrypoint`,
+against a local mock of the Hyperliquid API that keeps position and order state.
+
+Alerts are sent at the pace they arrived, `--speed` times faster, or as fast as possible with `--speed 0`. The
+report covers throughput, latency, and any ticker whose final position differs from what its last alert intended.
+
+Usage (from `tradingview-python-connector/`):
+
+    python -m benchmarks.replay alerts.cap --speed 60 --latency-ms 20
+    python -m benchmarks.replay alerts.cap --speed 0 --concurrency 16
+
+    # A synthetic capture, e.g. to try the harness without production traffic
+    python -m benchmarks.replay alerts.cap --synthesize burst --alerts 480 --interval 60
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+import msgspec
+from eth_account import Account
+
+from benchmarks.mock_exchange import DEFAULT_UNIVERSE, MockExchange, MockExchangeServer
+from benchmarks.run import RESULTS_DIR, SCENARIOS, alert_stream, git_commit, summarise
+from metrics.capture import MAGIC, CapturedAlert, encode_record, read_capture
+from order.order import normalise_ticker
+
+
+def alerts_of(captured: CapturedAlert) -> list[dict]:
+    """
+    Returns:
+        list[dict]: The alerts in a captured body, several for a batch and none if it isn't valid JSON.
+    """
+    try:
+        decoded = msgspec.json.decode(captured.body)
+    except msgspec.DecodeError:
+        return []
+
+    items = decoded if isinstance(decoded, list) else [decoded]
+    return [item for item in items if isinstance(item, dict) and "USD" in str(item.get("ticker", ""))]
+
+
+def universe_for(captured: list[CapturedAlert]) -> list[dict]:
+    """
+    Mock assets for every ticker in the capture, priced at its last alert. Size decimals are taken from the
+    default universe, or estimated from the price for other assets.
+    """
+    known = {asset["name"]: asset for asset in DEFAULT_UNIVERSE}
+    prices: dict[str, float] = {}
+    for item in (item for alert in captured for item in alerts_of(alert)):
+        prices[normalise_ticker(item["ticker"])] = float(item.get("price") or 1.0)
+
+    universe = []
+    for name, price in sorted(prices.items()):
+        decimals = known[name]["szDecimals"] if name in known else max(0, min(5, len(str(int(price))) - 1))
+        universe.append({"name": name, "szDecimals": decimals, "maxLeverage": 10, "mid": price})
+
+    return universe
+
+
+def intended_positions(alerts: list[dict]) -> dict[str, float]:
+    """
+    Returns:
+        dict[str, float]: The signed position size each ticker's last alert leaves the strategy in.
+    """
+    positions: dict[str, float] = {}
+    for item in alerts:
+        sign = {"long": 1.0, "short": -1.0}.get(item.get("position"), 0.0)
+        positions[normalise_ticker(item["ticker"])] = sign * abs(float(item.get("position_size") or 0.0))
+
+    return positions
+
+
+def divergence(intended: dict[str, float], actual: dict[str, float], universe: list[dict]) -> dict[str, dict]:
+    """
+    Returns:
+        dict[str, dict]: Tickers whose final position differs from the intended one by more than rounding, i.e.
+            by more than one lot and 1%.
+    """
+    lots = {asset["name"]: 10 ** -asset["szDecimals"] for asset in universe}
+    diverged = {}
+    for ticker in sorted(set(intended) | set(actual)):
+        expected, position = intended.get(ticker, 0.0), actual.get(ticker, 0.0)
+        if abs(expected - position) > max(lots.get(ticker, 0.0), abs(expected) * 0.01) + 1e-9:
+            diverged[ticker] = {"intended": expected, "actual": position}
+
+    return diverged
+
+
+def synthesize(path: str, scenario: str, count: int, interval: float, tickers: int, seed: int):
+    """
+    Write a capture of a synthetic alert stream, see `benchmarks.run.alert_stream`. Burst alerts arrive one per
+    ticker at the same instant every `interval` seconds, others one every `interval` seconds.
+    """
+    universe = DEFAULT_UNIVERSE[:tickers]
+    alerts = alert_stream(scenario, count, universe, seed)
+    start = time.time()
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        for index, item in enumerate(alerts):
+            step = index // len(universe) if scenario == "burst" else index
+            arrived = start + step * interval
+            f.write(encode_record(CapturedAlert(arrived, "entrypoint", json.dumps(item).encode())))
+
+
+def run(args: argparse.Namespace) -> dict:
+    captured = list(read_capture(args.capture))
+    if not captured:
+        raise ValueError(f"{args.capture} holds no alerts")
+
+    universe = universe_for(captured)
+    mock = MockExchange(universe)
+    server = MockExchangeServer(mock, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms).start()
+
+    Account.enable_unaudited_hdwallet_features()
+    _, mnemonic = Account.create_with_mnemonic()
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as secret:
+        secret.write(mnemonic)
+
+    # `main` reads its configuration at import time. The replay mustn't be captured again, or reach real accounts.
+    os.environ["HYPERLIQUID_API_URL"] = server.url
+    os.environ["HYPERLIQUID_SECRET_FILE"] = secret.name
+    os.environ["HYPERLIQUID_RATE_LIMIT"] = str(args.rate_limit)
+    os.environ.pop("HYPERLIQUID_CAPTURE", None)
+    os.environ.pop("HYPERLIQUID_TARGETS", None)
+    import main
+    from flask import Flask
+
+    logging.getLogger().setLevel(args.log_level)
+    app = Flask(__name__)
+    # Warm up the client, a cold start isn't what's being measured
+    main.registry.get(main.SECRET_FILE, main.INSTANCE_URL).metadata.universe()
+    mock.calls.clear()
+
+    def send(alert: CapturedAlert, due: float, previous: list[Future]) -> tuple[float, float, int]:
+        # Earlier alerts for its tickers were submitted first, so they're already running or ahead in the queue
+        wait(previous)
+        started = time.perf_counter()
+        function = main.batch_entrypoint if "batch" in alert.endpoint else main.entrypoint
+        with app.test_request_context("/", method="POST", data=alert.body, content_type="application/json") as ctx:
+            response = function(ctx.request)
+
+        status = response[1] if isinstance(response, tuple) else 200
+        return (time.perf_counter() - started) * 1000, (started - due) * 1000, status
+
+    first = captured[0].arrived
+    futures = []
+    # The latest request for each ticker, each ticker's alerts are sent one after another in the order they arrived
+    lanes: dict[str, Future] = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for alert in captured:
+            due = start + (alert.arrived - first) / args.speed if args.speed > 0 else time.perf_counter()
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            tickers = {normalise_ticker(item["ticker"]) for item in alerts_of(alert)}
+            future = pool.submit(send, alert, due, [lanes[ticker] for ticker in tickers if ticker in lanes])
+            lanes.update(dict.fromkeys(tickers, future))
+            futures.append(future)
+
+        results = [future.result() for future in futures]
+
+    wall = time.perf_counter() - start
+    server.stop()
+    os.unlink(secret.name)
+
+    positions = dict(sorted(mock.positions.items()))
+    calls = dict(sorted(mock.calls.items()))
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "log_level")},
+        "requests": len(captured),
+        "alerts": sum(len(alerts_of(alert)) for alert in captured),
+        "recorded_s": captured[-1].arrived - first,
+        "wall_s": wall,
+        "requests_per_s": len(captured) / wall,
+        "latency": summarise([latency for latency, _, _ in results]),
+        # Time between an alert being due and it being sent, i.e. queueing for a worker or its ticker's earlier alerts
+        "lag": summarise([max(0.0, lag) for _, lag, _ in results]),
+        "statuses": dict(Counter(str(status) for _, _, status in results)),
+        "exchange_calls": calls,
+        "positions": positions,
+        "divergence": divergence(
+            intended_positions([item for alert in captured for item in alerts_of(alert)]), positions, universe
+        ),
+        "stages": main.recorder.export()["stages"],
+    }
+
+
+def report(result: dict):
+    latency, lag = result["latency"], result["lag"]
+    speed = result["config"]["speed"]
+    print(
+        f"{result['requests']} requests ({result['alerts']} alerts) recorded over {result['recorded_s']:.1f}s, "
+        f"replayed {'as fast as possible' if speed <= 0 else f'at {speed:g}x'} in {result['wall_s']:.2f}s, "
+        f"{result['requests_per_s']:.1f} req/s"
+    )
+    print(f"latency: p50 {latency['p50_ms']:8.2f}ms  p99 {latency['p99_ms']:8.2f}ms  mean {latency['mean_ms']:8.2f}ms")
+    print(f"    lag: p50 {lag['p50_ms']:8.2f}ms  p99 {lag['p99_ms']:8.2f}ms")
+    print("statuses: " + ", ".join(f"{status}={count}" for status, count in sorted(result["statuses"].items())))
+    print("exchange calls: " + ", ".join(f"{call}={count}" for call, count in result["exchange_calls"].items()))
+    if result["divergence"]:
+        print(f"{len(result['divergence'])} tickers diverged from their last alert:")
+        for ticker, positions in result["divergence"].items():
+            print(f"{ticker:>10}: intended {positions['intended']:g}, actual {positions['actual']:g}")
+    else:
+        print(f"Final positions match every ticker's last alert ({len(result['positions'])} open)")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", help="Capture file, written by `HYPERLIQUID_CAPTURE` or `--synthesize`")
+    parser.add_argument("--speed", type=float, default=1.0, help="Times faster than recorded, 0 for no delays")
+    parser.add_argument("--concurrency", type=int, default=16, help="Alerts in flight at once")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Mean mock exchange latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument(
+        "--rate-limit", type=int, default=0, help="Request weight per minute, the mock never throttles so 0 disables"
+    )
+    parser.add_argument("--synthesize", choices=SCENARIOS, help="Write a synthetic capture instead of replaying")
+    parser.add_argument("--alerts", type=int, default=200, help="Alerts to synthesize")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between synthesized alerts (or bursts)")
+    parser.add_argument("--tickers", type=int, default=8, help=f"Tickers to synthesize, up to {len(DEFAULT_UNIVERSE)}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="Result path, defaults to a timestamped file in benchmarks/results/")
+    args = parser.parse_args(argv)
+
+    if args.synthesize:
+        synthesize(args.capture, args.synthesize, args.alerts, args.interval, args.tickers, args.seed)
+        print(f"Wrote {args.alerts} {args.synthesize} alerts to {args.capture}")
+        return 0
+
+    result = run(args)
+    report(result)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-replay.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Saved results to {output}")
+
+    return 1 if result["divergence"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
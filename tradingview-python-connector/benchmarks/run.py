@@ -0,0 +1,286 @@
+"""
+Offline latency and throughput benchmark, driving `main.entrypoint` (and through it the `Hyperliquid` adapter)
+against a local mock of the Hyperliquid API.
+
+Usage (from `tradingview-python-connector/`):
+
+    python -m benchmarks.run --scenario mixed --alerts 500 --latency-ms 20 --jitter-ms 5
+    python -m benchmarks.run --scenario burst --concurrency 8 --compare benchmarks/results/<previous>.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from eth_account import Account
+
+from benchmarks.mock_exchange import DEFAULT_UNIVERSE, MockExchange, MockExchangeServer
+
+SCENARIOS = ("open", "close", "reverse", "burst", "mixed")
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+# Notional per alert in USD, sizes are derived from each asset's mid price
+NOTIONAL = 1000.0
+
+
+def alert(index: int, asset: dict, previous: str, position: str) -> dict:
+    opening = previous == "flat"
+    is_buy = position == "long" if opening or position != "flat" else previous == "short"
+    contracts = NOTIONAL / asset["mid"]
+
+    return {
+        "id": f"bench-{index}",
+        "action": "buy" if is_buy else "sell",
+        "contracts": contracts,
+        "ticker": f"{asset['name']}USD.P",
+        "position": position,
+        "previous_position": previous,
+        "position_size": 0.0 if position == "flat" else contracts,
+        "price": asset["mid"],
+    }
+
+
+def kind(alert: dict) -> str:
+    if alert["previous_position"] == "flat":
+        return "open"
+    if alert["position"] == "flat":
+        return "close"
+    return "reverse"
+
+
+def alert_stream(scenario: str, count: int, assets: list[dict], seed: int = 0) -> list[dict]:
+    """
+    Generate a synthetic alert stream, consistent with the position each strategy would hold.
+
+    - open: every alert opens a position.
+    - close: each ticker alternates between opening and closing.
+    - reverse: each ticker opens once, then reverses between long and short.
+    - burst / mixed: random transitions, burst alerts are sent as one alert per ticker at the same instant.
+    """
+    rng = random.Random(seed)
+    states = {asset["name"]: "flat" for asset in assets}
+    alerts = []
+    for index in range(count):
+        asset = assets[index % len(assets)]
+        previous = states[asset["name"]]
+        if scenario == "open":
+            previous, position = "flat", rng.choice(("long", "short"))
+        elif scenario == "close":
+            position = rng.choice(("long", "short")) if previous == "flat" else "flat"
+        elif scenario == "reverse":
+            position = {"flat": "long", "long": "short", "short": "long"}[previous]
+        else:
+            position = rng.choice([p for p in ("flat", "long", "short") if p != previous])
+
+        states[asset["name"]] = position
+        alerts.append(alert(index, asset, previous, position))
+
+    return alerts
+
+
+def percentile(samples: list[float], p: int) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, len(samples) * p // 100)] if samples else 0.0
+
+
+def summarise(samples: list[float]) -> dict:
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.fmean(samples) if samples else 0.0,
+        "p50_ms": percentile(samples, 50),
+        "p99_ms": percentile(samples, 99),
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    universe = DEFAULT_UNIVERSE[: args.tickers]
+    mock = MockExchange(universe)
+    server = MockExchangeServer(mock, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms).start()
+
+    Account.enable_unaudited_hdwallet_features()
+    _, mnemonic = Account.create_with_mnemonic()
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as secret:
+        secret.write(mnemonic)
+
+    # `main` reads its configuration at import time
+    os.environ["HYPERLIQUID_API_URL"] = server.url
+    os.environ["HYPERLIQUID_SECRET_FILE"] = secret.name
+    os.environ["HYPERLIQUID_RATE_LIMIT"] = str(args.rate_limit)
+    import main
+    from flask import Flask
+
+    logging.getLogger().setLevel(args.log_level)
+    app = Flask(__name__)
+
+    def send(path: str, function, body: bytes) -> float:
+        with app.test_request_context(path, method="POST", data=body, content_type="application/json") as ctx:
+            start = time.perf_counter()
+            response = function(ctx.request)
+            elapsed = (time.perf_counter() - start) * 1000
+
+        status = response[1] if isinstance(response, tuple) else 200
+        if status != 200:
+            raise RuntimeError(f"{path} returned {status}")
+        return elapsed
+
+    alerts = alert_stream(args.scenario, args.alerts, universe, args.seed)
+
+    # Warm up the client (secret, SDK metadata, asset metadata) so it isn't counted against the first alert
+    main.registry.get(main.SECRET_FILE, main.INSTANCE_URL).metadata.universe()
+    mock.calls.clear()
+
+    latencies: dict[str, list[float]] = {"open": [], "close": [], "reverse": []}
+    start = time.perf_counter()
+    if args.batch:
+        # One request per burst, each holding one alert per ticker
+        bursts = [alerts[i : i + len(universe)] for i in range(0, len(alerts), len(universe))]
+        for burst in bursts:
+            elapsed = send("/batch", main.batch_entrypoint, json.dumps(burst).encode())
+            for item in burst:
+                latencies[kind(item)].append(elapsed)
+    elif args.scenario == "burst":
+        # Every ticker's alert arrives at once, e.g. strategies sharing a timeframe firing on candle close
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for i in range(0, len(alerts), len(universe)):
+                burst = alerts[i : i + len(universe)]
+                for item, elapsed in zip(
+                    burst,
+                    pool.map(lambda a: send("/", main.entrypoint, json.dumps(a).encode()), burst),
+                    strict=True,
+                ):
+                    latencies[kind(item)].append(elapsed)
+    else:
+        # Tickers are partitioned across workers, so each ticker's alerts still arrive in order
+        partitions = {f"{asset['name']}USD.P": i % args.concurrency for i, asset in enumerate(universe)}
+
+        def worker(partition: int):
+            for item in alerts:
+                if partitions[item["ticker"]] == partition:
+                    latencies[kind(item)].append(send("/", main.entrypoint, json.dumps(item).encode()))
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(worker, range(args.concurrency)))
+
+    wall = time.perf_counter() - start
+    server.stop()
+    os.unlink(secret.name)
+
+    samples = [elapsed for kind_samples in latencies.values() for elapsed in kind_samples]
+    calls = dict(sorted(mock.calls.items()))
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("compare", "output", "log_level")},
+        "alerts": len(alerts),
+        "wall_s": wall,
+        "requests_per_s": (len(bursts) if args.batch else len(alerts)) / wall,
+        "alerts_per_s": len(alerts) / wall,
+        "latency": summarise(samples),
+        "latency_by_kind": {name: summarise(values) for name, values in latencies.items() if values},
+        "exchange_calls": calls,
+        "calls_per_alert": sum(calls.values()) / len(alerts),
+        "stages": main.recorder.export()["stages"],
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(result: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Returns:
+        list[str]: Metrics which regressed by more than `threshold` (a fraction) against the baseline.
+    """
+    if result["config"] != baseline["config"]:
+        print(f"Warning: comparing against a run with a different config: {baseline['config']}")
+
+    regressions = []
+    for metric in ("p50_ms", "p99_ms"):
+        before, after = baseline["latency"][metric], result["latency"][metric]
+        change = (after - before) / before if before else 0.0
+        print(f"{metric:>16}: {before:9.2f} -> {after:9.2f} ({change:+.1%})")
+        if change > threshold:
+            regressions.append(metric)
+
+    before, after = baseline["requests_per_s"], result["requests_per_s"]
+    change = (after - before) / before if before else 0.0
+    print(f"{'requests_per_s':>16}: {before:9.2f} -> {after:9.2f} ({change:+.1%})")
+    if -change > threshold:
+        regressions.append("requests_per_s")
+
+    before, after = baseline["calls_per_alert"], result["calls_per_alert"]
+    print(f"{'calls_per_alert':>16}: {before:9.2f} -> {after:9.2f}")
+    if after > before:
+        regressions.append("calls_per_alert")
+
+    return regressions
+
+
+def report(result: dict):
+    latency = result["latency"]
+    print(
+        f"{result['config']['scenario']}: {result['alerts']} alerts in {result['wall_s']:.2f}s, "
+        f"{result['requests_per_s']:.1f} req/s, {result['calls_per_alert']:.2f} exchange calls per alert"
+    )
+    print(f"{'all':>8}: p50 {latency['p50_ms']:8.2f}ms  p99 {latency['p99_ms']:8.2f}ms")
+    for name, values in result["latency_by_kind"].items():
+        print(f"{name:>8}: p50 {values['p50_ms']:8.2f}ms  p99 {values['p99_ms']:8.2f}ms  ({values['count']})")
+    print("exchange calls: " + ", ".join(f"{call}={count}" for call, count in result["exchange_calls"].items()))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=SCENARIOS, default="mixed")
+    parser.add_argument("--alerts", type=int, default=200)
+    parser.add_argument("--tickers", type=int, default=8, help=f"Up to {len(DEFAULT_UNIVERSE)}")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--batch", action="store_true", help="Send alerts in bursts to `batch_entrypoint`")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Mean mock exchange latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--rate-limit", type=int, default=0, help="Request weight per minute, the mock never throttles so 0 disables"
+    )
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="Result path, defaults to a timestamped file in benchmarks/results/")
+    parser.add_argument("--compare", help="A previous result to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed regression, as a fraction")
+    args = parser.parse_args(argv)
+
+    result = run(args)
+    report(result)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{args.scenario}{'-batch' if args.batch else ''}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Saved results to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(result, json.load(f), args.threshold)
+        if regressions:
+            print(f"Regressed: {', '.join(regressions)}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
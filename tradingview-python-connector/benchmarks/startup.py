@@ -0,0 +1,174 @@
+"""
+Cold start profile of the function: import cost per package, client initialisation and the first alerts, each
+measured in a fresh interpreter against the local mock exchange.
+
+Every run starts `python -X importtime`, imports `main`, builds the client and sends two alerts through
+`entrypoint`. Imports are attributed to the phase that triggered them, so deferred imports show up under the alert
+that first needed them, and imports between alerts, i.e. pre-warming, under "background".
+
+Usage (from `tradingview-python-connector/`):
+
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --runs 5 --output benchmarks/results/startup-before.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from datetime import datetime
+
+from eth_account import Account
+
+from benchmarks.mock_exchange import DEFAULT_UNIVERSE, MockExchange, MockExchangeServer
+from benchmarks.run import RESULTS_DIR, alert, git_commit
+
+PHASES = ("import", "client_init", "first_alert", "second_alert", "background")
+
+# Runs in the fresh interpreter, nothing is imported before `main` so its imports are measured in full
+CHILD = """
+import sys, time
+def phase(name):
+    print(f"--- {name}", file=sys.stderr, flush=True)
+
+timings = {}
+phase("import")
+start = time.perf_counter()
+import main
+timings["import"] = (time.perf_counter() - start) * 1000
+
+# Not attributed to any phase, the function framework has already imported Flask in production
+phase("harness")
+from flask import Flask
+app = Flask(__name__)
+
+phase("client_init")
+start = time.perf_counter()
+main.registry.get(main.SECRET_FILE, main.INSTANCE_URL)
+timings["client_init"] = (time.perf_counter() - start) * 1000
+for name, body in (("first_alert", sys.argv[1]), ("second_alert", sys.argv[2])):
+    phase(name)
+    with app.test_request_context("/", method="POST", data=body.encode(), content_type="application/json") as ctx:
+        start = time.perf_counter()
+        main.entrypoint(ctx.request)
+        timings[name] = (time.perf_counter() - start) * 1000
+
+    # Alerts arrive seconds apart, anything imported in between is off the request path
+    phase("background")
+    time.sleep(float(sys.argv[3]))
+
+phase("done")
+import json
+print(json.dumps(timings))
+"""
+
+
+def parse_importtime(stderr: str) -> dict[str, dict[str, float]]:
+    """
+    Sum the self time of every import by phase and top level package, in milliseconds.
+    """
+    costs: dict[str, dict[str, float]] = {phase: defaultdict(float) for phase in PHASES}
+    phase = None
+    for line in stderr.splitlines():
+        if line.startswith("--- "):
+            phase = line[4:]
+            continue
+        if phase not in costs or not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, _cumulative, name = (part.strip() for part in line[len("import time:") :].split("|"))
+        costs[phase][name.split(".")[0]] += int(self_us) / 1000
+
+    return costs
+
+
+def profile(server_url: str, secret: str, bodies: tuple[str, str], idle: float) -> tuple[dict[str, float], dict]:
+    env = {
+        **os.environ,
+        "HYPERLIQUID_API_URL": server_url,
+        "HYPERLIQUID_SECRET_FILE": secret,
+        "HYPERLIQUID_RATE_LIMIT": "0",
+        # A metadata snapshot left by a previous run would hide the metadata fetch
+        "TMPDIR": tempfile.mkdtemp(prefix="startup-"),
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, *bodies, str(idle)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return timings, parse_importtime(result.stderr)
+
+
+def report(runs: list[tuple[dict[str, float], dict]], top: int = 8) -> dict:
+    summary = {}
+    for phase in PHASES:
+        packages: dict[str, list[float]] = defaultdict(list)
+        for _, costs in runs:
+            for package, cost in costs[phase].items():
+                packages[package].append(cost)
+
+        imports = {package: sum(costs) / len(runs) for package, costs in packages.items()}
+        # Background imports aren't timed by the child, only their import time is known
+        walls = [timings[phase] for timings, _ in runs if phase in timings]
+        summary[phase] = {
+            "wall_ms": statistics.median(walls) if walls else None,
+            "imports_ms": sum(imports.values()),
+            "packages_ms": dict(sorted(imports.items(), key=lambda item: -item[1])[:top]),
+        }
+
+        wall = f"{summary[phase]['wall_ms']:8.1f}ms" if walls else f"{'-':>10}"
+        print(f"{phase:>13}: {wall}, of which imports {summary[phase]['imports_ms']:7.1f}ms")
+        for package, cost in summary[phase]["packages_ms"].items():
+            print(f"{'':>15}{package:<24}{cost:7.1f}ms")
+
+    cold_start = sum(summary[phase]["wall_ms"] for phase in ("import", "client_init", "first_alert"))
+    print(f"   cold start: {cold_start:8.1f}ms (import, client and first alert)")
+    return {"phases": summary, "cold_start_ms": cold_start}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Mean mock exchange latency per request")
+    parser.add_argument("--idle", type=float, default=1.0, help="Seconds between alerts")
+    parser.add_argument("--output", help="Result path, defaults to a timestamped file in benchmarks/results/")
+    args = parser.parse_args(argv)
+
+    server = MockExchangeServer(MockExchange(), latency_ms=args.latency_ms).start()
+    Account.enable_unaudited_hdwallet_features()
+    _, mnemonic = Account.create_with_mnemonic()
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as secret:
+        secret.write(mnemonic)
+
+    bodies = tuple(json.dumps(alert(i, asset, "flat", "long")) for i, asset in enumerate(DEFAULT_UNIVERSE[:2]))
+    try:
+        runs = [profile(server.url, secret.name, bodies, args.idle) for _ in range(args.runs)]
+    finally:
+        server.stop()
+        os.unlink(secret.name)
+
+    result = {
+        "commit": git_commit(),
+        "runs": args.runs,
+        "latency_ms": args.latency_ms,
+        "idle": args.idle,
+        **report(runs),
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Saved results to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
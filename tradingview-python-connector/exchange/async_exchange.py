@@ -0,0 +1,116 @@
+from abc import ABC, abstractmethod
+
+from exchange.flatten import FlattenResult
+from exchange.snapshot import AccountSnapshot
+from order.order import Order
+from order.position import Position
+
+
+class AsyncExchange(ABC):
+    """
+    Asyncio variant of the `Exchange` interface, for serving many alerts from a single event loop.
+    Methods mirror their synchronous counterparts, see `Exchange` for descriptions.
+    """
+
+    @abstractmethod
+    async def place_order(self, order: Order, reduce_only: bool = False) -> dict:
+        """
+        Place an order on the exchange.
+
+        Args:
+            order (Order): Order object containing price and size info.
+            reduce_only (bool): Whether the order should only reduce a position, not increase/reverse it.
+
+        Returns:
+            dict: The result of the order placement.
+        """
+        pass
+
+    @abstractmethod
+    async def place_orders(self, orders: list[tuple[Order, bool]]) -> list[dict]:
+        """
+        Place several orders in as few exchange requests as possible.
+
+        Args:
+            orders (list[tuple[Order, bool]]): Orders to place, each paired with its `reduce_only` flag.
+
+        Returns:
+            list[dict]: The exchange's status for each order, in the same order as given.
+        """
+        pass
+
+    @abstractmethod
+    async def account_snapshot(self, open_orders: bool = True, assets: list[str] | None = None) -> AccountSnapshot:
+        """
+        Fetch the account's positions, and optionally open orders, concurrently.
+
+        Args:
+            open_orders (bool): Whether to also fetch resting orders, skipped when only positions are needed.
+            assets (list[str] | None): The assets the caller is about to act on, allowing a prefetched snapshot
+                to be served if none of them have been acted on since it was fetched.
+
+        Returns:
+            AccountSnapshot: The account state at the time of the call.
+        """
+        pass
+
+    @abstractmethod
+    async def cancel_existing_orders(self, asset: str, snapshot: AccountSnapshot | None = None) -> dict[int, str]:
+        """
+        Cancel existing orders for the given asset.
+
+        Args:
+            asset (str): The asset symbol for which to cancel orders.
+            snapshot (AccountSnapshot | None): Previously fetched account state, fetched if not provided.
+
+        Returns:
+            dict[int, str]: The outcome of each cancel, "success" or an error message, by order id.
+        """
+        pass
+
+    @abstractmethod
+    async def cancel_orders(self, cancels: list[dict]) -> dict[int, str]:
+        """
+        Cancel specific orders, across any number of assets, in as few exchange requests as possible.
+
+        Args:
+            cancels (list[dict]): Orders to cancel, each with a `coin` and an `oid`.
+
+        Returns:
+            dict[int, str]: The outcome of each cancel, "success" or an error message, by order id.
+        """
+        pass
+
+    @abstractmethod
+    async def close_positions(self, asset: str | None = None) -> FlattenResult:
+        """
+        Close existing positions with reduce-only market orders and cancel resting orders, concurrently.
+
+        Args:
+            asset (str | None): The asset symbol for which to close positions, every asset if None.
+
+        Returns:
+            FlattenResult: The outcome for each position and cancelled order, and the total wall time.
+        """
+        pass
+
+    @abstractmethod
+    async def has_open_position(self, asset: str, snapshot: AccountSnapshot | None = None) -> Position:
+        """
+        Check if there is an open position for the given asset.
+
+        Args:
+            asset (str): The asset symbol to check.
+            snapshot (AccountSnapshot | None): Previously fetched account state, fetched if not provided.
+
+        Returns:
+            Position: The direction of the open position, FLAT if there is none.
+        """
+        pass
+
+    @abstractmethod
+    async def close(self):
+        """
+        Release the client's connections.
+        """
+        pass
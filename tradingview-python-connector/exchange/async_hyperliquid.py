@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+import aiohttp
+import msgspec
+from hyperliquid.utils.signing import CancelRequest
+
+from exchange.async_exchange import AsyncExchange
+from exchange.flatten import FlattenResult
+from exchange.hyperliquid import Hyperliquid, action_statuses, cancel_results, parse_positions
+from exchange.ratelimit import request_priority, request_weight
+from exchange.snapshot import AccountSnapshot
+from metrics.latency import recorder
+from order.order import Order
+from order.position import Position
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncHyperliquid(AsyncExchange):
+    """
+    Asyncio implementation of the Exchange interface for Hyperliquid, on a single shared `aiohttp` session.
+
+    Wraps a warmed synchronous `Hyperliquid` client, which still owns the account, asset metadata, precision rules
+    and nonce allocation, only the HTTP calls are made asynchronously. Signing is CPU bound, so it's run on the
+    default executor to keep the event loop free for other alerts.
+
+    Args:
+        client (Hyperliquid): The synchronous client to share state with.
+        max_concurrency (int): Maximum requests in flight to the exchange, across every alert on this client.
+        info_timeout (float): Seconds before an `/info` query is abandoned.
+        exchange_timeout (float): Seconds before an `/exchange` action is abandoned.
+    """
+
+    def __init__(
+        self,
+        client: Hyperliquid,
+        max_concurrency: int = 16,
+        info_timeout: float = 5.0,
+        exchange_timeout: float = 10.0,
+    ):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.info_timeout = aiohttp.ClientTimeout(total=info_timeout)
+        self.exchange_timeout = aiohttp.ClientTimeout(total=exchange_timeout)
+        self._session: aiohttp.ClientSession | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # Created on first use, so it belongs to the event loop serving requests
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                headers={"Content-Type": "application/json"},
+            )
+
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def post(self, path: str, payload: dict, timeout: aiohttp.ClientTimeout) -> Any:
+        # Shares the synchronous client's rate limiter, only blocking a thread when the request has to wait
+        limiter = self.client.transport.limiter
+        weight, priority = request_weight(path, payload), request_priority(path)
+        if not limiter.try_acquire(weight, priority):
+            await asyncio.to_thread(limiter.acquire, weight, priority)
+
+        async with self._semaphore:
+            async with self.session.post(
+                self.client.instance + path, data=msgspec.json.encode(payload), timeout=timeout
+            ) as response:
+                if response.status == 429:
+                    limiter.throttle()
+                response.raise_for_status()
+                return msgspec.json.decode(await response.read())
+
+    async def info(self, payload: dict) -> Any:
+        return await self.post("/info", payload, self.info_timeout)
+
+    async def post_action(self, action: dict) -> dict:
+        payload = await asyncio.to_thread(self.client.signed_action, action)
+        with recorder.time("exchange"):
+            return await self.post("/exchange", payload, self.exchange_timeout)
+
+    async def place_order(self, order: Order, reduce_only: bool = False) -> dict:
+        requests, grouping = self.client.protected_order(order, reduce_only)
+        return await self.post_action(self.client.order_action(requests, grouping))
+
+    async def place_orders(self, orders: list[tuple[Order, bool]]) -> list[dict]:
+        if not orders:
+            return []
+
+        requests = self.client.order_requests(orders)
+        try:
+            response = await self.post_action(self.client.order_action(requests))
+        except Exception as e:
+            logger.warning(f"Failed to place orders: {e!r}")
+            response = {"status": "err", "response": repr(e)}
+
+        return action_statuses(response, len(orders))
+
+    async def account_snapshot(self, open_orders: bool = True, assets: list[str] | None = None) -> AccountSnapshot:
+        mirror = self.client.mirror
+        if mirror is not None and mirror.ready:
+            return mirror.snapshot()
+
+        snapshot = self.client.prefetched.get(assets)
+        if snapshot is not None:
+            return snapshot
+
+        return await self.fetch_account_snapshot(open_orders)
+
+    async def warm(self, connections: int = 4):
+        """
+        Open (or refresh) pooled connections ahead of expected alerts, with the lightest query there is.
+        """
+        await asyncio.gather(
+            *(self.info({"type": "allMids"}) for _ in range(min(connections, self.max_concurrency))),
+            return_exceptions=True,
+        )
+
+    async def fetch_account_snapshot(self, open_orders: bool = True) -> AccountSnapshot:
+        """
+        Query positions and open orders concurrently, failed queries are treated as empty.
+        """
+        address = self.client.account.address
+        queries = [self.info({"type": "clearinghouseState", "user": address, "dex": ""})]
+        if open_orders:
+            queries.append(self.info({"type": "openOrders", "user": address, "dex": ""}))
+        results = await asyncio.gather(*queries, return_exceptions=True)
+
+        positions: dict[str, float] = {}
+        try:
+            positions = parse_positions(unwrap(results[0]))
+        except Exception as e:
+            logger.warning(f"Failed to get user state: {e!r}")
+
+        resting_orders: list[dict] | None = None
+        if open_orders:
+            try:
+                resting_orders = unwrap(results[1])
+            except Exception as e:
+                logger.warning(f"Failed to get open orders: {e!r}")
+                resting_orders = []
+
+        return AccountSnapshot(positions=positions, open_orders=resting_orders, fetched_at=time.time())
+
+    async def cancel_existing_orders(self, asset: str, snapshot: AccountSnapshot | None = None) -> dict[int, str]:
+        if snapshot is None or snapshot.open_orders is None:
+            snapshot = await self.account_snapshot()
+
+        return await self.cancel_orders([{"coin": o["coin"], "oid": o["oid"]} for o in snapshot.orders_for(asset)])
+
+    async def cancel_orders(self, cancels: list[CancelRequest]) -> dict[int, str]:
+        if not cancels:
+            return {}
+
+        size = self.client.cancel_batch_size
+        chunks = [cancels[i : i + size] for i in range(0, len(cancels), size)]
+        responses = await asyncio.gather(*(self._cancel_chunk(chunk) for chunk in chunks))
+
+        return cancel_results(chunks, list(responses))
+
+    async def _cancel_chunk(self, cancels: list[CancelRequest]) -> dict:
+        try:
+            return await self.post_action(self.client.cancel_action(cancels))
+        except Exception as e:
+            logger.warning(f"Failed to cancel orders: {e!r}")
+            return {"status": "err", "response": repr(e)}
+
+    async def close_positions(self, asset: str | None = None) -> FlattenResult:
+        start = time.perf_counter()
+        mirror = self.client.mirror
+        if mirror is not None and mirror.ready:
+            snapshot, mids = mirror.snapshot(), await self.info({"type": "allMids"})
+        else:
+            # Unlike `fetch_account_snapshot`, a failed query raises rather than reporting nothing to close
+            address = self.client.account.address
+            user_state, open_orders, mids = await asyncio.gather(
+                self.info({"type": "clearinghouseState", "user": address, "dex": ""}),
+                self.info({"type": "openOrders", "user": address, "dex": ""}),
+                self.info({"type": "allMids"}),
+            )
+            snapshot = AccountSnapshot(
+                positions=parse_positions(user_state), open_orders=open_orders, fetched_at=time.time()
+            )
+
+        cancels = [
+            {"coin": o["coin"], "oid": o["oid"]}
+            for o in snapshot.open_orders or []
+            if asset is None or o["coin"] == asset
+        ]
+        exits, positions = self.client.exit_requests(snapshot, mids, asset)
+
+        async def place() -> list:
+            if not exits:
+                return []
+            try:
+                response = await self.post_action(self.client.order_action(exits))
+            except Exception as e:
+                logger.warning(f"Failed to place exits: {e!r}")
+                response = {"status": "err", "response": repr(e)}
+            return action_statuses(response, len(exits))
+
+        cancelled, statuses = await asyncio.gather(self.cancel_orders(cancels), place())
+        positions.update(zip((e["coin"] for e in exits), statuses, strict=True))
+
+        return FlattenResult(positions, cancelled, elapsed_ms=(time.perf_counter() - start) * 1000)
+
+    async def has_open_position(self, asset: str, snapshot: AccountSnapshot | None = None) -> Position:
+        if snapshot is None:
+            snapshot = await self.account_snapshot(open_orders=False)
+
+        return snapshot.position(asset)
+
+
+def unwrap(result: Any) -> Any:
+    # `asyncio.gather(..., return_exceptions=True)` returns failures in place of results
+    if isinstance(result, BaseException):
+        raise result
+
+    return result
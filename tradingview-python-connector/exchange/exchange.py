@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 
+from exchange.flatten import FlattenResult
+from exchange.snapshot import AccountSnapshot
 from order.order import Order
 from order.position import Position
 
@@ -30,38 +32,83 @@ class Exchange(ABC):
         pass
 
     @abstractmethod
-    def cancel_existing_orders(self, asset: str) -> bool:
+    def place_orders(self, orders: list[tuple[Order, bool]]) -> list[dict]:
+        """
+        Place several orders in as few exchange requests as possible.
+
+        Args:
+            orders (list[tuple[Order, bool]]): Orders to place, each paired with its `reduce_only` flag.
+
+        Returns:
+            list[dict]: The exchange's status for each order, in the same order as given.
+        """
+        pass
+
+    @abstractmethod
+    def account_snapshot(self, open_orders: bool = True, assets: list[str] | None = None) -> AccountSnapshot:
+        """
+        Fetch the account's positions, and optionally open orders, in one go.
+        The result is intended to be reused for the rest of a request via the `snapshot` arguments below.
+
+        Args:
+            open_orders (bool): Whether to also fetch resting orders, skipped when only positions are needed.
+            assets (list[str] | None): The assets the caller is about to act on, allowing a prefetched snapshot
+                to be served if none of them have been acted on since it was fetched.
+
+        Returns:
+            AccountSnapshot: The account state at the time of the call.
+        """
+        pass
+
+    @abstractmethod
+    def cancel_existing_orders(self, asset: str, snapshot: AccountSnapshot | None = None) -> dict[int, str]:
         """
         Cancel existing orders for the given asset.
 
         Args:
             asset (str): The asset symbol for which to cancel orders.
+            snapshot (AccountSnapshot | None): Previously fetched account state, fetched if not provided.
+
+        Returns:
+            dict[int, str]: The outcome of each cancel, "success" or an error message, by order id.
+        """
+        pass
+
+    @abstractmethod
+    def cancel_orders(self, cancels: list[dict]) -> dict[int, str]:
+        """
+        Cancel specific orders, across any number of assets, in as few exchange requests as possible.
+
+        Args:
+            cancels (list[dict]): Orders to cancel, each with a `coin` and an `oid`.
 
         Returns:
-            bool: True if orders were successfully canceled, False otherwise.
+            dict[int, str]: The outcome of each cancel, "success" or an error message, by order id.
         """
         pass
 
     @abstractmethod
-    def close_positions(self, asset: str) -> bool:
+    def close_positions(self, asset: str | None = None) -> FlattenResult:
         """
-        Close existing positions for the given asset.
+        Close existing positions with reduce-only market orders and cancel resting orders, all decided from one
+        account snapshot. Exits are sent as a single bulk order, alongside the cancels.
 
         Args:
-            asset (str): The asset symbol for which to close positions.
+            asset (str | None): The asset symbol for which to close positions, every asset if None.
 
         Returns:
-            bool: True if positions were successfully closed, False otherwise.
+            FlattenResult: The outcome for each position and cancelled order, and the total wall time.
         """
         pass
 
     @abstractmethod
-    def has_open_position(self, asset: str) -> Position:
+    def has_open_position(self, asset: str, snapshot: AccountSnapshot | None = None) -> Position:
         """
         Check if there is an open position for the given asset.
 
         Args:
             asset (str): The asset symbol to check.
+            snapshot (AccountSnapshot | None): Previously fetched account state, fetched if not provided.
 
         Returns:
             bool: True if there is an open position, False otherwise.
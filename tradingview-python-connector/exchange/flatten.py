@@ -0,0 +1,43 @@
+from typing import Any
+
+import msgspec
+
+from order.order import normalise_ticker
+
+
+class FlattenRequest(msgspec.Struct):
+    """
+    Body of a flatten request, an empty body closes every position.
+
+    Attributes:
+        asset (str | None): Only close this asset, as a coin ("SOL") or TradingView ticker ("SOLUSD.P").
+    """
+
+    asset: str | None = None
+
+    def __post_init__(self):
+        if self.asset is not None and "USD" in self.asset:
+            self.asset = normalise_ticker(self.asset)
+
+
+class FlattenResult(msgspec.Struct):
+    """
+    Outcome of `Exchange.close_positions`.
+
+    Attributes:
+        positions (dict[str, Any]): The exit order's status by coin, e.g. `{"filled": {...}}` or `{"error": "..."}`.
+        cancels (dict[int, str]): The outcome of each cancelled resting order, "success" or an error, by order id.
+        elapsed_ms (float): Wall time from the first query to the last response.
+    """
+
+    positions: dict[str, Any]
+    cancels: dict[int, str]
+    elapsed_ms: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        # A resting order may fill before its cancel lands, what matters is that every exit filled
+        return all(isinstance(status, dict) and "filled" in status for status in self.positions.values())
+
+
+flatten_decoder = msgspec.json.Decoder(FlattenRequest)
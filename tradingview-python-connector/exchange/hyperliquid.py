@@ -1,13 +1,42 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from eth_account import Account
 from eth_account.signers.local import LocalAccount
 from hyperliquid.exchange import Exchange as HyperliquidExchange
 from hyperliquid.info import Info
 from hyperliquid.utils import constants
+from hyperliquid.utils.signing import (
+    CancelRequest,
+    OrderRequest,
+    get_timestamp_ms,
+    order_request_to_order_wire,
+    sign_l1_action,
+)
 
 from exchange.exchange import Exchange
+from exchange.flatten import FlattenResult
+from exchange.metadata import MAX_PERP_PRICE_DECIMALS, AssetMetadataCache
+from exchange.mirror import AccountMirror
+from exchange.prefetch import PrefetchedState
+from exchange.ratelimit import ActionMerger
+from exchange.snapshot import AccountSnapshot
+from exchange.transport import Transport
+from metrics.latency import recorder
 from order.order import Order
+from order.precision import PrecisionRule, Quantizer
 from order.position import Position
 
+logger = logging.getLogger(__name__)
+
+# Shared across clients so concurrent queries and actions don't spin up a pool per request
+_io_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hyperliquid-io")
+
 
 class Hyperliquid(Exchange):
     """
@@ -21,114 +50,454 @@ class Hyperliquid(Exchange):
     exchange: HyperliquidExchange
     info: Info
     instance: str
-    size_decimals = {
-        "SOL": 2,
-        "AVAX": 2,
-        "INJ": 1,
-        "SUI": 1,
-        "STX": 1,
-        "RNDR": 1,
-        "FTM": 0,
-        "APT": 2,
-        "SEI": 0,
-        "TIA": 1,
-        "PENDLE": 0,
-        "NEAR": 1,
-        "NTRN": 0,
-        "WIF": 0,
-        "ONDO": 0,
-        "ALT": 0,
-        "TAO": 3,
-    }
+    merger: ActionMerger
+    metadata: AssetMetadataCache
+    quantizer: Quantizer
+    transport: Transport
+    # Cancels per signed action, larger batches are split and sent concurrently
+    cancel_batch_size = 40
+    # How far through the mid price exits may fill, as a fraction, like the SDK's market orders
+    exit_slippage = 0.05
 
-    def __init__(self, secret_file: str, instance_url=constants.MAINNET_API_URL):
+    def __init__(
+        self,
+        secret_file: str,
+        instance_url=constants.MAINNET_API_URL,
+        metadata_ttl: float = 300.0,
+        mirror: bool = False,
+        transport: Transport | None = None,
+    ):
         with open(secret_file, "r") as f:
             secret = f.read().strip()
 
         Account.enable_unaudited_hdwallet_features()
         self.instance = instance_url
         self.account: LocalAccount = Account.from_mnemonic(secret)
-        self.exchange = HyperliquidExchange(self.account, instance_url)
-        self.info = Info(instance_url, skip_ws=True)
 
-    def asset_contract_rounding_size(self, asset: str) -> int:
-        try:
-            meta = self.info.meta()
-            for asset_info in meta["universe"]:
-                if asset_info["name"] == asset:
-                    return asset_info["szDecimals"]
+        # Every SDK object shares one pooled transport. Metadata comes from the on-disk snapshot while it's fresh, and
+        # is otherwise fetched once up front rather than by each object's constructor over its own connection.
+        self.transport = transport or Transport()
+        self.metadata = AssetMetadataCache(
+            lambda: self.transport.post(instance_url, "/info", {"type": "meta"}),
+            fetch_spot=lambda: self.transport.post(instance_url, "/info", {"type": "spotMeta"}),
+            ttl=metadata_ttl,
+            snapshot_path=self.metadata_snapshot_path(instance_url),
+        )
+        meta, spot_meta = self.metadata.sdk_meta()
+        self.exchange = HyperliquidExchange(self.account, instance_url, meta=meta, spot_meta=spot_meta)
+        self.info = Info(instance_url, skip_ws=True, meta=meta, spot_meta=spot_meta)
+        self.transport.attach(self.exchange, self.exchange.info, self.info)
+        self.merger = ActionMerger(self.transport.limiter)
+        self.quantizer = Quantizer(self.precision_rule)
+        self._nonce = 0
+        self._nonce_lock = threading.Lock()
+        self.prefetched = PrefetchedState()
+        self.mirror: AccountMirror | None = None
+        if mirror:
+            self.start_mirror()
 
-            return 0
-        except Exception as e:
-            print(f"Failed to get asset contract rounding size: {e}")
-            return 0
+    @staticmethod
+    def metadata_snapshot_path(instance_url: str) -> str:
+        # Cloud Functions only allow writes to the temp directory, mainnet and testnet need separate snapshots
+        instance_hash = hashlib.sha1(instance_url.encode()).hexdigest()[:12]
+        return os.path.join(tempfile.gettempdir(), f"hyperliquid-meta-{instance_hash}.json")
 
-    def place_order(self, order: Order, reduce_only: bool = False, market: bool = False) -> dict:
-        contracts = order.contracts
+    def start_mirror(self) -> AccountMirror:
+        """
+        Keep positions and open orders in memory from the websocket, for long running processes.
+        State queries are answered from the mirror once it's synced, and over REST otherwise.
+        """
+        if self.mirror is None:
+            ws_url = "ws" + self.instance[len("http") :] + "/ws"
+            self.mirror = AccountMirror(
+                ws_url,
+                self.account.address,
+                lambda: self.fetch_account_snapshot(raise_errors=True),
+            )
+            self.mirror.start()
+
+        return self.mirror
+
+    def prefetch(self, max_age: float = 10.0) -> AccountSnapshot:
+        """
+        Refresh the account state, and the asset metadata if stale, ahead of expected alerts. The snapshot serves
+        `account_snapshot` calls for up to `max_age` seconds, see `PrefetchedState`.
+        """
+        if self.metadata.is_stale():
+            self.metadata.refresh()
+        snapshot = self.fetch_account_snapshot(raise_errors=True)
+        self.prefetched.store(snapshot, max_age)
+        return snapshot
 
-        # Hyperliquid requires contracts to be rounded to a specific decimal place
-        # `self.size_decimals` acts as local cache as the API can timeout,
+    def next_nonce(self) -> int:
+        # Hyperliquid rejects reused nonces, so concurrent actions can't rely on the millisecond clock alone
+        with self._nonce_lock:
+            self._nonce = max(get_timestamp_ms(), self._nonce + 1)
+            return self._nonce
+
+    def signed_action(self, action: dict) -> dict:
+        """
+        Sign an L1 action with a nonce unique to this client, returning the `/exchange` request payload.
+        """
+        nonce = self.next_nonce()
+        with recorder.time("sign"):
+            signature = sign_l1_action(
+                self.account,
+                action,
+                self.exchange.vault_address,
+                nonce,
+                self.exchange.expires_after,
+                self.instance == constants.MAINNET_API_URL,
+            )
+
+        return {
+            "action": action,
+            "nonce": nonce,
+            "signature": signature,
+            "vaultAddress": self.exchange.vault_address,
+            "expiresAfter": self.exchange.expires_after,
+        }
+
+    def post_action(self, action: dict) -> dict:
+        """
+        Sign and send an L1 action, safe to call from multiple threads.
+        """
+        payload = self.signed_action(action)
+        with recorder.time("exchange"):
+            return self.exchange.post("/exchange", payload)
+
+    def asset_contract_rounding_size(self, asset: str) -> int:
+        return self.quantizer.rule(asset).size_decimals
+
+    def precision_rule(self, asset: str) -> PrecisionRule:
+        # Hyperliquid requires contracts to be rounded to a specific decimal place.
+        # `self.metadata` serves this from memory (or a stale copy if the API times out),
         # worst case we round to 0 which works for all assets, but does oversize
-        if order.ticker in self.size_decimals:
-            rounding = self.size_decimals[order.ticker]
-            contracts = round(order.contracts, self.size_decimals[order.ticker])
-            print(f"Using local size decimals for {order.ticker} - {rounding}")
-        else:
-            rounding = self.asset_contract_rounding_size(order.ticker) or 0
-            contracts = round(order.contracts, rounding)
-            print(f"Using API size decimals for {order.ticker} - {rounding}")
+        asset_metadata = self.metadata.get(asset)
+        if asset_metadata is None:
+            logger.warning(f"No asset metadata for {asset}, defaulting size decimals to 0")
+            return PrecisionRule(price_decimals=MAX_PERP_PRICE_DECIMALS, size_decimals=0)
+
+        return asset_metadata.precision
+
+    def order_request(self, order: Order, reduce_only: bool = False) -> OrderRequest:
+        rule = self.quantizer.rule(order.ticker)
+
+        return limit_request(order, reduce_only, rule.price(order.price), rule.size(order.contracts))
 
+    def order_requests(self, orders: list[tuple[Order, bool]]) -> list[OrderRequest]:
+        """
+        `order_request` for a batch of orders, each asset's precision rule is looked up once.
+        """
+        quantized = self.quantizer.quantize_many((order.ticker, order.price, order.contracts) for order, _ in orders)
+        return [
+            limit_request(order, reduce_only, price, size)
+            for (order, reduce_only), (price, size) in zip(orders, quantized, strict=True)
+        ]
+
+    def protection_requests(self, order: Order) -> list[OrderRequest]:
+        """
+        Reduce-only stop loss and take profit triggers for the position `order` opens, at the distances set by
+        the alert's `stop_loss` and `take_profit`. Triggers execute as market orders, so they fill once hit.
+        """
+        rule = self.quantizer.rule(order.ticker)
+        # Sized to the resulting position, a reversal's order also closes the previous one
+        size = rule.size(abs(order.position_size) or order.contracts)
+        triggers = []
+        if order.stop_loss is not None:
+            triggers.append(("sl", rule.price(order.stop_loss_price())))
+        if order.take_profit is not None:
+            triggers.append(("tp", rule.price(order.take_profit_price())))
+
+        return [
+            {
+                "coin": order.ticker,
+                "is_buy": not order.is_buy(),
+                "sz": size,
+                "limit_px": price,
+                "order_type": {"trigger": {"triggerPx": price, "isMarket": True, "tpsl": tpsl}},
+                "reduce_only": True,
+            }
+            for tpsl, price in triggers
+        ]
+
+    def protected_order(self, order: Order, reduce_only: bool = False) -> tuple[list[OrderRequest], str]:
+        """
+        The order's requests and grouping, followed by its protective triggers if it opens a position.
+
+        Returns:
+            tuple[list[OrderRequest], str]: The requests, and "normalTpsl" if they include triggers, which are
+                then only placed alongside an accepted entry, or "na" otherwise.
+        """
+        requests = [self.order_request(order, reduce_only)]
+        if not reduce_only and order.position != Position.FLAT:
+            requests += self.protection_requests(order)
+
+        return requests, "normalTpsl" if len(requests) > 1 else "na"
+
+    def place_order(self, order: Order, reduce_only: bool = False, market: bool = False) -> dict:
         if market:
-            return self.exchange.market_open(order.ticker, order.is_buy(), order.contracts, None, slippage=0.01)
-        else:
-            return self.exchange.order(
-                order.ticker,
-                order.is_buy(),
-                contracts,
-                order.price,
-                {"limit": {"tif": "Gtc"}},
-                reduce_only=reduce_only,
-            )
+            contracts = self.quantizer.size(order.ticker, order.contracts)
+            return self.exchange.market_open(order.ticker, order.is_buy(), contracts, None, slippage=0.01)
+
+        requests, grouping = self.protected_order(order, reduce_only)
+        if grouping != "na":
+            # The entry and its triggers go in one signed action, so the position is never left unprotected
+            return self.post_action(self.order_action(requests, grouping))
+
+        return self.post_orders(requests)
 
-    def cancel_existing_orders(self, asset: str) -> list[str]:
-        orders: list[str] = []
+    def place_orders(self, orders: list[tuple[Order, bool]]) -> list[dict]:
+        if not orders:
+            return []
+
+        requests = self.order_requests(orders)
         try:
-            open_orders = self.info.open_orders(self.account.address)
-            for order in open_orders:
-                if order["coin"] == asset:
-                    print(f"- canceling order {order['side']} {order['oid']} for {order['coin']}")
-                    self.exchange.cancel(order["coin"], order["oid"])
-                    orders.append(order["oid"])
-            return orders
+            response = self.post_orders(requests)
         except Exception as e:
-            print(f"Failed to get user state, or cancel order: {e}")
-            return orders
+            logger.warning(f"Failed to place orders: {e}")
+            response = {"status": "err", "response": str(e)}
+
+        return action_statuses(response, len(orders))
+
+    def post_orders(self, requests: list[OrderRequest]) -> dict:
+        """
+        Send order requests as a single signed order action, returning the raw exchange response.
+        Near the rate limit, orders from concurrent callers are merged into one action (see `ActionMerger`).
+        """
+        if self.transport.limiter.congested():
+            return self.merger.submit("order", requests, lambda merged: self.post_action(self.order_action(merged)))
+
+        return self.post_action(self.order_action(requests))
+
+    def order_action(self, requests: list[OrderRequest], grouping: str = "na") -> dict:
+        # Built right before it's sent, from here on the prefetched state of these assets can't be trusted
+        self.prefetched.touch([request["coin"] for request in requests])
+        wires = [order_request_to_order_wire(request, self.info.name_to_asset(request["coin"])) for request in requests]
+        # As the SDK's `order_wires_to_order_action` builds it (key order is part of the signed hash), which doesn't
+        # take a grouping in older releases the requirements allow, e.g. 0.12.0
+        return {"type": "order", "orders": wires, "grouping": grouping}
+
+    def cancel_action(self, cancels: list[CancelRequest]) -> dict:
+        self.prefetched.touch([cancel["coin"] for cancel in cancels])
+        return {
+            "type": "cancel",
+            "cancels": [{"a": self.info.name_to_asset(cancel["coin"]), "o": cancel["oid"]} for cancel in cancels],
+        }
 
-    def close_positions(self, asset: str) -> bool:
-        # Implement position closing logic for Hyperliquid
-        pass
+    def account_snapshot(self, open_orders: bool = True, assets: list[str] | None = None) -> AccountSnapshot:
+        if self.mirror is not None and self.mirror.ready:
+            return self.mirror.snapshot()
 
-    def has_open_position(self, asset: str) -> Position:
+        snapshot = self.prefetched.get(assets)
+        if snapshot is not None:
+            return snapshot
+
+        return self.fetch_account_snapshot(open_orders)
+
+    def fetch_account_snapshot(self, open_orders: bool = True, raise_errors: bool = False) -> AccountSnapshot:
+        """
+        Query the account state over REST, bypassing the mirror.
+        Failed queries are treated as empty, unless `raise_errors` is set.
+        """
+        # Both queries are independent, so run them side by side rather than paying two round trips
+        user_state = _io_pool.submit(self.info.user_state, self.account.address)
+        orders = _io_pool.submit(self.info.open_orders, self.account.address) if open_orders else None
+
+        positions: dict[str, float] = {}
         try:
-            user_state = self.info.user_state(self.account.address)
-            for position in user_state["assetPositions"]:
-                if position["position"]["coin"] == asset and position["position"]["szi"]:
-                    # HL manages Position direction by positive/negative sizing
-                    # Return JSON has it as a string for some reason
-                    size = float(position["position"]["szi"])
-                    return Position.LONG if size > 0 else Position.SHORT
-
-            return Position.FLAT
+            positions = parse_positions(user_state.result())
         except Exception as e:
-            print(f"Failed to get user state: {e}")
-            return Position.FLAT
+            if raise_errors:
+                raise
+            logger.warning(f"Failed to get user state: {e}")
+
+        resting_orders: list[dict] | None = None
+        if orders is not None:
+            try:
+                resting_orders = orders.result()
+            except Exception as e:
+                if raise_errors:
+                    raise
+                logger.warning(f"Failed to get open orders: {e}")
+                resting_orders = []
+
+        return AccountSnapshot(positions=positions, open_orders=resting_orders, fetched_at=time.time())
 
-    def open_positions(self) -> dict[str, Position]:
-        user_state = self.info.user_state(self.account.address)
-        open_positions = {}
+    def cancel_existing_orders(self, asset: str, snapshot: AccountSnapshot | None = None) -> dict[int, str]:
+        if snapshot is None or snapshot.open_orders is None:
+            snapshot = self.account_snapshot()
 
-        for position in user_state["assetPositions"]:
-            direction = Position.LONG if float(position["position"]["szi"]) > 0 else Position.SHORT
-            open_positions[position["position"]["coin"]] = direction
+        cancels: list[CancelRequest] = []
+        for order in snapshot.orders_for(asset):
+            logger.info(f"- canceling order {order['side']} {order['oid']} for {order['coin']}")
+            cancels.append({"coin": order["coin"], "oid": order["oid"]})
+
+        return self.cancel_orders(cancels)
+
+    def cancel_orders(self, cancels: list[CancelRequest]) -> dict[int, str]:
+        """
+        Cancel orders in as few signed actions as possible.
+        Up to `cancel_batch_size` orders are cancelled in a single action, larger sets are split into
+        chunks which are sent concurrently.
+
+        Returns:
+            dict[int, str]: "success" or the exchange's error message, by order id.
+        """
+        if not cancels:
+            return {}
+
+        size = self.cancel_batch_size
+        chunks = [cancels[i : i + size] for i in range(0, len(cancels), size)]
+        if len(chunks) == 1:
+            responses = [self._cancel_chunk(chunks[0])]
+        else:
+            responses = [future.result() for future in [_io_pool.submit(self._cancel_chunk, c) for c in chunks]]
+
+        return cancel_results(chunks, responses)
+
+    def _cancel_chunk(self, cancels: list[CancelRequest]) -> dict:
+        try:
+            if self.transport.limiter.congested():
+                return self.merger.submit(
+                    "cancel", cancels, lambda merged: self.post_action(self.cancel_action(merged))
+                )
+            return self.post_action(self.cancel_action(cancels))
+        except Exception as e:
+            logger.warning(f"Failed to cancel orders: {e}")
+            return {"status": "err", "response": str(e)}
+
+    def close_positions(self, asset: str | None = None) -> FlattenResult:
+        start = time.perf_counter()
+        # Account state and mid prices are independent, so fetched side by side
+        mids = _io_pool.submit(self.info.all_mids)
+        snapshot = self.flatten_snapshot()
+
+        cancels = [
+            {"coin": o["coin"], "oid": o["oid"]}
+            for o in snapshot.open_orders or []
+            if asset is None or o["coin"] == asset
+        ]
+        exits, positions = self.exit_requests(snapshot, mids.result(), asset)
+
+        # Exits are reduce only, so resting orders can't affect them and both are sent at once
+        placed = _io_pool.submit(self.post_orders, exits) if exits else None
+        cancelled = self.cancel_orders(cancels)
+        if placed is not None:
+            try:
+                response = placed.result()
+            except Exception as e:
+                logger.warning(f"Failed to place exits: {e}")
+                response = {"status": "err", "response": str(e)}
+            positions.update(zip((e["coin"] for e in exits), action_statuses(response, len(exits)), strict=True))
+
+        return FlattenResult(positions, cancelled, elapsed_ms=(time.perf_counter() - start) * 1000)
+
+    def flatten_snapshot(self) -> AccountSnapshot:
+        """
+        Positions and open orders to flatten, a failed query raises rather than reporting nothing to close.
+        """
+        if self.mirror is not None and self.mirror.ready:
+            return self.mirror.snapshot()
+
+        return self.fetch_account_snapshot(raise_errors=True)
+
+    def exit_requests(
+        self, snapshot: AccountSnapshot, mids: dict[str, str], asset: str | None = None
+    ) -> tuple[list[OrderRequest], dict[str, dict]]:
+        """
+        Reduce-only IoC orders closing each position (or only `asset`'s), priced `exit_slippage` through the mid.
+
+        Returns:
+            tuple[list[OrderRequest], dict[str, dict]]: The exit orders, and an error by coin for positions
+                that can't be exited.
+        """
+        requests: list[OrderRequest] = []
+        errors: dict[str, dict] = {}
+        for coin, size in snapshot.positions.items():
+            if asset is not None and coin != asset:
+                continue
+            if coin not in mids:
+                errors[coin] = {"error": "No mid price"}
+                continue
+
+            is_buy = size < 0
+            rule = self.quantizer.rule(coin)
+            slippage = 1 + self.exit_slippage if is_buy else 1 - self.exit_slippage
+            requests.append(
+                {
+                    "coin": coin,
+                    "is_buy": is_buy,
+                    "sz": rule.size(abs(size)),
+                    "limit_px": rule.price(float(mids[coin]) * slippage),
+                    "order_type": {"limit": {"tif": "Ioc"}},
+                    "reduce_only": True,
+                }
+            )
+
+        return requests, errors
+
+    def has_open_position(self, asset: str, snapshot: AccountSnapshot | None = None) -> Position:
+        if snapshot is None:
+            snapshot = self.account_snapshot(open_orders=False)
+
+        return snapshot.position(asset)
+
+    def open_positions(self, snapshot: AccountSnapshot | None = None) -> dict[str, Position]:
+        if snapshot is None:
+            snapshot = self.account_snapshot(open_orders=False)
+
+        return {coin: snapshot.position(coin) for coin in snapshot.positions}
+
+
+def limit_request(order: Order, reduce_only: bool, price: float, size: float) -> OrderRequest:
+    """
+    A GTC limit order request for `order`, at an already quantized price and size.
+    """
+    return {
+        "coin": order.ticker,
+        "is_buy": order.is_buy(),
+        "sz": size,
+        "limit_px": price,
+        "order_type": {"limit": {"tif": "Gtc"}},
+        "reduce_only": reduce_only,
+    }
+
+
+def action_statuses(response: dict, count: int) -> list[str | dict]:
+    """
+    Extract the per-item statuses from a bulk action response.
+    A rejected action has a single error for the whole batch, which is repeated for every item.
+    """
+    if response.get("status") != "ok":
+        return [{"error": str(response.get("response"))}] * count
+
+    statuses = response["response"]["data"]["statuses"]
+    return statuses[:count] + [{"error": "missing status"}] * (count - len(statuses))
+
+
+def parse_positions(user_state: dict) -> dict[str, float]:
+    """
+    Extract the non-zero position sizes by coin from a `clearinghouseState` response.
+    """
+    positions: dict[str, float] = {}
+    for position in user_state["assetPositions"]:
+        # HL manages Position direction by positive/negative sizing
+        # Return JSON has it as a string for some reason
+        size = float(position["position"]["szi"])
+        if size:
+            positions[position["position"]["coin"]] = size
+
+    return positions
+
+
+def cancel_results(chunks: list[list[CancelRequest]], responses: list[dict]) -> dict[int, str]:
+    """
+    Map each chunk's cancel action response back to "success" or the error message, by order id.
+    """
+    results: dict[int, str] = {}
+    for chunk, response in zip(chunks, responses, strict=True):
+        for cancel, status in zip(chunk, action_statuses(response, len(chunk)), strict=True):
+            results[cancel["oid"]] = status if isinstance(status, str) else status.get("error", str(status))
 
-        return open_positions
+    return results
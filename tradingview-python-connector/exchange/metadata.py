@@ -0,0 +1,240 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable
+
+import msgspec
+
+from order.precision import PrecisionRule
+
+logger = logging.getLogger(__name__)
+
+# Hyperliquid perp prices may have at most 6 decimals, minus the asset's size decimals.
+# See: https://hyperliquid.gitbook.io/hyperliquid-docs/for-developers/api/tick-and-lot-size
+MAX_PERP_PRICE_DECIMALS = 6
+
+
+class AssetMetadata(msgspec.Struct, frozen=True):
+    """
+    Trading constraints for a single asset, derived from the exchange's `meta` universe.
+
+    Attributes:
+        name (str): The coin name, e.g. "SOL".
+        sz_decimals (int): Decimal places contract sizes must be rounded to.
+        max_leverage (int): Maximum leverage allowed for the asset.
+        price_decimals (int): Maximum decimal places allowed for prices.
+        only_isolated (bool): Whether the asset only supports isolated margin.
+        precision (PrecisionRule): Price tick and lot size rule, precomputed from the fields above.
+    """
+
+    name: str
+    sz_decimals: int
+    max_leverage: int
+    price_decimals: int
+    only_isolated: bool = False
+    precision: PrecisionRule | None = None
+
+
+class MetadataSnapshot(msgspec.Struct):
+    """
+    On-disk representation of the cache, allowing cold starts to skip the initial `meta` request.
+    """
+
+    fetched_at: float
+    universe: list[dict]
+    spot_meta: dict | None = None
+
+
+def index_universe(universe: list[dict]) -> dict[str, AssetMetadata]:
+    """
+    Build a lookup of coin name to `AssetMetadata` from a raw `meta()["universe"]` list.
+    """
+    index = {}
+    for asset_info in universe:
+        sz_decimals = asset_info["szDecimals"]
+        price_decimals = max(MAX_PERP_PRICE_DECIMALS - sz_decimals, 0)
+        index[asset_info["name"]] = AssetMetadata(
+            name=asset_info["name"],
+            sz_decimals=sz_decimals,
+            max_leverage=asset_info.get("maxLeverage", 1),
+            price_decimals=price_decimals,
+            only_isolated=asset_info.get("onlyIsolated", False),
+            precision=PrecisionRule(price_decimals=price_decimals, size_decimals=sz_decimals),
+        )
+
+    return index
+
+
+class AssetMetadataCache:
+    """
+    TTL cache of asset metadata, indexed by coin.
+
+    Lookups never wait on the exchange once the cache holds data: expired or missing entries are served
+    from the current (possibly stale) index while a single background refresh runs. Each successful
+    refresh is persisted to `snapshot_path`, which seeds the index on a cold start. Only a cold start
+    without a snapshot blocks on the exchange.
+
+    Args:
+        fetch (Callable[[], dict]): Returns the exchange `meta` response, e.g. `Info.meta`.
+        fetch_spot (Callable[[], dict] | None): Returns the exchange `spotMeta` response, kept alongside the
+            universe so SDK clients can be built from the snapshot too, see `sdk_meta`.
+        ttl (float): Seconds before the index is considered stale and refreshed in the background.
+        snapshot_path (str | None): File to persist the universe to, or None to disable persistence.
+        retry_interval (float): Minimum seconds between refresh attempts triggered by lookups, bounding
+            traffic when the exchange is failing or a ticker genuinely doesn't exist.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], dict],
+        fetch_spot: Callable[[], dict] | None = None,
+        ttl: float = 300.0,
+        snapshot_path: str | None = None,
+        retry_interval: float = 30.0,
+    ):
+        self._fetch = fetch
+        self._fetch_spot = fetch_spot
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self.retry_interval = retry_interval
+        self._attempted_at = 0.0
+        self._index: dict[str, AssetMetadata] = {}
+        self._universe: list[dict] = []
+        self._spot_meta: dict | None = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self._loaded = False
+
+    def get(self, coin: str) -> AssetMetadata | None:
+        """
+        Return the metadata for `coin`, or None if the exchange doesn't list it.
+        """
+        if not self._loaded:
+            self._load()
+
+        metadata = self._index.get(coin)
+        if (metadata is None or self.is_stale()) and time.time() - self._attempted_at > self.retry_interval:
+            self.refresh_async()
+
+        return metadata
+
+    def universe(self) -> list[dict]:
+        """
+        Return the raw universe backing the index, in exchange asset order.
+        """
+        if not self._loaded:
+            self._load()
+
+        return self._universe
+
+    def sdk_meta(self) -> tuple[dict, dict]:
+        """
+        The `meta` and `spotMeta` responses SDK clients are built from, served from the snapshot (refreshed in the
+        background once stale, like `get`). Only fetched straight away when the snapshot is missing either.
+
+        Raises:
+            Exception: If they had to be fetched and the exchange request failed.
+        """
+        if not self._loaded:
+            self._load()
+
+        if self._spot_meta is None:
+            self.refresh(raise_errors=True)
+        elif self.is_stale() and time.time() - self._attempted_at > self.retry_interval:
+            self.refresh_async()
+
+        return {"universe": self._universe}, self._spot_meta
+
+    def is_stale(self) -> bool:
+        return time.time() - self._fetched_at > self.ttl
+
+    def refresh(self, raise_errors: bool = False) -> bool:
+        """
+        Fetch the universe from the exchange and rebuild the index.
+        On failure the existing index is kept, so callers continue to be served stale data.
+
+        Args:
+            raise_errors (bool): Raise a failed request rather than keep serving stale data.
+
+        Returns:
+            bool: True if the index was refreshed, False otherwise.
+        """
+        self._attempted_at = time.time()
+        try:
+            universe = self._fetch()["universe"]
+            spot_meta = self._fetch_spot() if self._fetch_spot is not None else self._spot_meta
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.warning(f"Failed to refresh asset metadata, serving stale data: {e}")
+            return False
+
+        fetched_at = time.time()
+        self._swap(universe, fetched_at, spot_meta)
+        self._persist(MetadataSnapshot(fetched_at=fetched_at, universe=universe, spot_meta=spot_meta))
+        return True
+
+    def refresh_async(self) -> bool:
+        """
+        Refresh in a background thread unless a refresh is already running.
+
+        Returns:
+            bool: True if a refresh was started, False if one was already in progress.
+        """
+        if not self._refreshing.acquire(blocking=False):
+            return False
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing.release()
+
+        threading.Thread(target=run, name="asset-metadata-refresh", daemon=True).start()
+        return True
+
+    def _load(self):
+        with self._lock:
+            if self._loaded:
+                return
+
+            snapshot = self._read_snapshot()
+            if snapshot is not None:
+                self._swap(snapshot.universe, snapshot.fetched_at, snapshot.spot_meta)
+            else:
+                self.refresh()
+
+            self._loaded = True
+
+    def _swap(self, universe: list[dict], fetched_at: float, spot_meta: dict | None = None):
+        # Replace references wholesale so concurrent readers never observe a partially built index
+        self._index = index_universe(universe)
+        self._universe = universe
+        self._spot_meta = spot_meta
+        self._fetched_at = fetched_at
+
+    def _read_snapshot(self) -> MetadataSnapshot | None:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return None
+
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                return msgspec.json.decode(f.read(), type=MetadataSnapshot)
+        except (OSError, msgspec.DecodeError) as e:
+            logger.warning(f"Ignoring unreadable asset metadata snapshot {self.snapshot_path}: {e}")
+            return None
+
+    def _persist(self, snapshot: MetadataSnapshot):
+        if not self.snapshot_path:
+            return
+
+        # Write to a temporary file first so a crash never leaves a truncated snapshot behind
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(msgspec.json.encode(snapshot))
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Failed to persist asset metadata snapshot: {e}")
@@ -0,0 +1,221 @@
+import json
+import logging
+import threading
+import time
+from typing import Callable
+
+import websocket
+
+from exchange.snapshot import AccountSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Positions are compared as floats parsed from strings, allow for representation error
+SIZE_TOLERANCE = 1e-9
+
+
+class AccountMirror:
+    """
+    In-memory mirror of an account's positions and open orders, fed by Hyperliquid's websocket.
+
+    Subscribes to the user's order updates, fills and events, and applies each message to a lock-protected
+    copy of the account. The mirror is resynced over REST (via `resync`) on every (re)connect, and whenever a
+    gap is detected: a fill whose starting position doesn't match the mirrored size, or a liquidation. A failed
+    resync is retried while connected, backing off from `retry_delay` up to `max_retry_delay` seconds.
+
+    Until the first resync completes, and while disconnected, `ready` is False and callers should fall back to
+    querying the exchange.
+
+    Args:
+        ws_url (str): Websocket endpoint, e.g. "wss://api.hyperliquid.xyz/ws".
+        address (str): The account address to subscribe to.
+        resync (Callable[[], AccountSnapshot]): Fetches positions and open orders over REST.
+        ping_interval (float): Seconds between application level pings, Hyperliquid drops idle connections.
+        reconnect_delay (float): Seconds to wait before reconnecting after the connection drops.
+        retry_delay (float): Seconds to wait before retrying a failed resync, doubled after each failure.
+        max_retry_delay (float): Longest wait between resync retries.
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        address: str,
+        resync: Callable[[], AccountSnapshot],
+        ping_interval: float = 50.0,
+        reconnect_delay: float = 1.0,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0,
+    ):
+        self.ws_url = ws_url
+        self.address = address
+        self.ping_interval = ping_interval
+        self.reconnect_delay = reconnect_delay
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.resyncs = 0
+        self._next_retry_delay = retry_delay
+        self._resync = resync
+        self._positions: dict[str, float] = {}
+        self._orders: dict[int, dict] = {}
+        self._lock = threading.Lock()
+        self._resyncing = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._ws: websocket.WebSocketApp | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="account-mirror", daemon=True)
+        self._thread.start()
+        threading.Thread(target=self._heartbeat, name="account-mirror-ping", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        self._ready.clear()
+        if self._ws is not None:
+            self._ws.close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def snapshot(self) -> AccountSnapshot:
+        with self._lock:
+            return AccountSnapshot(
+                positions=dict(self._positions),
+                open_orders=list(self._orders.values()),
+                fetched_at=time.time(),
+            )
+
+    def resync(self):
+        """
+        Replace the mirrored state with a fresh REST snapshot. Concurrent requests share a single resync, a failed
+        one is retried in the background.
+        """
+        if not self._resyncing.acquire(blocking=False):
+            return
+
+        retry = None
+        try:
+            snapshot = self._resync()
+            with self._lock:
+                self._positions = dict(snapshot.positions)
+                self._orders = {order["oid"]: order for order in snapshot.open_orders or []}
+            self.resyncs += 1
+            self._next_retry_delay = self.retry_delay
+            self._ready.set()
+        except Exception as e:
+            retry = self._next_retry_delay
+            self._next_retry_delay = min(retry * 2, self.max_retry_delay)
+            logger.warning(f"Failed to resync account mirror, retrying in {retry:g}s: {e}")
+            self._ready.clear()
+        finally:
+            self._resyncing.release()
+
+        if retry is not None:
+            self._resync_async(delay=retry)
+
+    def handle_message(self, message: dict):
+        channel = message.get("channel")
+        data = message.get("data")
+        if channel == "orderUpdates":
+            self._apply_order_updates(data)
+        elif channel == "userFills":
+            # The initial snapshot of historical fills is already reflected by the REST resync
+            if not data.get("isSnapshot"):
+                self._apply_fills(data["fills"])
+        elif channel == "user":
+            # Fills are handled via `userFills`, other events change positions or orders behind our back
+            if "liquidation" in data or "nonUserCancel" in data:
+                logger.warning("Account mirror received liquidation or non-user cancel, resyncing")
+                self._resync_async()
+
+    def _apply_order_updates(self, updates: list[dict]):
+        with self._lock:
+            for update in updates:
+                order = update["order"]
+                if update["status"] == "open":
+                    self._orders[order["oid"]] = order
+                else:
+                    self._orders.pop(order["oid"], None)
+
+    def _apply_fills(self, fills: list[dict]):
+        gap = False
+        with self._lock:
+            for fill in fills:
+                coin = fill["coin"]
+                start = float(fill["startPosition"])
+                if abs(self._positions.get(coin, 0.0) - start) > SIZE_TOLERANCE:
+                    gap = True
+
+                # HL manages Position direction by positive/negative sizing, "B" fills are buys
+                size = start + (float(fill["sz"]) if fill["side"] == "B" else -float(fill["sz"]))
+                if abs(size) > SIZE_TOLERANCE:
+                    self._positions[coin] = size
+                else:
+                    self._positions.pop(coin, None)
+
+        if gap:
+            logger.warning("Account mirror detected a gap in fills, resyncing")
+            self._resync_async()
+
+    def _resync_async(self, delay: float = 0.0):
+        def run():
+            # A reconnect resyncs anyway, and the mirror mustn't become ready while disconnected
+            if not self._stop.wait(delay) and self._connected():
+                self.resync()
+
+        threading.Thread(target=run, name="account-mirror-resync", daemon=True).start()
+
+    def _connected(self) -> bool:
+        ws = self._ws
+        return ws is not None and ws.sock is not None and ws.sock.connected
+
+    def _subscribe(self, ws: websocket.WebSocketApp):
+        for subscription in ("orderUpdates", "userFills", "userEvents"):
+            ws.send(json.dumps({"method": "subscribe", "subscription": {"type": subscription, "user": self.address}}))
+
+        # Subscribe first so no update is missed between the REST snapshot and the stream
+        self.resync()
+
+    def _on_message(self, _ws: websocket.WebSocketApp, message: str):
+        if not message.startswith("{"):
+            return
+
+        try:
+            self.handle_message(json.loads(message))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Account mirror failed to apply message, resyncing: {e}")
+            self._resync_async()
+
+    def _on_close(self, *_args):
+        self._ready.clear()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._ws = websocket.WebSocketApp(
+                self.ws_url,
+                on_open=self._subscribe,
+                on_message=self._on_message,
+                on_close=self._on_close,
+                on_error=lambda _ws, e: logger.warning(f"Account mirror websocket error: {e}"),
+            )
+            # Bounds how long the read loop blocks, so `stop` takes effect without waiting for a message
+            self._ws.run_forever(ping_timeout=1)
+            self._ready.clear()
+            self._stop.wait(self.reconnect_delay)
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.ping_interval):
+            ws = self._ws
+            if ws is not None and ws.sock is not None and ws.sock.connected:
+                try:
+                    ws.send(json.dumps({"method": "ping"}))
+                except websocket.WebSocketException:
+                    pass
@@ -0,0 +1,147 @@
+import logging
+import math
+import threading
+import time
+from typing import Callable
+
+import msgspec
+
+from exchange.snapshot import AccountSnapshot
+from metrics.latency import recorder
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchSchedule(msgspec.Struct, frozen=True):
+    """
+    When alerts are expected, i.e. the strategies' bar boundaries.
+
+    Attributes:
+        interval (float): Bar length in seconds, e.g. 3600 for hourly bars.
+        lead (float): Seconds before each boundary to prefetch at.
+        max_age (float): Seconds a prefetched snapshot may serve alerts for, the bound on how stale their view of
+            the account can be.
+        offset (float): Seconds boundaries are offset from the Unix epoch, e.g. for bars not aligned to UTC hours.
+    """
+
+    interval: float
+    lead: float = 3.0
+    max_age: float = 10.0
+    offset: float = 0.0
+
+    def next_boundary(self, now: float) -> float:
+        return math.floor((now - self.offset) / self.interval + 1) * self.interval + self.offset
+
+
+class PrefetchedState:
+    """
+    The latest prefetched account snapshot, served in place of a fresh query while it's younger than `max_age`
+    and no action has been sent for the assets a caller is about to act on.
+
+    Actions are recorded (`touch`) before they're sent, so an alert never decides against a prefetched position
+    an earlier alert has since changed. Fills of resting orders aren't seen, which `max_age` bounds.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self._snapshot: AccountSnapshot | None = None
+        self._max_age = 0.0
+        self._touched: set[str] = set()
+        self._lock = threading.Lock()
+
+    def store(self, snapshot: AccountSnapshot, max_age: float):
+        with self._lock:
+            self._snapshot = snapshot
+            self._max_age = max_age
+            self._touched = set()
+
+    def touch(self, assets: list[str]):
+        with self._lock:
+            if self._snapshot is not None:
+                self._touched.update(assets)
+
+    def get(self, assets: list[str] | None) -> AccountSnapshot | None:
+        """
+        Returns:
+            AccountSnapshot | None: The prefetched snapshot if it can serve a caller acting on `assets`, callers
+                that don't say which assets they act on are never served.
+        """
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or assets is None or time.time() - snapshot.fetched_at > self._max_age:
+                return None
+            if self._touched.intersection(assets):
+                return None
+            self.hits += 1
+
+        return snapshot
+
+
+class PrefetchScheduler:
+    """
+    Background thread refreshing state shortly before each bar boundary, so the burst of alerts that follows
+    finds fresh account state and metadata in memory, and warm connections to the exchange.
+
+    Args:
+        prefetch (Callable[[], None]): Fetches and stores the state, e.g. `Hyperliquid.prefetch`.
+        schedule (PrefetchSchedule): When to run.
+        clock (Callable[[], float]): Current Unix time.
+    """
+
+    def __init__(
+        self,
+        prefetch: Callable[[], None],
+        schedule: PrefetchSchedule,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.prefetch = prefetch
+        self.schedule = schedule
+        self.clock = clock
+        self.runs = 0
+        self.failures = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "PrefetchScheduler":
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="prefetch-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def next_run(self, now: float, last_boundary: float = 0.0) -> tuple[float, float]:
+        """
+        Returns:
+            tuple[float, float]: When to prefetch next and the boundary it's for. Started within `lead` of a
+                boundary not yet prefetched for, that's straight away.
+        """
+        boundary = self.schedule.next_boundary(now)
+        # Compared with a margin, boundaries are floats computed in different ways
+        if boundary - last_boundary < self.schedule.interval / 2:
+            boundary += self.schedule.interval
+
+        return max(now, boundary - self.schedule.lead), boundary
+
+    def run_once(self):
+        try:
+            with recorder.time("prefetch"):
+                self.prefetch()
+            self.runs += 1
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Prefetch failed, alerts will query the exchange: {e}")
+
+    def _run(self):
+        boundary = 0.0
+        while not self._stop.is_set():
+            at, boundary = self.next_run(self.clock(), boundary)
+            if self._stop.wait(max(0.0, at - self.clock())):
+                return
+            self.run_once()
+
+    def stats(self) -> dict:
+        return {"runs": self.runs, "failures": self.failures}
@@ -0,0 +1,267 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable
+
+from metrics.latency import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Hyperliquid allows 1200 weight of REST requests per minute per IP address
+DEFAULT_WEIGHT_PER_MINUTE = 1200
+# `/info` request types weighing 2, every other type weighs 20
+LIGHT_INFO_TYPES = frozenset(
+    {"allMids", "clearinghouseState", "exchangeStatus", "l2Book", "orderStatus", "spotClearinghouseState"}
+)
+LIGHT_INFO_WEIGHT = 2
+INFO_WEIGHT = 20
+# An `/exchange` action weighs 1, plus 1 for every 40 orders or cancels it batches
+ACTION_BATCH_WEIGHT = 40
+
+# Lower runs first, actions change positions so they're never held up by a queue of state queries
+ACTION_PRIORITY = 0
+INFO_PRIORITY = 1
+
+
+def request_weight(path: str, payload: dict | None) -> int:
+    """
+    The rate limit weight Hyperliquid charges for a request.
+    """
+    payload = payload or {}
+    if path == "/exchange":
+        action = payload.get("action", {})
+        items = action.get("orders") or action.get("cancels") or []
+        return 1 + len(items) // ACTION_BATCH_WEIGHT
+    if path == "/info":
+        return LIGHT_INFO_WEIGHT if payload.get("type") in LIGHT_INFO_TYPES else INFO_WEIGHT
+
+    return INFO_WEIGHT
+
+
+def request_priority(path: str) -> int:
+    return ACTION_PRIORITY if path == "/exchange" else INFO_PRIORITY
+
+
+class RateLimiter:
+    """
+    Token bucket holding a minute's worth of request weight, refilled continuously.
+
+    Requests that can't be afforded queue by priority, then arrival, so orders and cancels overtake queued
+    state queries. The limit is per IP address, so a single limiter (`limiter`) is shared by every client in
+    the process.
+
+    Args:
+        weight_per_minute (int): The exchange's limit, 0 disables limiting.
+        headroom (float): Fraction of the bucket below which it's considered congested, see `congested`.
+    """
+
+    def __init__(self, weight_per_minute: int = DEFAULT_WEIGHT_PER_MINUTE, headroom: float = 0.1):
+        self.headroom = headroom
+        self.waits = Histogram()
+        self.throttled = 0
+        self._waiters: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self.configure(weight_per_minute)
+
+    def configure(self, weight_per_minute: int):
+        with self._condition:
+            self.capacity = float(weight_per_minute)
+            self.rate = weight_per_minute / 60.0
+            self.tokens = self.capacity
+            self.updated = time.monotonic()
+            self._condition.notify_all()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, weight: int, priority: int = INFO_PRIORITY) -> float:
+        """
+        Block until `weight` can be spent and no higher priority (or earlier) request is waiting, then spend it.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        if not self.enabled:
+            return 0.0
+
+        weight = min(weight, self.capacity)
+        start = time.monotonic()
+        with self._condition:
+            waiter = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, waiter)
+            try:
+                while True:
+                    self._refill()
+                    first = self._waiters[0] == waiter
+                    if first and self.tokens >= weight:
+                        break
+                    # Only the first waiter knows when it can go, the rest are woken as it leaves
+                    self._condition.wait((weight - self.tokens) / self.rate if first else None)
+            finally:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+            self.tokens -= weight
+
+        waited = time.monotonic() - start
+        self.waits.record(waited * 1000)
+        return waited
+
+    def try_acquire(self, weight: int, priority: int = INFO_PRIORITY) -> bool:
+        """
+        Spend `weight` if it can be without waiting, e.g. before falling back to `acquire` on a thread.
+        """
+        if not self.enabled:
+            return True
+
+        with self._condition:
+            self._refill()
+            if self._waiters or self.tokens < min(weight, self.capacity):
+                return False
+            self.tokens -= min(weight, self.capacity)
+
+        self.waits.record(0.0)
+        return True
+
+    def wait(self, weight: int, priority: int = INFO_PRIORITY):
+        """
+        Block until `weight` could be spent, without spending it.
+        """
+        if self.enabled:
+            self.acquire(weight, priority)
+            self.refund(weight)
+
+    def refund(self, weight: int):
+        with self._condition:
+            self.tokens = min(self.capacity, self.tokens + weight)
+            self._condition.notify_all()
+
+    def throttle(self):
+        """
+        Empty the bucket after the exchange throttled a request, its count of our usage is authoritative.
+        """
+        with self._condition:
+            self.throttled += 1
+            self.tokens = min(self.tokens, 0.0)
+
+    def congested(self) -> bool:
+        """
+        Whether requests are queueing, or the bucket is nearly empty and soon will be.
+        """
+        if not self.enabled:
+            return False
+
+        with self._condition:
+            self._refill()
+            return bool(self._waiters) or self.tokens < self.capacity * self.headroom
+
+    def stats(self) -> dict:
+        with self._condition:
+            self._refill()
+            tokens, depth = self.tokens, len(self._waiters)
+
+        return {
+            "tokens": round(tokens, 1),
+            "queue_depth": depth,
+            "throttled": self.throttled,
+            "wait_ms": self.waits.export(),
+        }
+
+
+class _Batch:
+    def __init__(self):
+        self.items: list = []
+        self.done = threading.Event()
+        self.response: dict | None = None
+        self.error: Exception | None = None
+
+
+class ActionMerger:
+    """
+    Merges compatible actions (e.g. orders from concurrent alerts) into one bulk action while the rate limiter
+    is congested, so a burst costs one action's weight rather than one per alert.
+
+    The first caller for a kind leads a batch: it waits for the limiter to admit an action, meanwhile any other
+    callers join its batch, then it sends the merged items once and hands each caller its share of the statuses.
+
+    Args:
+        limiter (RateLimiter): Decides how long a batch stays open.
+        max_items (int): Items per merged action, beyond which it'd cost extra weight.
+        linger (float): Minimum seconds a batch stays open, so callers arriving together are merged even if the
+            limiter admits the action straight away.
+    """
+
+    def __init__(self, limiter: RateLimiter, max_items: int = ACTION_BATCH_WEIGHT - 1, linger: float = 0.01):
+        self.limiter = limiter
+        self.max_items = max_items
+        self.linger = linger
+        self.merged = 0
+        self._open: dict[str, _Batch] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, items: list, send: Callable[[list], dict]) -> dict:
+        """
+        Send `items` as part of a merged action of the same kind.
+
+        Args:
+            kind (str): Actions of the same kind can be merged, e.g. "order" or "cancel".
+            items (list): This caller's orders or cancels.
+            send (Callable[[list], dict]): Signs and sends an action for the merged items.
+
+        Returns:
+            dict: The exchange response, with only this caller's statuses.
+        """
+        with self._lock:
+            batch = self._open.get(kind)
+            leader = batch is None or len(batch.items) + len(items) > self.max_items
+            if leader:
+                batch = _Batch()
+                self._open[kind] = batch
+            else:
+                self.merged += 1
+            offset = len(batch.items)
+            batch.items.extend(items)
+
+        if leader:
+            time.sleep(self.linger)
+            self.limiter.wait(1, ACTION_PRIORITY)
+            with self._lock:
+                if self._open.get(kind) is batch:
+                    del self._open[kind]
+            try:
+                batch.response = send(batch.items)
+            except Exception as e:
+                batch.error = e
+            batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+
+        return split_response(batch.response, offset, len(items))
+
+
+def split_response(response: dict, offset: int, count: int) -> dict:
+    """
+    Take one caller's share of a merged action's response, an error applies to every caller.
+    """
+    if response.get("status") != "ok" or "data" not in response.get("response", {}):
+        return response
+
+    statuses = response["response"]["data"]["statuses"]
+    data = {**response["response"]["data"], "statuses": statuses[offset : offset + count]}
+    return {**response, "response": {**response["response"], "data": data}}
+
+
+limiter = RateLimiter()
@@ -0,0 +1,189 @@
+import asyncio
+import importlib
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Callable
+
+from hyperliquid.utils import constants
+
+from metrics.latency import recorder
+
+if TYPE_CHECKING:
+    from exchange.async_hyperliquid import AsyncHyperliquid
+    from exchange.hyperliquid import Hyperliquid
+
+logger = logging.getLogger(__name__)
+
+# Imported on first use rather than at start up: the SDK, `eth_account` and `aiohttp` are most of a cold start
+PREWARM_MODULES = ("exchange.hyperliquid", "exchange.async_hyperliquid")
+
+
+def create_client(secret_file: str, instance_url: str) -> "Hyperliquid":
+    from exchange.hyperliquid import Hyperliquid
+
+    return Hyperliquid(secret_file, instance_url)
+
+
+def create_async_client(client: "Hyperliquid") -> "AsyncHyperliquid":
+    from exchange.async_hyperliquid import AsyncHyperliquid
+
+    return AsyncHyperliquid(client)
+
+
+def prewarm(modules: tuple[str, ...] = PREWARM_MODULES) -> float:
+    """
+    Import the client modules a request hasn't needed yet, so a later request doesn't pay for them.
+
+    Returns:
+        float: Seconds taken.
+    """
+    start = time.perf_counter()
+    with recorder.time("prewarm"):
+        for module in modules:
+            importlib.import_module(module)
+
+    return time.perf_counter() - start
+
+
+class ClientRegistry:
+    """
+    Process-wide cache of warmed `Hyperliquid` clients.
+
+    Creating a client reads the secret, derives the account from the mnemonic and builds the SDK
+    `Exchange`/`Info` objects (which fetch exchange metadata). Warm invocations should pay none of this,
+    so clients are created lazily on first use and reused until explicitly invalidated.
+
+    Clients are keyed by `(secret_file, instance_url)`. Creation is guarded by a per-key lock, so
+    concurrent requests for the same account build it once, while other accounts are not blocked.
+
+    The client modules themselves are imported by the first request needing them, and the rest in the background
+    once a request has been served. See `start_prewarm`.
+    """
+
+    def __init__(self, factory: Callable[[str, str], "Hyperliquid"] = create_client):
+        self._factory = factory
+        self._clients: dict[tuple[str, str], "Hyperliquid"] = {}
+        self._key_locks: dict[tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._prewarm: threading.Thread | None = None
+
+    def get(self, secret_file: str, instance_url: str = constants.MAINNET_API_URL) -> "Hyperliquid":
+        """
+        Return the client for the given secret and instance, creating it on first use.
+        """
+        key = (secret_file, instance_url)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._factory(secret_file, instance_url)
+                self._clients[key] = client
+
+        return client
+
+    def clients(self) -> list["Hyperliquid"]:
+        """
+        Return the clients created so far, without creating any.
+        """
+        with self._lock:
+            return list(self._clients.values())
+
+    def invalidate(self, secret_file: str | None = None, instance_url: str | None = None) -> int:
+        """
+        Drop cached clients, e.g. after rotating a secret. Omitted arguments match any value.
+
+        Returns:
+            int: The number of clients removed.
+        """
+        with self._lock:
+            keys = [
+                key
+                for key in self._clients
+                if (secret_file is None or key[0] == secret_file) and (instance_url is None or key[1] == instance_url)
+            ]
+            for key in keys:
+                del self._clients[key]
+
+        return len(keys)
+
+    def refresh(self, secret_file: str, instance_url: str = constants.MAINNET_API_URL) -> "Hyperliquid":
+        """
+        Rebuild the client for the given secret and instance, replacing any cached one.
+        """
+        self.invalidate(secret_file, instance_url)
+        return self.get(secret_file, instance_url)
+
+    def start_prewarm(self, modules: tuple[str, ...] = PREWARM_MODULES) -> threading.Thread:
+        """
+        Import `modules` on a background thread, once per process. Called after each request, so the imports
+        never compete with the first request for the CPU.
+
+        Returns:
+            threading.Thread: The pre-warming thread, already started by an earlier call or this one.
+        """
+        with self._lock:
+            if self._prewarm is None:
+                self._prewarm = threading.Thread(target=self._run_prewarm, args=(modules,), name="prewarm", daemon=True)
+                self._prewarm.start()
+
+        return self._prewarm
+
+    @staticmethod
+    def _run_prewarm(modules: tuple[str, ...]):
+        try:
+            logger.info(f"Pre-warmed client modules in {prewarm(modules) * 1000:.0f}ms")
+        except Exception as e:
+            logger.warning(f"Pre-warming client modules failed, they'll be imported on first use: {e}")
+
+
+class AsyncClientRegistry:
+    """
+    Cache of `AsyncHyperliquid` clients for a single event loop, wrapping the warmed clients of a `ClientRegistry`.
+
+    Building the underlying client blocks on network calls, so it runs on the default executor while the loop
+    keeps serving other requests. Concurrent requests for the same account wait on one build.
+    """
+
+    def __init__(
+        self,
+        clients: ClientRegistry,
+        factory: Callable[["Hyperliquid"], "AsyncHyperliquid"] = create_async_client,
+    ):
+        self._sync_clients = clients
+        self._factory = factory
+        self._clients: dict[tuple[str, str], "AsyncHyperliquid"] = {}
+        self._key_locks: dict[tuple[str, str], asyncio.Lock] = {}
+
+    async def get(self, secret_file: str, instance_url: str = constants.MAINNET_API_URL) -> "AsyncHyperliquid":
+        key = (secret_file, instance_url)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        async with self._key_locks.setdefault(key, asyncio.Lock()):
+            client = self._clients.get(key)
+            if client is None:
+                sync_client = await asyncio.to_thread(self._sync_clients.get, secret_file, instance_url)
+                client = self._factory(sync_client)
+                self._clients[key] = client
+
+        return client
+
+    async def close(self):
+        """
+        Close every client's connections, e.g. when the event loop shuts down.
+        """
+        clients = list(self._clients.values())
+        self._clients.clear()
+        await asyncio.gather(*(client.close() for client in clients))
+
+
+registry = ClientRegistry()
+async_registry = AsyncClientRegistry(registry)
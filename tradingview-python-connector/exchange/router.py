@@ -0,0 +1,141 @@
+import asyncio
+import copy
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable
+
+import msgspec
+
+from order.order import Order
+from order.precision import DEFAULT_RULE
+
+logger = logging.getLogger(__name__)
+
+
+class Target(msgspec.Struct, frozen=True):
+    """
+    An account every alert is mirrored to.
+
+    Attributes:
+        name (str): Identifies the account in responses, logs and metrics.
+        secret_file (str): File containing the account mnemonic.
+        multiplier (float): Scales each alert's size for this account, e.g. 0.5 for an account half the size.
+        instance_url (str | None): API URL, the default instance if None.
+    """
+
+    name: str
+    secret_file: str
+    multiplier: float = 1.0
+    instance_url: str | None = None
+
+    def __post_init__(self):
+        if self.multiplier <= 0:
+            raise ValueError("Multiplier must be positive")
+
+
+class TargetResult(msgspec.Struct):
+    """
+    The outcome of an alert for one target.
+
+    Attributes:
+        target (str): The target's name.
+        success (bool): Whether the target's work completed without raising.
+        elapsed_ms (float): Wall time spent on the target, including any wait for a worker.
+        response (Any): What the target's work returned.
+        error (str | None): Why it failed, if it did.
+    """
+
+    target: str
+    success: bool
+    elapsed_ms: float
+    response: Any = None
+    error: str | None = None
+
+
+targets_decoder = msgspec.json.Decoder(list[Target])
+
+
+class Router:
+    """
+    Mirrors each alert to several accounts at once, so one alert reaches every account in roughly the time of the
+    slowest rather than the sum.
+
+    Work for the first target runs on the calling thread and the rest on a bounded pool. A failing target doesn't
+    affect the others, its error is returned in its `TargetResult`.
+
+    Args:
+        targets (list[Target]): The accounts to mirror alerts to.
+        max_workers (int): Upper bound on targets worked on at once besides the calling thread's.
+    """
+
+    def __init__(self, targets: list[Target], max_workers: int = 8):
+        if not targets:
+            raise ValueError("At least one target is required")
+        names = [target.name for target in targets]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Target names must be unique: {names}")
+
+        self.targets = targets
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(targets) - 1)), thread_name_prefix="router"
+        )
+
+    @staticmethod
+    def scale(order: Order, target: Target) -> Order:
+        """
+        Returns:
+            Order: A copy of `order` sized for `target`. Always a copy, as placing an order may adjust its size.
+        """
+        scaled = copy.copy(order)
+        if target.multiplier != 1.0:
+            scaled.contracts = DEFAULT_RULE.size(order.contracts * target.multiplier)
+            scaled.position_size = order.position_size * target.multiplier
+
+        return scaled
+
+    def fan_out(self, work: Callable[[Target], Any]) -> list[TargetResult]:
+        """
+        Run `work` for every target concurrently.
+
+        Returns:
+            list[TargetResult]: The outcome for each target, in the order targets were configured.
+        """
+        start = time.perf_counter()
+        futures = [self._pool.submit(self._run, work, target, start) for target in self.targets[1:]]
+        first = self._run(work, self.targets[0], start)
+        return [first, *(future.result() for future in futures)]
+
+    async def fan_out_async(self, work: Callable[[Target], Awaitable[Any]]) -> list[TargetResult]:
+        """
+        Asyncio variant of `fan_out`, every target's work runs on the event loop.
+        """
+        return list(await asyncio.gather(*(self._run_async(work, target) for target in self.targets)))
+
+    def _run(self, work: Callable[[Target], Any], target: Target, start: float) -> TargetResult:
+        try:
+            return self._result(target, start, response=work(target))
+        except Exception as e:
+            logger.exception(f"Alert failed for target {target.name}")
+            return self._result(target, start, error=e)
+
+    async def _run_async(self, work: Callable[[Target], Awaitable[Any]], target: Target) -> TargetResult:
+        start = time.perf_counter()
+        try:
+            return self._result(target, start, response=await work(target))
+        except Exception as e:
+            logger.exception(f"Alert failed for target {target.name}")
+            return self._result(target, start, error=e)
+
+    @staticmethod
+    def _result(target: Target, start: float, response: Any = None, error: Exception | None = None) -> TargetResult:
+        return TargetResult(
+            target=target.name,
+            success=error is None,
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+            response=response,
+            error=None if error is None else str(error),
+        )
+
+    def close(self):
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,31 @@
+import msgspec
+
+from order.position import Position
+
+
+class AccountSnapshot(msgspec.Struct):
+    """
+    Point-in-time view of an account's positions and resting orders.
+
+    Fetched once per request via `Exchange.account_snapshot`, then passed to the exchange helpers
+    so a single webhook never queries the same state twice.
+
+    Attributes:
+        positions (dict[str, float]): Signed position size by coin, positive for long and negative for short.
+        open_orders (list[dict] | None): Resting orders, or None if they weren't requested.
+        fetched_at (float): Unix timestamp of when the snapshot was taken.
+    """
+
+    positions: dict[str, float]
+    open_orders: list[dict] | None = None
+    fetched_at: float = 0.0
+
+    def position(self, asset: str) -> Position:
+        size = self.positions.get(asset, 0.0)
+        if size == 0:
+            return Position.FLAT
+
+        return Position.LONG if size > 0 else Position.SHORT
+
+    def orders_for(self, asset: str) -> list[dict]:
+        return [order for order in self.open_orders or [] if order["coin"] == asset]
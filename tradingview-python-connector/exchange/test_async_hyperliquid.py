@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import pytest
+from eth_account import Account
+
+from benchmarks.mock_exchange import MockExchange, MockExchangeServer
+from exchange.async_hyperliquid import AsyncHyperliquid
+from exchange.hyperliquid import Hyperliquid
+from order.order import Order
+from order.position import Position
+
+
+@pytest.fixture
+def mock():
+    return MockExchange(rest_limit_orders=True)
+
+
+@pytest.fixture
+def server(mock: MockExchange):
+    server = MockExchangeServer(mock).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(server: MockExchangeServer, tmp_path) -> Hyperliquid:
+    Account.enable_unaudited_hdwallet_features()
+    _, mnemonic = Account.create_with_mnemonic()
+    secret = tmp_path / "secret.txt"
+    secret.write_text(mnemonic)
+    return Hyperliquid(str(secret), server.url)
+
+
+def order(ticker: str, action: str, price: float) -> Order:
+    return Order(
+        id="1",
+        action=action,
+        contracts=1.0,
+        ticker=ticker,
+        position=Position.LONG,
+        previous_position=Position.FLAT,
+        position_size=1.0,
+        price=price,
+    )
+
+
+def test_snapshot_queries_run_concurrently(server: MockExchangeServer, mock: MockExchange, client: Hyperliquid):
+    mock.positions["SOL"] = -2.0
+    server.latency_ms = 100
+
+    async def run():
+        exchange = AsyncHyperliquid(client)
+        start = time.perf_counter()
+        snapshot = await exchange.account_snapshot()
+        elapsed = time.perf_counter() - start
+        await exchange.close()
+        return snapshot, elapsed
+
+    snapshot, elapsed = asyncio.run(run())
+    assert snapshot.position("SOL") == Position.SHORT
+    assert snapshot.open_orders == []
+    assert elapsed < 0.19
+
+
+def test_place_and_cancel_orders(mock: MockExchange, client: Hyperliquid):
+    async def run():
+        exchange = AsyncHyperliquid(client)
+        statuses = await exchange.place_orders(
+            [(order("SOLUSD", "buy", 140.0), False), (order("ETHUSD", "sell", 3600.0), False)]
+        )
+        results = await exchange.cancel_existing_orders("SOL")
+        await exchange.close()
+        return statuses, results
+
+    statuses, results = asyncio.run(run())
+    assert all("resting" in status for status in statuses)
+    assert list(results.values()) == ["success"]
+    assert [o["coin"] for o in mock.orders.values()] == ["ETH"]
+
+
+def test_concurrency_is_bounded(server: MockExchangeServer, client: Hyperliquid):
+    server.latency_ms = 50
+
+    async def run():
+        exchange = AsyncHyperliquid(client, max_concurrency=2)
+        start = time.perf_counter()
+        await asyncio.gather(*(exchange.account_snapshot(open_orders=False) for _ in range(6)))
+        elapsed = time.perf_counter() - start
+        await exchange.close()
+        return elapsed
+
+    assert asyncio.run(run()) >= 0.15
+
+
+def test_timed_out_query_is_treated_as_empty(server: MockExchangeServer, mock: MockExchange, client: Hyperliquid):
+    mock.positions["SOL"] = 2.0
+    server.latency_ms = 500
+
+    async def run():
+        exchange = AsyncHyperliquid(client, info_timeout=0.05)
+        snapshot = await exchange.account_snapshot(open_orders=False)
+        await exchange.close()
+        return snapshot
+
+    assert asyncio.run(run()).positions == {}
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from eth_account import Account
+
+from benchmarks.mock_exchange import MockExchange, MockExchangeServer
+from exchange.async_hyperliquid import AsyncHyperliquid
+from exchange.flatten import FlattenRequest, flatten_decoder
+from exchange.hyperliquid import Hyperliquid
+
+
+@pytest.fixture
+def mock() -> MockExchange:
+    mock = MockExchange()
+    mock.positions.update({"SOL": 2.5, "BTC": -0.1})
+    for oid, coin in ((101, "SOL"), (102, "ETH"), (103, "SOL")):
+        mock.orders[oid] = {"coin": coin, "side": "B", "limitPx": "1.0", "sz": "1.0", "oid": oid}
+    return mock
+
+
+@pytest.fixture
+def client(mock: MockExchange, tmp_path) -> Hyperliquid:
+    server = MockExchangeServer(mock).start()
+    Account.enable_unaudited_hdwallet_features()
+    _, mnemonic = Account.create_with_mnemonic()
+    secret = tmp_path / "secret.txt"
+    secret.write_text(mnemonic)
+    yield Hyperliquid(str(secret), server.url)
+    server.stop()
+
+
+def test_flatten_all(mock: MockExchange, client: Hyperliquid):
+    mock.calls.clear()
+
+    result = client.close_positions()
+
+    assert result.success
+    assert set(result.positions) == {"SOL", "BTC"}
+    assert result.cancels == {101: "success", 102: "success", 103: "success"}
+    assert mock.positions == {}
+    assert mock.orders == {}
+    # One snapshot, one bulk exit and one bulk cancel
+    assert mock.calls["exchange.order"] == 1
+    assert mock.calls["exchange.cancel"] == 1
+    assert mock.calls["info.clearinghouseState"] == 1
+
+
+def test_flatten_one_asset(mock: MockExchange, client: Hyperliquid):
+    result = client.close_positions("SOL")
+
+    assert list(result.positions) == ["SOL"]
+    assert result.positions["SOL"]["filled"]["totalSz"] == "2.5"
+    assert set(result.cancels) == {101, 103}
+    assert mock.positions == {"BTC": -0.1}
+    assert list(mock.orders) == [102]
+
+
+def test_flatten_async(mock: MockExchange, client: Hyperliquid):
+    async def run():
+        exchange = AsyncHyperliquid(client)
+        try:
+            return await exchange.close_positions()
+        finally:
+            await exchange.close()
+
+    result = asyncio.run(run())
+
+    assert result.success
+    assert set(result.positions) == {"SOL", "BTC"}
+    assert mock.positions == {}
+    assert mock.orders == {}
+
+
+def test_flatten_request_accepts_tickers():
+    assert flatten_decoder.decode(b'{"asset": "SOLUSD.P"}').asset == "SOL"
+    assert flatten_decoder.decode(b'{"asset": "SOL"}').asset == "SOL"
+    assert FlattenRequest().asset is None
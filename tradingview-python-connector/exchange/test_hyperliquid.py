@@ -0,0 +1,192 @@
+import threading
+import tempfile
+
+from eth_account import Account
+
+from exchange.hyperliquid import Hyperliquid
+from exchange.prefetch import PrefetchedState
+from exchange.ratelimit import RateLimiter
+from exchange.snapshot import AccountSnapshot
+from exchange.transport import Transport
+from order.order import Order
+from order.position import Position
+from order.precision import PrecisionRule, Quantizer
+
+
+class FakeInfo:
+    def name_to_asset(self, name: str) -> int:
+        return {"BTC": 0, "SOL": 5}[name]
+
+
+def offline_exchange() -> Hyperliquid:
+    """
+    Build a client without touching the network, actions are recorded instead of sent.
+    """
+    exchange = Hyperliquid.__new__(Hyperliquid)
+    exchange.account = Account.create()
+    exchange.info = FakeInfo()
+    exchange._nonce = 0
+    exchange._nonce_lock = threading.Lock()
+    exchange.mirror = None
+    exchange.prefetched = PrefetchedState()
+    exchange.transport = Transport(limiter=RateLimiter(weight_per_minute=0))
+    exchange.quantizer = Quantizer(lambda asset: PrecisionRule(price_decimals=4, size_decimals=2))
+    exchange.actions = []
+
+    def post_action(action: dict) -> dict:
+        exchange.actions.append(action)
+        statuses = ["success" if c["o"] % 2 else {"error": "Order was never placed"} for c in action["cancels"]]
+        return {"status": "ok", "response": {"type": "cancel", "data": {"statuses": statuses}}}
+
+    exchange.post_action = post_action
+    return exchange
+
+
+def test_cancel_existing_orders_single_action():
+    exchange = offline_exchange()
+    snapshot = AccountSnapshot(
+        positions={},
+        open_orders=[
+            {"coin": "SOL", "side": "B", "oid": 1},
+            {"coin": "BTC", "side": "A", "oid": 2},
+            {"coin": "SOL", "side": "A", "oid": 3},
+        ],
+    )
+
+    results = exchange.cancel_existing_orders("SOL", snapshot)
+
+    assert results == {1: "success", 3: "success"}
+    assert len(exchange.actions) == 1
+    assert exchange.actions[0]["cancels"] == [{"a": 5, "o": 1}, {"a": 5, "o": 3}]
+
+
+def test_cancel_orders_chunks_large_batches():
+    exchange = offline_exchange()
+    exchange.cancel_batch_size = 4
+
+    results = exchange.cancel_orders([{"coin": "BTC", "oid": oid} for oid in range(10)])
+
+    assert len(exchange.actions) == 3
+    assert len(results) == 10
+    assert results[1] == "success"
+    assert results[2] == "Order was never placed"
+
+
+def test_cancel_orders_rejected_action():
+    exchange = offline_exchange()
+    exchange.post_action = lambda action: {"status": "err", "response": "Rate limited"}
+
+    assert exchange.cancel_orders([{"coin": "BTC", "oid": 1}, {"coin": "BTC", "oid": 2}]) == {
+        1: "Rate limited",
+        2: "Rate limited",
+    }
+
+
+def test_next_nonce_is_unique():
+    exchange = offline_exchange()
+    nonces = [exchange.next_nonce() for _ in range(100)]
+    assert len(set(nonces)) == 100
+    assert nonces == sorted(nonces)
+
+
+def test_place_order_with_protection():
+    exchange = offline_exchange()
+    exchange.post_action = lambda action: exchange.actions.append(action) or {"status": "ok"}
+    order = Order(
+        id="1",
+        action="buy",
+        contracts=2.0,
+        ticker="SOLUSD",
+        position=Position.LONG,
+        previous_position=Position.SHORT,
+        position_size=1.0,
+        price=100.0,
+        stop_loss=2.0,
+        take_profit=5.0,
+    )
+    # Reversal, doubled to close the short as well
+    order.contracts = 4.0
+
+    exchange.place_order(order)
+
+    action = exchange.actions[0]
+    assert action["grouping"] == "normalTpsl"
+    entry, stop, target = action["orders"]
+    assert (entry["b"], entry["s"], entry["r"]) == (True, "4", False)
+    assert (stop["b"], stop["s"], stop["r"]) == (False, "1", True)
+    assert stop["t"] == {"trigger": {"isMarket": True, "triggerPx": "98", "tpsl": "sl"}}
+    assert target["t"] == {"trigger": {"isMarket": True, "triggerPx": "105", "tpsl": "tp"}}
+
+
+def test_place_close_order_without_protection():
+    exchange = offline_exchange()
+    exchange.post_action = lambda action: exchange.actions.append(action) or {"status": "ok"}
+    order = Order(
+        id="1",
+        action="sell",
+        contracts=2.0,
+        ticker="SOLUSD",
+        position=Position.FLAT,
+        previous_position=Position.LONG,
+        position_size=0.0,
+        price=100.0,
+        stop_loss=2.0,
+    )
+
+    exchange.place_order(order, reduce_only=True)
+
+    assert exchange.actions[0]["grouping"] == "na"
+    assert len(exchange.actions[0]["orders"]) == 1
+
+
+class CountingTransport(Transport):
+    def __init__(self):
+        super().__init__(limiter=RateLimiter(weight_per_minute=0))
+        self.requests = []
+
+    def post(self, base_url: str, path: str, payload: dict):
+        self.requests.append(payload["type"])
+        return {"meta": {"universe": [{"name": "SOL", "szDecimals": 2}]}, "spotMeta": {"universe": [], "tokens": []}}[
+            payload["type"]
+        ]
+
+
+def test_cold_start_builds_clients_from_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    Account.enable_unaudited_hdwallet_features()
+    _, mnemonic = Account.create_with_mnemonic()
+    secret_file = tmp_path / "secret.txt"
+    secret_file.write_text(mnemonic)
+
+    transport = CountingTransport()
+    Hyperliquid(str(secret_file), "http://localhost", transport=transport)
+    assert transport.requests == ["meta", "spotMeta"]
+
+    # A later cold start, e.g. a new function instance, has the snapshot to hand
+    transport = CountingTransport()
+    exchange = Hyperliquid(str(secret_file), "http://localhost", transport=transport)
+    assert transport.requests == []
+    assert exchange.info.name_to_asset("SOL") == 0
+    assert exchange.metadata.get("SOL").sz_decimals == 2
+
+
+def test_order_requests_quantize_each_asset_once():
+    exchange = offline_exchange()
+    lookups = []
+    rules = {"BTC": PrecisionRule(price_decimals=1, size_decimals=3), "SOL": PrecisionRule(4, 2)}
+    exchange.quantizer = Quantizer(lambda asset: lookups.append(asset) or rules[asset])
+    orders = [
+        (Order("1", "buy", 1.23456, "BTCUSD", Position.LONG, Position.FLAT, 1.23456, 65432.57), False),
+        (Order("2", "sell", 1.237, "SOLUSD", Position.FLAT, Position.LONG, 0.0, 150.123456), True),
+        (Order("3", "sell", 0.5, "BTCUSD", Position.SHORT, Position.FLAT, 0.5, 65400.0), False),
+    ]
+
+    requests = exchange.order_requests(orders)
+
+    assert sorted(lookups) == ["BTC", "SOL"]
+    assert requests == [exchange.order_request(order, reduce_only) for order, reduce_only in orders]
+    assert [(request["limit_px"], request["sz"], request["reduce_only"]) for request in requests] == [
+        (65433.0, 1.235, False),
+        (150.12, 1.24, True),
+        (65400.0, 0.5, False),
+    ]
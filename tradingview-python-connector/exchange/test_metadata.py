@@ -0,0 +1,119 @@
+import time
+
+import pytest
+
+from exchange.metadata import AssetMetadataCache
+
+universe = [
+    {"name": "BTC", "szDecimals": 5, "maxLeverage": 50},
+    {"name": "SOL", "szDecimals": 2, "maxLeverage": 20},
+    {"name": "WIF", "szDecimals": 0, "maxLeverage": 5, "onlyIsolated": True},
+]
+
+
+class FakeInfo:
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.fail = fail
+
+    def meta(self) -> dict:
+        self.calls += 1
+        if self.fail:
+            raise TimeoutError("API timed out")
+        return {"universe": universe}
+
+
+def wait_for_refresh(cache: AssetMetadataCache):
+    # Background refreshes hold this lock until they finish
+    cache._refreshing.acquire()
+    cache._refreshing.release()
+
+
+def test_get_indexes_universe():
+    info = FakeInfo()
+    cache = AssetMetadataCache(info.meta)
+
+    sol = cache.get("SOL")
+    assert sol.sz_decimals == 2
+    assert sol.max_leverage == 20
+    assert sol.price_decimals == 4
+    assert cache.get("WIF").only_isolated
+    assert cache.get("BTC").price_decimals == 1
+    assert info.calls == 1
+
+
+def test_unknown_ticker_does_not_block():
+    info = FakeInfo()
+    cache = AssetMetadataCache(info.meta, retry_interval=60)
+
+    assert cache.get("NOT_FOUND") is None
+    assert cache.get("NOT_FOUND") is None
+    wait_for_refresh(cache)
+    assert info.calls == 1
+
+
+def test_snapshot_seeds_cold_start(tmp_path):
+    snapshot_path = str(tmp_path / "meta.json")
+    AssetMetadataCache(FakeInfo().meta, snapshot_path=snapshot_path).get("SOL")
+
+    info = FakeInfo()
+    cache = AssetMetadataCache(info.meta, snapshot_path=snapshot_path)
+    assert cache.get("SOL").sz_decimals == 2
+    assert info.calls == 0
+
+
+def test_stale_while_revalidate_on_timeout(tmp_path):
+    snapshot_path = str(tmp_path / "meta.json")
+    AssetMetadataCache(FakeInfo().meta, snapshot_path=snapshot_path).get("SOL")
+
+    info = FakeInfo(fail=True)
+    cache = AssetMetadataCache(info.meta, ttl=0, snapshot_path=snapshot_path, retry_interval=0)
+    time.sleep(0.01)
+
+    assert cache.get("SOL").sz_decimals == 2
+    wait_for_refresh(cache)
+    assert info.calls == 1
+    assert cache.get("SOL").sz_decimals == 2
+
+
+def test_sdk_meta_served_from_fresh_snapshot(tmp_path):
+    snapshot_path = str(tmp_path / "meta.json")
+    spot_meta = {"universe": [], "tokens": []}
+    AssetMetadataCache(FakeInfo().meta, fetch_spot=lambda: spot_meta, snapshot_path=snapshot_path).sdk_meta()
+
+    info = FakeInfo()
+    cache = AssetMetadataCache(info.meta, fetch_spot=lambda: 1 / 0, snapshot_path=snapshot_path)
+    assert cache.sdk_meta() == ({"universe": universe}, spot_meta)
+    assert info.calls == 0
+
+
+def test_sdk_meta_served_from_stale_snapshot_while_refreshing(tmp_path):
+    snapshot_path = str(tmp_path / "meta.json")
+    spot_meta = {"universe": [], "tokens": []}
+    AssetMetadataCache(FakeInfo().meta, fetch_spot=lambda: spot_meta, snapshot_path=snapshot_path).sdk_meta()
+
+    info = FakeInfo(fail=True)
+    cache = AssetMetadataCache(info.meta, fetch_spot=dict, ttl=0, snapshot_path=snapshot_path, retry_interval=0)
+    time.sleep(0.01)
+    assert cache.sdk_meta() == ({"universe": universe}, spot_meta)
+    wait_for_refresh(cache)
+    assert info.calls == 1
+
+
+def test_sdk_meta_fetched_when_snapshot_is_incomplete(tmp_path):
+    snapshot_path = str(tmp_path / "meta.json")
+    # Written before spot metadata was kept
+    AssetMetadataCache(FakeInfo().meta, snapshot_path=snapshot_path).get("SOL")
+
+    info = FakeInfo()
+    cache = AssetMetadataCache(
+        info.meta, fetch_spot=lambda: {"universe": [], "tokens": []}, snapshot_path=snapshot_path
+    )
+    assert cache.sdk_meta()[1] == {"universe": [], "tokens": []}
+    assert info.calls == 1
+
+    snapshot_path = str(tmp_path / "old.json")
+    AssetMetadataCache(FakeInfo().meta, snapshot_path=snapshot_path).get("SOL")
+    failing = AssetMetadataCache(FakeInfo(fail=True).meta, fetch_spot=dict, snapshot_path=snapshot_path)
+    with pytest.raises(TimeoutError):
+        failing.sdk_meta()
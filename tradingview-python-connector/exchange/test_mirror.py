@@ -0,0 +1,195 @@
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+
+import pytest
+
+from exchange.mirror import AccountMirror
+from exchange.snapshot import AccountSnapshot
+from order.position import Position
+
+ADDRESS = "0xabc"
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class StandInServer:
+    """
+    Minimal local websocket server standing in for Hyperliquid, one client at a time.
+    Records the subscriptions it receives and pushes whatever messages the test sends.
+    """
+
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.url = f"ws://127.0.0.1:{self.sock.getsockname()[1]}/ws"
+        self.subscriptions: list[dict] = []
+        self.client: socket.socket | None = None
+        self.connected = threading.Event()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                return
+
+            request = b""
+            while b"\r\n\r\n" not in request:
+                request += client.recv(4096)
+            headers = dict(line.split(b": ", 1) for line in request.split(b"\r\n")[1:] if b": " in line)
+            key = {k.lower(): v for k, v in headers.items()}[b"sec-websocket-key"]
+            accept = base64.b64encode(hashlib.sha1(key.strip() + WS_GUID.encode()).digest())
+            client.sendall(
+                b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n"
+            )
+            self.client = client
+            self.connected.set()
+            threading.Thread(target=self._read, args=(client,), daemon=True).start()
+
+    def _read(self, client: socket.socket):
+        try:
+            while True:
+                header = client.recv(2)
+                if len(header) < 2:
+                    return
+                length = header[1] & 0x7F
+                if length == 126:
+                    length = struct.unpack(">H", client.recv(2))[0]
+                mask = client.recv(4)
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(client.recv(length)))
+                if header[0] & 0x0F == 1:
+                    self.subscriptions.append(json.loads(payload))
+                elif header[0] & 0x0F == 8:
+                    client.sendall(bytes([0x88, 0]))
+                    client.close()
+                    return
+        except OSError:
+            return
+
+    def push(self, message: dict):
+        payload = json.dumps(message).encode()
+        header = (
+            bytes([0x81, len(payload)]) if len(payload) < 126 else bytes([0x81, 126]) + struct.pack(">H", len(payload))
+        )
+        self.client.sendall(header + payload)
+
+    def drop(self):
+        self.connected.clear()
+        self.client.shutdown(socket.SHUT_RDWR)
+        self.client.close()
+
+    def close(self):
+        self.sock.close()
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise TimeoutError("Condition not met in time")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def server():
+    server = StandInServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def mirror(server: StandInServer):
+    rest_state = AccountSnapshot(positions={"SOL": 2.0}, open_orders=[{"coin": "SOL", "side": "A", "oid": 1}])
+    mirror = AccountMirror(server.url, ADDRESS, lambda: rest_state, reconnect_delay=0.05)
+    mirror.start()
+    assert mirror.wait_ready(timeout=5)
+    yield mirror
+    mirror.stop()
+
+
+def test_mirror_subscribes_and_syncs(server: StandInServer, mirror: AccountMirror):
+    wait_until(lambda: len(server.subscriptions) == 3)
+    assert {s["subscription"]["type"] for s in server.subscriptions} == {"orderUpdates", "userFills", "userEvents"}
+    assert all(s["subscription"]["user"] == ADDRESS for s in server.subscriptions)
+
+    snapshot = mirror.snapshot()
+    assert snapshot.position("SOL") == Position.LONG
+    assert [order["oid"] for order in snapshot.orders_for("SOL")] == [1]
+
+
+def test_mirror_applies_updates(server: StandInServer, mirror: AccountMirror):
+    server.push(
+        {
+            "channel": "orderUpdates",
+            "data": [
+                {"order": {"coin": "ETH", "side": "B", "oid": 2}, "status": "open"},
+                {"order": {"coin": "SOL", "side": "A", "oid": 1}, "status": "canceled"},
+            ],
+        }
+    )
+    server.push(
+        {
+            "channel": "userFills",
+            "data": {
+                "user": ADDRESS,
+                "fills": [
+                    {"coin": "SOL", "side": "A", "sz": "2.0", "startPosition": "2.0"},
+                    {"coin": "ETH", "side": "A", "sz": "0.5", "startPosition": "0.0"},
+                ],
+            },
+        }
+    )
+
+    wait_until(lambda: mirror.snapshot().position("ETH") == Position.SHORT)
+    snapshot = mirror.snapshot()
+    assert snapshot.position("SOL") == Position.FLAT
+    assert [order["oid"] for order in snapshot.open_orders] == [2]
+    assert mirror.resyncs == 1
+
+
+def test_mirror_resyncs_on_gap(server: StandInServer, mirror: AccountMirror):
+    server.push(
+        {
+            "channel": "userFills",
+            "data": {"user": ADDRESS, "fills": [{"coin": "SOL", "side": "B", "sz": "1.0", "startPosition": "5.0"}]},
+        }
+    )
+
+    wait_until(lambda: mirror.resyncs == 2)
+    assert mirror.snapshot().positions == {"SOL": 2.0}
+
+
+def test_mirror_resyncs_on_reconnect(server: StandInServer, mirror: AccountMirror):
+    wait_until(lambda: len(server.subscriptions) == 3)
+    server.drop()
+
+    wait_until(lambda: mirror.resyncs == 2)
+    assert mirror.ready
+    wait_until(lambda: len(server.subscriptions) == 6)
+
+
+def test_mirror_retries_failed_resync(server: StandInServer):
+    attempts = []
+
+    def resync() -> AccountSnapshot:
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise TimeoutError("API timed out")
+        return AccountSnapshot(positions={"SOL": 2.0}, open_orders=[])
+
+    mirror = AccountMirror(server.url, ADDRESS, resync, retry_delay=0.05)
+    mirror.start()
+    assert mirror.wait_ready(timeout=5)
+    mirror.stop()
+
+    assert mirror.resyncs == 1 and len(attempts) == 3
+    # Backs off between retries
+    assert attempts[1] - attempts[0] >= 0.05 and attempts[2] - attempts[1] >= 0.1
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+from eth_account import Account
+
+from benchmarks.mock_exchange import MockExchange, MockExchangeServer
+from exchange.hyperliquid import Hyperliquid
+from exchange.prefetch import PrefetchedState, PrefetchSchedule, PrefetchScheduler
+from exchange.snapshot import AccountSnapshot
+from order.order import Order
+from order.position import Position
+
+
+@pytest.fixture
+def mock() -> MockExchange:
+    mock = MockExchange()
+    mock.positions["SOL"] = 1.0
+    return mock
+
+
+@pytest.fixture
+def client(mock: MockExchange, tmp_path) -> Hyperliquid:
+    server = MockExchangeServer(mock).start()
+    Account.enable_unaudited_hdwallet_features()
+    _, mnemonic = Account.create_with_mnemonic()
+    secret = tmp_path / "secret.txt"
+    secret.write_text(mnemonic)
+    yield Hyperliquid(str(secret), server.url)
+    server.stop()
+
+
+def test_next_run():
+    scheduler = PrefetchScheduler(lambda: None, PrefetchSchedule(interval=3600, lead=3))
+
+    assert scheduler.next_run(7190.0) == (7197.0, 7200.0)
+    # Started within the lead time, prefetch straight away
+    assert scheduler.next_run(7198.0) == (7198.0, 7200.0)
+    # Already prefetched for this boundary
+    assert scheduler.next_run(7198.5, last_boundary=7200.0) == (10797.0, 10800.0)
+
+
+def test_prefetched_state_is_bounded():
+    state = PrefetchedState()
+    state.store(AccountSnapshot(positions={"SOL": 1.0}, open_orders=[], fetched_at=time.time()), max_age=0.1)
+
+    assert state.get(None) is None
+    assert state.get(["SOL"]) is not None
+
+    state.touch(["SOL"])
+    assert state.get(["SOL"]) is None
+    assert state.get(["SOL", "ETH"]) is None
+    assert state.get(["ETH"]) is not None
+
+    time.sleep(0.15)
+    assert state.get(["ETH"]) is None
+    assert state.hits == 2
+
+
+def test_alerts_are_served_prefetched_state(mock: MockExchange, client: Hyperliquid):
+    client.prefetch(max_age=10)
+    mock.calls.clear()
+
+    snapshot = client.account_snapshot(assets=["SOL"])
+    assert snapshot.position("SOL") == Position.LONG
+    assert sum(mock.calls.values()) == 0
+
+    client.place_order(
+        Order(
+            id="1",
+            action="sell",
+            contracts=1.0,
+            ticker="SOLUSD",
+            position=Position.FLAT,
+            previous_position=Position.LONG,
+            position_size=0.0,
+            price=150.0,
+        ),
+        reduce_only=True,
+    )
+    # SOL has since been acted on, so its state is queried again
+    assert client.account_snapshot(assets=["SOL"]).position("SOL") == Position.FLAT
+    assert mock.calls["info.clearinghouseState"] == 1
+
+
+def test_scheduler_runs_before_each_boundary():
+    runs: list[float] = []
+    scheduler = PrefetchScheduler(lambda: runs.append(time.time()), PrefetchSchedule(interval=0.2, lead=0.05)).start()
+    time.sleep(0.5)
+    scheduler.stop()
+
+    assert 2 <= len(runs) <= 3
+    assert scheduler.stats() == {"runs": len(runs), "failures": 0}
+    for run in runs:
+        # Each run lands in the lead window ahead of a boundary, allowing for scheduling delays
+        assert run % 0.2 >= 0.13 or run % 0.2 < 0.05
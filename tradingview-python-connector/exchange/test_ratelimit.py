@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+from exchange.ratelimit import (
+    ACTION_PRIORITY,
+    INFO_PRIORITY,
+    ActionMerger,
+    RateLimiter,
+    request_weight,
+    split_response,
+)
+
+
+@pytest.mark.parametrize(
+    "path, payload, weight",
+    [
+        ("/info", {"type": "clearinghouseState", "user": "0x0"}, 2),
+        ("/info", {"type": "allMids"}, 2),
+        ("/info", {"type": "openOrders", "user": "0x0"}, 20),
+        ("/info", {"type": "meta"}, 20),
+        ("/exchange", {"action": {"type": "order", "orders": [{}] * 39}}, 1),
+        ("/exchange", {"action": {"type": "order", "orders": [{}] * 40}}, 2),
+        ("/exchange", {"action": {"type": "cancel", "cancels": [{}] * 85}}, 3),
+    ],
+)
+def test_request_weight(path, payload, weight):
+    assert request_weight(path, payload) == weight
+
+
+def test_waits_for_the_bucket_to_refill():
+    # 600 weight per minute refills 10 per second
+    limiter = RateLimiter(weight_per_minute=600)
+    assert limiter.acquire(600) < 0.01
+
+    waited = limiter.acquire(2)
+
+    assert 0.15 < waited < 0.5
+    assert limiter.stats()["wait_ms"]["count"] == 2
+
+
+def test_actions_overtake_queued_queries():
+    limiter = RateLimiter(weight_per_minute=600)
+    limiter.acquire(600)
+    order: list[str] = []
+
+    def acquire(name: str, priority: int):
+        limiter.acquire(2, priority)
+        order.append(name)
+
+    threads = [
+        threading.Thread(target=acquire, args=("info", INFO_PRIORITY)),
+        threading.Thread(target=acquire, args=("order", ACTION_PRIORITY)),
+    ]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)
+
+    assert limiter.stats()["queue_depth"] == 2
+    for thread in threads:
+        thread.join()
+    assert order == ["order", "info"]
+
+
+def test_disabled_limiter_never_waits():
+    limiter = RateLimiter(weight_per_minute=0)
+
+    assert limiter.acquire(10_000) == 0.0
+    assert limiter.try_acquire(10_000)
+    assert not limiter.congested()
+
+
+def test_throttle_empties_the_bucket():
+    limiter = RateLimiter()
+    limiter.throttle()
+
+    assert limiter.congested()
+    assert not limiter.try_acquire(1)
+
+
+def test_concurrent_actions_are_merged():
+    merger = ActionMerger(RateLimiter(), linger=0.05)
+    sent: list[list[int]] = []
+    results: dict[int, dict] = {}
+
+    def send(items: list[int]) -> dict:
+        sent.append(list(items))
+        return {"status": "ok", "response": {"type": "order", "data": {"statuses": [f"s{i}" for i in items]}}}
+
+    def submit(items: list[int]):
+        results[items[0]] = merger.submit("order", items, send)
+
+    threads = [threading.Thread(target=submit, args=(items,)) for items in ([1], [2, 3], [4])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(sent) == 1
+    assert sorted(sent[0]) == [1, 2, 3, 4]
+    for first, response in results.items():
+        statuses = response["response"]["data"]["statuses"]
+        assert statuses[0] == f"s{first}"
+    assert results[2]["response"]["data"]["statuses"] == ["s2", "s3"]
+    assert merger.merged == 2
+
+
+def test_split_response_repeats_errors():
+    error = {"status": "err", "response": "Insufficient margin"}
+
+    assert split_response(error, 1, 2) == error
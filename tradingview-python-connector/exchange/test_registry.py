@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from exchange.registry import ClientRegistry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def slow_factory(calls: list):
+    def factory(secret_file: str, instance_url: str):
+        time.sleep(0.05)
+        calls.append((secret_file, instance_url))
+        return object()
+
+    return factory
+
+
+def test_get_reuses_client():
+    calls = []
+    registry = ClientRegistry(factory=slow_factory(calls))
+
+    first = registry.get("secret.txt", "http://localhost")
+    assert registry.get("secret.txt", "http://localhost") is first
+    assert registry.get("secret.txt", "http://other") is not first
+    assert len(calls) == 2
+
+
+def test_concurrent_get_builds_once():
+    calls = []
+    registry = ClientRegistry(factory=slow_factory(calls))
+    clients = []
+
+    threads = [threading.Thread(target=lambda: clients.append(registry.get("secret.txt"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(client is clients[0] for client in clients)
+
+
+def test_invalidate_and_refresh():
+    calls = []
+    registry = ClientRegistry(factory=slow_factory(calls))
+
+    first = registry.get("secret.txt")
+    registry.get("other.txt")
+    assert registry.invalidate("secret.txt") == 1
+    assert registry.get("secret.txt") is not first
+
+    refreshed = registry.refresh("other.txt")
+    assert registry.get("other.txt") is refreshed
+    assert len(calls) == 4
+
+
+def test_client_modules_are_not_imported_at_start_up():
+    # A fresh interpreter, this one has imported them for other tests
+    modules = {"aiohttp", "eth_account", "hyperliquid.exchange", "functions_framework.aio", "starlette"}
+    code = f"import sys, main; print(sorted({modules!r} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_prewarm_starts_once():
+    registry = ClientRegistry(factory=slow_factory([]))
+
+    thread = registry.start_prewarm(modules=("json",))
+    assert registry.start_prewarm() is thread
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def test_async_entrypoint_is_registered_on_lookup():
+    code = (
+        "import main; from functions_framework import _function_registry as r; "
+        "print(main.async_entrypoint is main.async_entrypoint, 'async_entrypoint' in r.ASGI_FUNCTIONS)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "True True"
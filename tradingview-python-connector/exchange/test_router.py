@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+import pytest
+from eth_account import Account
+
+from benchmarks.mock_exchange import MockExchange, MockExchangeServer
+from exchange.hyperliquid import Hyperliquid
+from exchange.router import Router, Target, targets_decoder
+from order.order import Order
+from order.position import Position
+
+
+def open_order(contracts: float = 1.0) -> Order:
+    return Order(
+        id="1",
+        action="buy",
+        contracts=contracts,
+        ticker="SOLUSD",
+        position=Position.LONG,
+        previous_position=Position.FLAT,
+        position_size=contracts,
+        price=150.0,
+    )
+
+
+def test_scale_copies_order():
+    order = open_order(3.0)
+
+    scaled = Router.scale(order, Target("half", "half.txt", multiplier=0.5))
+    assert (scaled.contracts, scaled.position_size) == (1.5, 1.5)
+    assert Router.scale(order, Target("main", "secret.txt")) is not order
+    assert order.contracts == 3.0
+
+
+def test_targets_decoder():
+    targets = targets_decoder.decode(
+        b'[{"name": "main", "secret_file": "a.txt"}, {"name": "sub", "secret_file": "b.txt", "multiplier": 2}]'
+    )
+    assert targets == [Target("main", "a.txt"), Target("sub", "b.txt", multiplier=2.0)]
+
+    with pytest.raises(ValueError):
+        Router([Target("main", "a.txt"), Target("main", "b.txt")])
+
+
+def test_fan_out_is_concurrent():
+    router = Router([Target(str(i), f"{i}.txt") for i in range(4)], max_workers=3)
+
+    def work(target: Target) -> dict:
+        time.sleep(0.1)
+        if target.name == "2":
+            raise RuntimeError("rejected")
+        return {"success": True}
+
+    start = time.perf_counter()
+    results = router.fan_out(work)
+    # Roughly the slowest target, not the sum
+    assert time.perf_counter() - start < 0.25
+    assert [result.target for result in results] == ["0", "1", "2", "3"]
+    assert [result.success for result in results] == [True, True, False, True]
+    assert results[2].error == "rejected"
+    assert all(result.elapsed_ms >= 100 for result in results)
+
+
+def test_fan_out_async_is_concurrent():
+    router = Router([Target(str(i), f"{i}.txt") for i in range(4)])
+
+    async def work(target: Target) -> dict:
+        await asyncio.sleep(0.1)
+        return {"target": target.name}
+
+    start = time.perf_counter()
+    results = asyncio.run(router.fan_out_async(work))
+    assert time.perf_counter() - start < 0.25
+    assert [result.response for result in results] == [{"target": str(i)} for i in range(4)]
+
+
+def test_orders_are_mirrored_to_each_account(tmp_path):
+    Account.enable_unaudited_hdwallet_features()
+    mocks, servers, clients = {}, [], {}
+    for name in ("main", "half"):
+        mocks[name] = MockExchange()
+        servers.append(MockExchangeServer(mocks[name]).start())
+        _, mnemonic = Account.create_with_mnemonic()
+        secret = tmp_path / f"{name}.txt"
+        secret.write_text(mnemonic)
+        clients[name] = Hyperliquid(str(secret), servers[-1].url)
+
+    router = Router([Target("main", "main.txt"), Target("half", "half.txt", multiplier=0.5)])
+    try:
+        results = router.fan_out(lambda target: clients[target.name].place_order(Router.scale(open_order(2.0), target)))
+    finally:
+        for server in servers:
+            server.stop()
+
+    assert all(result.success for result in results)
+    assert mocks["main"].positions == {"SOL": 2.0}
+    assert mocks["half"].positions == {"SOL": 1.0}
@@ -0,0 +1,97 @@
+import pytest
+from eth_account import Account
+
+from benchmarks.mock_exchange import MockExchange, MockExchangeServer
+from exchange.hyperliquid import Hyperliquid
+from main import run_order
+from metrics.latency import LatencyRecorder, StageTimer
+from order.order import Order
+from order.position import Position
+
+
+@pytest.fixture
+def mock() -> MockExchange:
+    mock = MockExchange()
+    mock.positions["SOL"] = 1.0
+    mock.orders[100] = {"coin": "SOL", "side": "A", "limitPx": "200", "sz": "1", "oid": 100, "reduceOnly": True}
+    return mock
+
+
+@pytest.fixture
+def client(mock: MockExchange, tmp_path) -> Hyperliquid:
+    server = MockExchangeServer(mock).start()
+    Account.enable_unaudited_hdwallet_features()
+    _, mnemonic = Account.create_with_mnemonic()
+    secret = tmp_path / "secret.txt"
+    secret.write_text(mnemonic)
+    client = Hyperliquid(str(secret), server.url)
+    mock.calls.clear()
+    yield client
+    server.stop()
+
+
+def alert(position: Position, previous_position: Position, contracts: float = 1.0) -> Order:
+    return Order(
+        id="1",
+        action="buy" if position == Position.LONG else "sell",
+        contracts=contracts,
+        ticker="SOLUSD",
+        position=position,
+        previous_position=previous_position,
+        position_size=0.0 if position == Position.FLAT else contracts,
+        price=150.0,
+    )
+
+
+def state_queries(mock: MockExchange) -> dict[str, int]:
+    return {call: count for call, count in mock.calls.items() if call.startswith("info.")}
+
+
+def test_reversal_queries_positions_once(mock: MockExchange, client: Hyperliquid):
+    order = alert(Position.SHORT, Position.LONG)
+
+    assert run_order(client, order, StageTimer(LatencyRecorder(), "test")) == {"success": True}
+    assert state_queries(mock) == {"info.clearinghouseState": 1}
+    # Sized against the long held on the exchange
+    assert order.contracts == 2.0
+    assert mock.positions["SOL"] == -1.0
+
+
+def test_close_queries_positions_and_orders_once(mock: MockExchange, client: Hyperliquid):
+    assert run_order(client, alert(Position.FLAT, Position.LONG), StageTimer(LatencyRecorder(), "test")) == {
+        "success": True
+    }
+    assert state_queries(mock) == {"info.clearinghouseState": 1, "info.openOrders": 1}
+    assert mock.calls["exchange.cancel"] == 1
+    assert mock.orders == {}
+    assert "SOL" not in mock.positions
+
+
+@pytest.mark.parametrize("placed", ["filled", "resting", None])
+def test_replayed_open_is_placed_once(mock: MockExchange, client: Hyperliquid, placed: str | None):
+    # Interrupted after placing its order, or before
+    mock.positions.pop("SOL")
+    mock.orders.clear()
+    if placed == "filled":
+        mock.positions["SOL"] = 1.0
+    elif placed == "resting":
+        mock.orders[101] = {"coin": "SOL", "side": "B", "limitPx": "150", "sz": "1", "oid": 101}
+
+    timer = StageTimer(LatencyRecorder(), "test")
+    assert run_order(client, alert(Position.LONG, Position.FLAT), timer, replayed=True) == {"success": True}
+    assert mock.calls["exchange.order"] == (0 if placed else 1)
+    assert mock.positions.get("SOL") == (None if placed == "resting" else 1.0)
+
+
+def test_snapshot_is_reused_within_a_request(mock: MockExchange, client: Hyperliquid):
+    snapshot = client.account_snapshot()
+    assert state_queries(mock) == {"info.clearinghouseState": 1, "info.openOrders": 1}
+
+    assert client.has_open_position("SOL", snapshot) == Position.LONG
+    assert client.open_positions(snapshot) == {"SOL": Position.LONG}
+    client.cancel_existing_orders("SOL", snapshot)
+    assert state_queries(mock) == {"info.clearinghouseState": 1, "info.openOrders": 1}
+
+    # Without one, each read queries the exchange again
+    client.has_open_position("SOL")
+    assert mock.calls["info.clearinghouseState"] == 2
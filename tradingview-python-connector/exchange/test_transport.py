@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from hyperliquid.info import Info
+
+from exchange.transport import EndpointPolicy, Transport
+
+
+class FlakyServer:
+    """
+    Local API answering every request with `{}`, after failing the first `failures` with a 503
+    and sleeping `delay` seconds before each response.
+    """
+
+    def __init__(self, failures: int = 0, delay: float = 0.0):
+        self.failures = failures
+        self.delay = delay
+        self.paths: list[str] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                server.paths.append(self.path)
+                time.sleep(server.delay)
+                status = 503 if len(server.paths) <= server.failures else 200
+                body = json.dumps({}).encode()
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = FlakyServer()
+    yield server
+    server.stop()
+
+
+def test_connections_are_reused(server: FlakyServer):
+    transport = Transport()
+    info = Info(server.url, skip_ws=True, meta={"universe": []}, spot_meta={"universe": [], "tokens": []})
+    transport.attach(info)
+
+    for _ in range(5):
+        info.post("/info", {"type": "allMids"})
+
+    stats = transport.stats()
+    assert stats["pools"][server.url] == {"connections": 1, "requests": 5, "idle": 1}
+    assert stats["paths"]["/info"] == {"requests": 5}
+
+
+def test_info_retried_on_server_error(server: FlakyServer):
+    server.failures = 2
+    transport = Transport(backoff=0.001)
+
+    assert transport.post(server.url, "/info", {"type": "meta"}) == {}
+    assert server.paths == ["/info"] * 3
+    assert transport.stats()["paths"]["/info"] == {"requests": 3, "retries": 2}
+
+
+def test_exchange_not_retried(server: FlakyServer):
+    server.failures = 1
+    transport = Transport(backoff=0.001)
+
+    with pytest.raises(requests.HTTPError):
+        transport.post(server.url, "/exchange", {"action": {}})
+    assert server.paths == ["/exchange"]
+
+
+def test_timeouts_per_path(server: FlakyServer):
+    server.delay = 0.3
+    transport = Transport(policies={"/exchange": EndpointPolicy(timeout=(1.0, 0.05))})
+
+    with pytest.raises(requests.Timeout):
+        transport.post(server.url, "/exchange", {"action": {}})
+    assert transport.post(server.url, "/info", {"type": "meta"}) == {}
+    assert transport.stats()["paths"]["/exchange"] == {"errors": 1, "requests": 1}
+
+
+def test_connection_refused_is_retried_for_actions():
+    transport = Transport(backoff=0.001)
+
+    with pytest.raises(requests.ConnectionError):
+        transport.post("http://127.0.0.1:1", "/exchange", {"action": {}})
+    assert transport.stats()["paths"]["/exchange"] == {"errors": 1, "requests": 2, "retries": 1}
@@ -0,0 +1,222 @@
+import logging
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+import msgspec
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import NewConnectionError
+
+from exchange.ratelimit import RateLimiter, request_priority, request_weight
+from exchange.ratelimit import limiter as shared_limiter
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying an idempotent query on, anything else is returned to the caller as is
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class EndpointPolicy(msgspec.Struct, frozen=True):
+    """
+    Timeouts and retries for requests to one API path.
+
+    Attributes:
+        timeout (tuple[float, float]): Connect and read timeouts, in seconds.
+        retries (int): Retries after a failed or throttled attempt, only safe for idempotent requests.
+        connect_retries (int): Retries when a connection couldn't be established, safe for any request
+            as nothing was sent.
+    """
+
+    timeout: tuple[float, float]
+    retries: int = 0
+    connect_retries: int = 1
+
+
+INFO_POLICY = EndpointPolicy(timeout=(3.05, 5.0), retries=2)
+EXCHANGE_POLICY = EndpointPolicy(timeout=(3.05, 10.0), retries=0)
+
+
+def keepalive_socket_options(idle: int = 30, interval: int = 10, count: int = 3) -> list[tuple[int, int, int]]:
+    """
+    Socket options enabling TCP keep-alive probes, so idle pooled connections aren't silently dropped by
+    NATs and load balancers between requests. Options the platform doesn't support are skipped.
+    """
+    options = [*HTTPConnection.default_socket_options, (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    # Linux calls the idle time TCP_KEEPIDLE, macOS TCP_KEEPALIVE
+    idle_option = getattr(socket, "TCP_KEEPIDLE", getattr(socket, "TCP_KEEPALIVE", None))
+    if idle_option is not None:
+        options.append((socket.IPPROTO_TCP, idle_option, idle))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, interval))
+    if hasattr(socket, "TCP_KEEPCNT"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPCNT, count))
+
+    return options
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose pooled connections are opened with the given socket options.
+    """
+
+    def __init__(self, socket_options: list[tuple[int, int, int]], **kwargs):
+        self.socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self.socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+class TransportSession(requests.Session):
+    """
+    `requests.Session` applying its transport's timeouts, retries and rate limit by API path.
+    Assigned as the `session` of the SDK's `Info` and `Exchange` objects, which otherwise know nothing about it.
+    """
+
+    def __init__(self, transport: "Transport"):
+        super().__init__()
+        self.transport = transport
+
+    def request(self, method, url, *args, **kwargs) -> requests.Response:
+        path = urlsplit(url).path
+        policy = self.transport.policy(path)
+        kwargs["timeout"] = policy.timeout
+        weight, priority = request_weight(path, kwargs.get("json")), request_priority(path)
+
+        attempt = 0
+        while True:
+            # Every attempt counts against the limit, retries included
+            self.transport.limiter.acquire(weight, priority)
+            self.transport.count(path, "requests")
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= (max(policy.retries, policy.connect_retries) if not_sent(e) else policy.retries):
+                    self.transport.count(path, "errors")
+                    raise
+                logger.info(f"Retrying {path} after {e!r}")
+            else:
+                if response.status_code == 429:
+                    self.transport.limiter.throttle()
+                if response.status_code not in RETRY_STATUSES or attempt >= policy.retries:
+                    return response
+                response.close()
+                logger.info(f"Retrying {path} after status {response.status_code}")
+
+            self.transport.count(path, "retries")
+            time.sleep(self.transport.backoff(attempt))
+            attempt += 1
+
+
+def not_sent(error: Exception) -> bool:
+    """
+    Whether a request failed before it was sent, i.e. the connection was refused or timed out connecting.
+    """
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(error, requests.ConnectTimeout) or isinstance(reason, NewConnectionError)
+
+
+class Transport:
+    """
+    HTTP transport shared by the SDK's `Info` and `Exchange` objects of a client (see `attach`).
+
+    Connections are pooled and kept alive (with TCP keep-alive probes) so every request after the first skips
+    the TCP and TLS handshakes. Timeouts and retries are set per API path: queries to `/info` are idempotent and
+    retried with jittered exponential backoff, signed actions to `/exchange` are only retried if they were never
+    sent. Requests are admitted by the weight-based rate limiter, see `RateLimiter`.
+
+    Args:
+        pool_size (int): Connections kept per host, requests beyond this open (and drop) extra connections.
+        policies (dict[str, EndpointPolicy] | None): Policies by path, `/info` and `/exchange` have defaults.
+        backoff (float): Base delay between retries, in seconds, doubled on every attempt.
+        keepalive_idle (int): Seconds a connection is idle before keep-alive probes are sent.
+        limiter (RateLimiter | None): Defaults to the limiter shared by every transport in the process.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 16,
+        policies: dict[str, EndpointPolicy] | None = None,
+        backoff: float = 0.1,
+        keepalive_idle: int = 30,
+        limiter: RateLimiter | None = None,
+    ):
+        self.limiter = limiter or shared_limiter
+        self.policies = {"/info": INFO_POLICY, "/exchange": EXCHANGE_POLICY, **(policies or {})}
+        self.backoff_base = backoff
+        self.adapter = KeepAliveAdapter(
+            keepalive_socket_options(idle=keepalive_idle),
+            pool_connections=4,
+            pool_maxsize=pool_size,
+            max_retries=0,
+        )
+        self.session = TransportSession(self)
+        self.session.headers.update({"Content-Type": "application/json"})
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self._counters: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def policy(self, path: str) -> EndpointPolicy:
+        # Unknown paths get the conservative policy, as they may not be idempotent
+        return self.policies.get(path, EXCHANGE_POLICY)
+
+    def backoff(self, attempt: int) -> float:
+        # "Full jitter", spreads out retries from concurrent requests that failed together
+        return random.uniform(0, self.backoff_base * 2**attempt)
+
+    def count(self, path: str, counter: str):
+        with self._lock:
+            self._counters[(path, counter)] += 1
+
+    def attach(self, *apis):
+        """
+        Route the given SDK `API` objects (`Info`, `Exchange`) through this transport.
+        """
+        for api in apis:
+            api.session = self.session
+            # The session applies per path timeouts, the SDK's single timeout would override them
+            api.timeout = None
+
+    def post(self, base_url: str, path: str, payload: dict):
+        """
+        Send a request outside of the SDK, e.g. to fetch the metadata its objects are constructed with.
+        """
+        response = self.session.post(base_url + path, json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Requests, retries and errors by path, and for each pooled host the connections opened,
+                requests sent and connections currently idle. Requests per connection shows how well
+                connections are reused. Along with the rate limiter's spare weight, queue depth and waits.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+
+        paths: dict[str, dict[str, int]] = {}
+        for (path, counter), value in sorted(counters.items()):
+            paths.setdefault(path, {})[counter] = value
+
+        pools = {}
+        manager = self.adapter.poolmanager
+        for key in manager.pools.keys():
+            pool = manager.pools.get(key)
+            if pool is None:
+                continue
+            pools[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                "connections": pool.num_connections,
+                "requests": pool.num_requests,
+                # The queue is pre-filled with placeholders for connections not yet opened
+                "idle": sum(1 for connection in list(pool.pool.queue) if connection is not None) if pool.pool else 0,
+            }
+
+        return {"paths": paths, "pools": pools, "rate_limit": self.limiter.stats()}
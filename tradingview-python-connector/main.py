@@ -1,53 +1,580 @@
+import asyncio
+import hmac
+import itertools
+import logging
+import math
+import os
+import tempfile
+import threading
+
 import functions_framework
-from eth_account import Account
-from eth_account.signers.local import LocalAccount
+import msgspec
 from flask import jsonify
-from hyperliquid.exchange import Exchange
-from hyperliquid.info import Info
 from hyperliquid.utils import constants
-from msgspec.json import decode as json_decode
 
-from exchange.hyperliquid import Hyperliquid
-from order.order import Order
+from exchange.async_exchange import AsyncExchange
+from exchange.exchange import Exchange
+from exchange.flatten import FlattenRequest, flatten_decoder
+from exchange.ratelimit import DEFAULT_WEIGHT_PER_MINUTE, limiter
+from exchange.registry import async_registry, registry
+from exchange.router import Router, Target, TargetResult, targets_decoder
+from exchange.snapshot import AccountSnapshot
+from metrics.capture import AlertCapture
+from metrics.latency import StageTimer, recorder
+from metrics.log import configure_logging
+from order.idempotency import IdempotencyStore, MemoryBackend, SqliteBackend
+from order.journal import JournalPipeline, OrderJournal
+from order.order import Order, batch_decoder, order_decoder
 from order.position import Position
+from order.sequencer import AsyncTickerSequencer, TickerLocks, TickerSequencer, signed_size
 
+logger = logging.getLogger(__name__)
+configure_logging()
 
-@functions_framework.http
-def entrypoint(request):
-    """
-    "Business Logic" like canceling orders when going flat, or setting reduce_only,
-    is kept here to keep exchange implementations simple.
-    """
-    json = request.get_json(silent=True)
-    body = request.get_data()
-    if not json:
-        return jsonify(success=False)
+SECRET_FILE = os.environ.get("HYPERLIQUID_SECRET_FILE", "secret.txt")
+INSTANCE_URL = os.environ.get("HYPERLIQUID_API_URL", constants.MAINNET_API_URL)
+
+JOURNAL_PATH = os.environ.get("HYPERLIQUID_JOURNAL", os.path.join(tempfile.gettempdir(), "connector-journal.db"))
+JOURNAL_WORKERS = int(os.environ.get("HYPERLIQUID_JOURNAL_WORKERS", "4"))
+# Set to share idempotency keys between processes, e.g. the standalone server's workers
+IDEMPOTENCY_PATH = os.environ.get("HYPERLIQUID_IDEMPOTENCY_DB")
+IDEMPOTENCY_TTL = float(os.environ.get("HYPERLIQUID_IDEMPOTENCY_TTL", "120"))
+# Required by `flatten_entrypoint`, which is disabled while unset
+FLATTEN_TOKEN = os.environ.get("HYPERLIQUID_FLATTEN_TOKEN")
+RATE_LIMIT = int(os.environ.get("HYPERLIQUID_RATE_LIMIT", str(DEFAULT_WEIGHT_PER_MINUTE)))
+# JSON list of accounts to mirror every alert to, in place of the single `HYPERLIQUID_SECRET_FILE` account
+TARGETS = os.environ.get("HYPERLIQUID_TARGETS")
+ROUTER_WORKERS = int(os.environ.get("HYPERLIQUID_ROUTER_WORKERS", "8"))
+# Set to record every incoming alert to this file, for replaying with `benchmarks/replay.py`
+CAPTURE_PATH = os.environ.get("HYPERLIQUID_CAPTURE")
+# Set to order each ticker's alerts across processes, e.g. the standalone server's workers (which set it themselves)
+TICKER_LOCKS = os.environ.get("HYPERLIQUID_TICKER_LOCKS")
+
+limiter.configure(RATE_LIMIT)
+
+idempotency = IdempotencyStore(
+    SqliteBackend(IDEMPOTENCY_PATH) if IDEMPOTENCY_PATH else MemoryBackend(), ttl=IDEMPOTENCY_TTL
+)
+router = Router(targets_decoder.decode(TARGETS), max_workers=ROUTER_WORKERS) if TARGETS else None
+capture = AlertCapture(CAPTURE_PATH) if CAPTURE_PATH else None
+ticker_locks = TickerLocks(TICKER_LOCKS) if TICKER_LOCKS else None
+sequencer = TickerSequencer(ticker_locks)
+async_sequencer = AsyncTickerSequencer(ticker_locks)
+_pipeline: JournalPipeline | None = None
+_pipeline_lock = threading.Lock()
 
-    print(f"Received HTTP Request: {json}")
-    exchange = Hyperliquid(secret_file="secret.txt")
-    order = json_decode(body, type=Order)
 
+def plan_order(order: Order, snapshot: AccountSnapshot | None) -> bool | None:
+    """
+    Apply the position logic to an order, using already fetched account state.
+    `snapshot` must be provided for close and reverse orders. No exchange calls are made, so the same logic
+    serves both the synchronous and async entrypoints.
+
+    Returns:
+        bool | None: The `reduce_only` flag to place the order with, or None if no order is needed.
+    """
     # If going flat, ensure we don't overshoot and reverse the position
     # Conditional below handles exiting early if we don't need to place an order.
     reduce_only = order.is_close_position()
 
-    # If going flat, cancel existing orders.
-    # If we don't have an existing position return early.
+    # If going flat and we don't have an existing position, there's nothing to close.
     if order.is_close_position():
-        exchange.cancel_existing_orders(order.ticker)
-        if exchange.has_open_position(order.ticker) == Position.FLAT:
-            return jsonify(success=True)
+        if snapshot.position(order.ticker) == Position.FLAT:
+            return None
 
     if order.is_reverse_position():
         # Check reversing position matches up with the exchange
-        position = exchange.has_open_position(order.ticker)
-        print(f"In position for {order.ticker} - Exchange: {position}")
+        position = snapshot.position(order.ticker)
+        logger.info(f"In position for {order.ticker} - Exchange: {position}")
         if position != Position.FLAT and position != order.position:
-            print(f"Moving to {order.position}. Doubling size to reverse position.")
+            logger.info(f"Moving to {order.position}. Doubling size to reverse position.")
             order.contracts = order.contracts * 2
 
-    print(f"Placing order: {order.to_str()} reduce={reduce_only}")
-    order_response = exchange.place_order(order, reduce_only=reduce_only)
+    return reduce_only
+
+
+def needs_snapshot(orders: list[Order]) -> bool:
+    return any(order.is_close_position() or order.is_reverse_position() for order in orders)
+
+
+def already_placed(order: Order, snapshot: AccountSnapshot) -> bool:
+    """
+    Whether a replayed alert's order was placed before it was interrupted, i.e. the exchange position already
+    matches the alert's, or an order for the same side at the alert's price is resting. Closes aren't checked,
+    they're placed reduce-only and skipped once flat by `plan_order`.
+    """
+    if order.is_close_position():
+        return False
+
+    size = snapshot.positions.get(order.ticker, 0.0)
+    if math.isclose(size, signed_size(order.position, order.position_size), rel_tol=1e-3):
+        return True
+
+    side = "B" if order.is_buy() else "A"
+    return any(
+        resting["side"] == side and math.isclose(float(resting["limitPx"]), order.price, rel_tol=1e-4)
+        for resting in snapshot.orders_for(order.ticker)
+    )
+
+
+@functions_framework.http
+def entrypoint(request):
+    """
+    "Business Logic" like canceling orders when going flat, or setting reduce_only,
+    is kept here to keep exchange implementations simple.
+
+    Concurrent alerts for the same ticker (e.g. a close quickly followed by an open) are serialized, so each
+    decides against the state the previous one left. See `TickerSequencer`.
+
+    Retried deliveries and duplicate alerts are answered from the idempotency store without touching the
+    exchange. See `IdempotencyStore`.
+    """
+    with recorder.request("entrypoint") as timer:
+        body = request.get_data(cache=False)
+        if capture is not None:
+            capture.record("entrypoint", body)
+        # Decode straight from the raw body, an invalid payload is rejected without parsing it a second time
+        with timer.stage("decode"):
+            try:
+                order = order_decoder.decode(body)
+            except msgspec.DecodeError as e:
+                return jsonify(success=False, error=str(e)), 400
+
+        timer.ticker = order.ticker
+        logger.info(f"Received order: {order.id} {order.to_str()}")
+        response, status = idempotency.run(IdempotencyStore.key(order.id, body), lambda: submit_order(order, timer))
+        # The heavy client modules this request didn't need are imported in the background from here on
+        registry.start_prewarm()
+        return jsonify(response), status
+
+
+def submit_order(order: Order, timer: StageTimer) -> tuple[dict, int]:
+    # Signals for the same ticker execute one at a time, a waiting signal may be merged into a newer one
+    response = sequencer.submit(order, lambda order: execute_order(order, timer))
+    if response is None:
+        logger.info(f"Order {order.id} for {order.ticker} was coalesced into a newer signal")
+        return {"success": True, "coalesced": True}, 200
+
+    return response, 200
+
+
+def routed(results: list[TargetResult]) -> dict:
+    """
+    Combine the outcome of an alert for each target into one response, successful only if every target succeeded.
+    A failed target isn't retried by a redelivery, which would repeat the orders of the targets that succeeded.
+    """
+    for result in results:
+        if not result.success:
+            logger.error(f"Target {result.target} failed after {result.elapsed_ms:.0f}ms: {result.error}")
+
+    return {
+        "success": all(result.success and result.response.get("success", True) for result in results),
+        "targets": msgspec.to_builtins(results),
+    }
+
+
+def target_client(target: Target) -> Exchange:
+    return registry.get(target.secret_file, target.instance_url or INSTANCE_URL)
+
+
+def execute_order(order: Order, timer: StageTimer, replayed: bool = False) -> dict:
+    if router is None:
+        return run_order(registry.get(SECRET_FILE, INSTANCE_URL), order, timer, replayed)
+
+    def execute(target: Target) -> dict:
+        with recorder.request(timer.endpoint, target=target.name) as target_timer:
+            target_timer.ticker = order.ticker
+            return run_order(target_client(target), Router.scale(order, target), target_timer, replayed)
+
+    with timer.stage("route"):
+        return routed(router.fan_out(execute))
+
+
+def run_order(exchange: Exchange, order: Order, timer: StageTimer, replayed: bool = False) -> dict:
+    """
+    Args:
+        replayed (bool): Whether the alert is replayed from the journal after being interrupted, so its order may
+            already have been placed. See `already_placed`.
+    """
+    # Account state is fetched at most once and shared by every check below.
+    snapshot = None
+    if replayed or needs_snapshot([order]):
+        with timer.stage("state"):
+            snapshot = exchange.account_snapshot(
+                open_orders=replayed or order.is_close_position(), assets=[order.ticker]
+            )
+
+    if replayed and already_placed(order, snapshot):
+        logger.warning(f"Not replaying order: {order.to_str()}, it was placed before being interrupted")
+        return {"success": True}
+
+    # If going flat, cancel existing orders.
+    if order.is_close_position():
+        with timer.stage("cancel"):
+            exchange.cancel_existing_orders(order.ticker, snapshot)
+
+    with timer.stage("sizing"):
+        reduce_only = plan_order(order, snapshot)
+    if reduce_only is None:
+        return {"success": True}
+
+    logger.info(f"Placing order: {order.to_str()} reduce={reduce_only}")
+    with timer.stage("place"):
+        order_response = exchange.place_order(order, reduce_only=reduce_only)
+
+    logger.info(f"Order response: {order_response}")
+    return {"success": True}
+
+
+@functions_framework.http
+def ack_entrypoint(request):
+    """
+    Acknowledge-then-execute variant of `entrypoint`. The alert is validated and durably journaled, then
+    acknowledged with a 202 straight away, so the response never waits on the exchange (or times out and is
+    retried by TradingView). A bounded pool of workers executes journaled alerts in the background, and replays
+    any interrupted by a crash on the next start.
+
+    Needs CPU outside of requests, i.e. the standalone server or "CPU always allocated" on Cloud Run.
+    """
+    response, status = handle_ack(request.get_data(cache=False), "ack_entrypoint")
+    registry.start_prewarm()
+    return jsonify(response), status
+
+
+def handle_ack(body: bytes, endpoint: str) -> tuple[dict, int]:
+    """
+    Validate and journal an alert, shared by `ack_entrypoint` and the standalone server (`server.py`).
+
+    Returns:
+        tuple[dict, int]: The response body and HTTP status.
+    """
+    if capture is not None:
+        capture.record(endpoint, body)
+    with recorder.request(endpoint) as timer:
+        with timer.stage("decode"):
+            try:
+                order = order_decoder.decode(body)
+            except msgspec.DecodeError as e:
+                return {"success": False, "error": str(e)}, 400
+
+        timer.ticker = order.ticker
+        # A retried delivery gets the original acknowledgement instead of being journaled again
+        return idempotency.run(IdempotencyStore.key(order.id, body), lambda: accept_order(order, body, timer))
+
+
+def accept_order(order: Order, body: bytes, timer: StageTimer) -> tuple[dict, int]:
+    with timer.stage("journal"):
+        seq = pipeline().submit(order.ticker, body)
+
+    logger.info(f"Accepted order: {order.id} {order.to_str()} as {seq}")
+    return {"success": True, "accepted": seq}, 202
+
+
+def pipeline() -> JournalPipeline:
+    """
+    Return the journal pipeline, opening the journal and starting its workers on first use.
+    """
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                pipeline = JournalPipeline(
+                    OrderJournal(JOURNAL_PATH),
+                    execute_journaled,
+                    replay=lambda body: execute_journaled(body, replayed=True),
+                    workers=JOURNAL_WORKERS,
+                )
+                pipeline.start()
+                _pipeline = pipeline
+
+    return _pipeline
+
+
+def stop_pipeline(timeout: float = 30.0):
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is not None:
+            _pipeline.stop(timeout)
+            _pipeline.journal.close()
+            _pipeline = None
+
+
+def execute_journaled(body: bytes, replayed: bool = False) -> str:
+    # Already validated when it was accepted
+    order = order_decoder.decode(body)
+    with recorder.request("journal") as timer:
+        timer.ticker = order.ticker
+        response = sequencer.submit(order, lambda order: execute_order(order, timer, replayed))
+
+    return "coalesced" if response is None else msgspec.json.encode(response).decode()
+
+
+def __getattr__(name: str):
+    """
+    Defines `async_entrypoint` on first lookup, i.e. when functions-framework loads it as the target, so the other
+    entrypoints' cold starts don't import `functions_framework.aio` and the ASGI stack behind it.
+    """
+    if name != "async_entrypoint":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import functions_framework.aio
+
+    @functions_framework.aio.http
+    async def async_entrypoint(request):
+        """
+        Asyncio variant of `entrypoint`, one event loop serves many simultaneous alerts without a thread each.
+        """
+        response = await handle_alert(await request.body(), "async_entrypoint")
+        registry.start_prewarm()
+        return response
+
+    globals()[name] = async_entrypoint
+    return async_entrypoint
+
+
+async def handle_alert(body: bytes, endpoint: str) -> tuple[dict, int]:
+    """
+    Process a single alert, shared by `async_entrypoint` and the standalone server (`server.py`).
+
+    Independent exchange calls run concurrently: positions and open orders are fetched together, then stale
+    orders are cancelled while the order itself is placed. A reduce-only close can't be affected by the cancels.
+
+    Returns:
+        tuple[dict, int]: The response body and HTTP status.
+    """
+    if capture is not None:
+        capture.record(endpoint, body)
+    with recorder.request(endpoint) as timer:
+        with timer.stage("decode"):
+            try:
+                order = order_decoder.decode(body)
+            except msgspec.DecodeError as e:
+                return {"success": False, "error": str(e)}, 400
+
+        timer.ticker = order.ticker
+        logger.info(f"Received order: {order.id} {order.to_str()}")
+
+        async def submit() -> tuple[dict, int]:
+            response = await async_sequencer.submit(order, lambda order: execute_order_async(order, timer))
+            if response is None:
+                logger.info(f"Order {order.id} for {order.ticker} was coalesced into a newer signal")
+                return {"success": True, "coalesced": True}, 200
+
+            return response, 200
+
+        return await idempotency.run_async(IdempotencyStore.key(order.id, body), submit)
+
+
+async def execute_order_async(order: Order, timer: StageTimer) -> dict:
+    if router is None:
+        return await run_order_async(await async_registry.get(SECRET_FILE, INSTANCE_URL), order, timer)
+
+    async def execute(target: Target) -> dict:
+        exchange = await async_registry.get(target.secret_file, target.instance_url or INSTANCE_URL)
+        with recorder.request(timer.endpoint, target=target.name) as target_timer:
+            target_timer.ticker = order.ticker
+            return await run_order_async(exchange, Router.scale(order, target), target_timer)
+
+    with timer.stage("route"):
+        return routed(await router.fan_out_async(execute))
+
+
+async def run_order_async(exchange: AsyncExchange, order: Order, timer: StageTimer) -> dict:
+    snapshot = None
+    if needs_snapshot([order]):
+        with timer.stage("state"):
+            snapshot = await exchange.account_snapshot(open_orders=order.is_close_position(), assets=[order.ticker])
+
+    with timer.stage("sizing"):
+        reduce_only = plan_order(order, snapshot)
+
+    async def cancel():
+        with timer.stage("cancel"):
+            return await exchange.cancel_existing_orders(order.ticker, snapshot)
+
+    async def place():
+        with timer.stage("place"):
+            logger.info(f"Placing order: {order.to_str()} reduce={reduce_only}")
+            return await exchange.place_order(order, reduce_only=reduce_only)
+
+    calls = []
+    if order.is_close_position():
+        calls.append(cancel())
+    if reduce_only is not None:
+        calls.append(place())
+    responses = await asyncio.gather(*calls)
+
+    if reduce_only is not None:
+        logger.info(f"Order response: {responses[-1]}")
+    return {"success": True}
+
+
+@functions_framework.http
+def batch_entrypoint(request):
+    """
+    Accepts a JSON array of alerts, e.g. every strategy firing on the same candle close.
+
+    Orders are grouped by ticker and submitted in waves: each wave holds at most one order per ticker,
+    so its orders never conflict and are placed with a single bulk action. Later alerts for a ticker
+    (e.g. a close followed by an open) go in the next wave, against refreshed account state.
+    """
+    response, status = handle_batch(request.get_data(cache=False), "batch_entrypoint")
+    registry.start_prewarm()
+    return jsonify(response), status
+
+
+def handle_batch(body: bytes, endpoint: str) -> tuple[dict, int]:
+    """
+    Process a batch of alerts, shared by `batch_entrypoint` and the standalone server (`server.py`).
+
+    Returns:
+        tuple[dict, int]: The response body and HTTP status.
+    """
+    if capture is not None:
+        capture.record(endpoint, body)
+    with recorder.request(endpoint) as timer:
+        with timer.stage("decode"):
+            try:
+                orders = batch_decoder.decode(body)
+            except msgspec.DecodeError as e:
+                return {"success": False, "error": str(e)}, 400
+
+        logger.info(f"Received batch of {len(orders)} orders")
+        return idempotency.run(IdempotencyStore.key("batch", body), lambda: execute_batch(orders, timer))
+
+
+def execute_batch(orders: list[Order], timer: StageTimer) -> tuple[dict, int]:
+    if router is None:
+        return run_batch(registry.get(SECRET_FILE, INSTANCE_URL), orders, timer)
+
+    def execute(target: Target) -> dict:
+        with recorder.request(timer.endpoint, target=target.name) as target_timer:
+            response, _ = run_batch(
+                target_client(target), [Router.scale(order, target) for order in orders], target_timer
+            )
+            return response
+
+    with timer.stage("route"):
+        return routed(router.fan_out(execute)), 200
+
+
+def run_batch(exchange: Exchange, orders: list[Order], timer: StageTimer) -> tuple[dict, int]:
+    # Orders are grouped by ticker with their position in the batch, so results are reported in the order received
+    groups: dict[str, list[tuple[int, Order]]] = {}
+    for index, order in enumerate(orders):
+        groups.setdefault(order.ticker, []).append((index, order))
+
+    results: list[dict | None] = [None] * len(orders)
+    for indexed in itertools.zip_longest(*groups.values()):
+        indexed = [item for item in indexed if item is not None]
+        wave = [order for _, order in indexed]
+        wave = [order for order in wave if order is not None]
+        snapshot = None
+        if needs_snapshot(wave):
+            with timer.stage("state"):
+                snapshot = exchange.account_snapshot(assets=[order.ticker for order in wave])
+
+        # If going flat, cancel existing orders for every closing ticker in one go.
+        closing = [order for order in wave if order.is_close_position()]
+        with timer.stage("cancel"):
+            exchange.cancel_orders(
+                [{"coin": o["coin"], "oid": o["oid"]} for order in closing for o in snapshot.orders_for(order.ticker)]
+            )
+
+        planned, placed = [], []
+        with timer.stage("sizing"):
+            for index, order in indexed:
+                reduce_only = plan_order(order, snapshot)
+                if reduce_only is None:
+                    results[index] = {"id": order.id, "ticker": order.ticker, "status": "skipped"}
+                else:
+                    planned.append((order, reduce_only))
+                    placed.append(index)
+
+        with timer.stage("place"):
+            statuses = exchange.place_orders(planned)
+        for index, (order, reduce_only), status in zip(placed, planned, statuses, strict=True):
+            logger.info(f"Placed order: {order.to_str()} reduce={reduce_only} - {status}")
+            results[index] = {"id": order.id, "ticker": order.ticker, "status": status}
+
+    return {"success": True, "results": results}, 200
+
+
+@functions_framework.http
+def flatten_entrypoint(request):
+    """
+    Close every position (or one asset's, with a body of `{"asset": "SOL"}`) and cancel resting orders, e.g. in a
+    drawdown. Requires an `Authorization: Bearer <HYPERLIQUID_FLATTEN_TOKEN>` header.
+    """
+    body = request.get_data(cache=False)
+    response, status = handle_flatten(body, request.headers.get("Authorization"), "flatten_entrypoint")
+    registry.start_prewarm()
+    return jsonify(response), status
+
+
+def authorized(authorization: str | None) -> bool:
+    if not FLATTEN_TOKEN or not authorization:
+        return False
+
+    scheme, _, token = authorization.partition(" ")
+    # Constant time, so the token can't be guessed a character at a time from response times
+    return scheme.lower() == "bearer" and hmac.compare_digest(token.strip().encode(), FLATTEN_TOKEN.encode())
+
+
+def handle_flatten(body: bytes, authorization: str | None, endpoint: str) -> tuple[dict, int]:
+    """
+    Flatten positions, shared by `flatten_entrypoint` and the standalone server (`server.py`).
+
+    Returns:
+        tuple[dict, int]: The response body and HTTP status.
+    """
+    if not authorized(authorization):
+        return {"success": False, "error": "Unauthorized"}, 401
+
+    with recorder.request(endpoint) as timer:
+        with timer.stage("decode"):
+            try:
+                request = flatten_decoder.decode(body) if body.strip() else FlattenRequest()
+            except msgspec.DecodeError as e:
+                return {"success": False, "error": str(e)}, 400
+
+        timer.ticker = request.asset
+        with timer.stage("flatten"):
+            if router is None:
+                return flatten(registry.get(SECRET_FILE, INSTANCE_URL), request.asset), 200
+            # Every account is flattened, whatever its multiplier
+            return routed(router.fan_out(lambda target: flatten(target_client(target), request.asset))), 200
+
+
+def flatten(exchange: Exchange, asset: str | None) -> dict:
+    result = exchange.close_positions(asset)
+    logger.warning(f"Flattened {asset or 'all positions'} in {result.elapsed_ms:.0f}ms: {result.positions}")
+    return {"success": result.success, **msgspec.to_builtins(result, str_keys=True)}
+
+
+@functions_framework.http
+def metrics_endpoint(request):
+    """
+    Latency percentiles (in milliseconds) per stage, per stage and ticker, and per stage and routed target, for this
+    instance. Along with connection pool and retry stats for each exchange client.
+    """
+    return jsonify(export_metrics())
+
+
+def export_metrics() -> dict:
+    # Routed accounts may share an instance
+    transport = {
+        f"{client.instance} {client.account.address}": {
+            **client.transport.stats(),
+            "merged_actions": client.merger.merged,
+            "prefetch_hits": client.prefetched.hits,
+        }
+        for client in registry.clients()
+    }
+    metrics = {**recorder.export(), "transport": transport, "duplicates": idempotency.duplicates}
+    if capture is not None:
+        metrics["captured"] = capture.captured
+    if _pipeline is not None:
+        metrics["journal"] = _pipeline.journal.counts()
 
-    print(f"Order response: {order_response}")
-    return jsonify(success=True)
+    return metrics
@@ -0,0 +1,139 @@
+import atexit
+import logging
+import queue
+import struct
+import threading
+import time
+from typing import Iterator
+
+import msgspec
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TVCAPv1\n"
+# Arrival time (Unix seconds), endpoint name length and body length, followed by the name and body themselves
+_HEADER = struct.Struct("<dBI")
+
+
+class CapturedAlert(msgspec.Struct, frozen=True):
+    """
+    An alert as it arrived.
+
+    Attributes:
+        arrived (float): Unix time the request was received.
+        endpoint (str): The endpoint it was sent to, e.g. "entrypoint" or "batch_entrypoint".
+        body (bytes): The raw request body, exactly as TradingView sent it.
+    """
+
+    arrived: float
+    endpoint: str
+    body: bytes
+
+
+def encode_record(alert: CapturedAlert) -> bytes:
+    endpoint = alert.endpoint.encode()
+    return _HEADER.pack(alert.arrived, len(endpoint), len(alert.body)) + endpoint + alert.body
+
+
+def read_capture(path: str) -> Iterator[CapturedAlert]:
+    """
+    Read the alerts of a capture file in the order they arrived. A record cut short, e.g. by the process being
+    killed mid-write, ends the capture.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} isn't an alert capture")
+
+        while header := f.read(_HEADER.size):
+            if len(header) < _HEADER.size:
+                logger.warning(f"Ignoring a truncated record at the end of {path}")
+                return
+
+            arrived, endpoint_length, body_length = _HEADER.unpack(header)
+            data = f.read(endpoint_length + body_length)
+            if len(data) < endpoint_length + body_length:
+                logger.warning(f"Ignoring a truncated record at the end of {path}")
+                return
+
+            yield CapturedAlert(arrived, data[:endpoint_length].decode(), data[endpoint_length:])
+
+
+class AlertCapture:
+    """
+    Records every incoming alert body with its arrival time to an append-only file, for replaying real traffic
+    later (see `benchmarks/replay.py`).
+
+    Records are length prefixed raw bodies, so nothing is parsed or re-encoded on the request path. Requests only
+    enqueue them, a background thread appends them in batches. Several processes, e.g. the standalone server's
+    workers, may append to the same file. A failed write (e.g. the disk filling up) is logged and disables capture,
+    requests are never affected.
+
+    Args:
+        path (str): The capture file, appended to if it exists.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.captured = 0
+        # Set once a write fails, later alerts aren't recorded
+        self.disabled = False
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        # Only the process creating the file writes the header
+        try:
+            with open(path, "xb") as f:
+                f.write(MAGIC)
+        except FileExistsError:
+            pass
+        # Unbuffered, each batch of records is one append (unless the write is short, see `_write`), so processes can
+        # share a file without interleaving
+        self._file = open(path, "ab", buffering=0)
+
+        self._thread = threading.Thread(target=self._run, name="alert-capture", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, endpoint: str, body: bytes, arrived: float | None = None):
+        if self.disabled:
+            return
+        self._queue.put(CapturedAlert(arrived if arrived is not None else time.time(), endpoint, body))
+
+    def _run(self):
+        while True:
+            alert = self._queue.get()
+            # Drain whatever else is queued, so a burst is appended with one write
+            records = []
+            while alert is not None:
+                records.append(encode_record(alert))
+                try:
+                    alert = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if records and not self.disabled:
+                try:
+                    self._write(b"".join(records))
+                    self.captured += len(records)
+                except OSError as e:
+                    # The file may now end mid-record, later records would be unreadable, so capture stops here
+                    logger.error(f"Disabling alert capture to {self.path}, dropping {len(records)} alerts: {e}")
+                    self.disabled = True
+            if alert is None:
+                return
+
+    def _write(self, data: bytes):
+        # An unbuffered write may be short, e.g. when interrupted by a signal or the disk filling up, the rest is
+        # appended until the whole batch is written, a reader would otherwise lose every later record
+        view = memoryview(data)
+        while view:
+            view = view[self._file.write(view) :]
+
+    def close(self):
+        """
+        Write out any queued alerts and close the file. Safe to call more than once.
+        """
+        if self._file.closed:
+            return
+
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._file.close()
@@ -0,0 +1,163 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 95, 99)
+
+
+class Histogram:
+    """
+    Latency distribution over a sliding window of recent samples, in milliseconds.
+
+    Recording is O(1) and never allocates beyond the window, percentiles are only computed on export.
+
+    Args:
+        window (int): Number of most recent samples percentiles are computed from.
+    """
+
+    def __init__(self, window: int = 2048):
+        self.count = 0
+        self.total = 0.0
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, value: float):
+        with self._lock:
+            self.count += 1
+            self.total += value
+            self._samples.append(value)
+
+    def percentiles(self, percentiles: tuple[int, ...] = PERCENTILES) -> dict[str, float]:
+        with self._lock:
+            samples = sorted(self._samples)
+
+        if not samples:
+            return {f"p{p}": 0.0 for p in percentiles}
+
+        return {f"p{p}": samples[min(len(samples) - 1, len(samples) * p // 100)] for p in percentiles}
+
+    def export(self) -> dict:
+        return {"count": self.count, "mean": self.total / self.count if self.count else 0.0, **self.percentiles()}
+
+
+class StageTimer:
+    """
+    Times the stages of a single request, see `LatencyRecorder.request`.
+    """
+
+    def __init__(self, recorder: "LatencyRecorder", endpoint: str, target: str | None = None):
+        self.recorder = recorder
+        self.endpoint = endpoint
+        self.target = target
+        self.ticker: str | None = None
+        self.stages: dict[str, float] = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def finish(self):
+        self.stages["total"] = (time.perf_counter() - self.started) * 1000
+        for name, elapsed in self.stages.items():
+            self.recorder.record(name, elapsed, self.ticker, self.target)
+
+        logger.info(
+            "request timings",
+            extra={"endpoint": self.endpoint, "target": self.target, "ticker": self.ticker, "stages_ms": self.stages},
+        )
+
+
+class LatencyRecorder:
+    """
+    In-process latency histograms, per stage and per stage and ticker.
+
+    Stages are timed by the entrypoints (decode, state, cancel, sizing, place) and the exchange adapter
+    (sign, exchange), see `metrics_endpoint` in `main.py` for the exported view. A routed alert's work for each
+    target is timed separately (see `exchange/router.py`), per stage and target, so it isn't counted again in the
+    alert's own.
+    """
+
+    def __init__(self, window: int = 2048):
+        self.window = window
+        self._histograms: dict[tuple[str, str | None, str | None], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: str, ticker: str | None = None, target: str | None = None) -> Histogram:
+        key = (stage, ticker, target)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(self.window))
+
+        return histogram
+
+    def record(self, stage: str, elapsed_ms: float, ticker: str | None = None, target: str | None = None):
+        if target is not None:
+            self.histogram(stage, target=target).record(elapsed_ms)
+            return
+
+        self.histogram(stage).record(elapsed_ms)
+        if ticker is not None:
+            self.histogram(stage, ticker).record(elapsed_ms)
+
+    @contextmanager
+    def time(self, stage: str, ticker: str | None = None):
+        """
+        Time a block outside of a request, e.g. within the exchange adapter.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - start) * 1000, ticker)
+
+    @contextmanager
+    def request(self, endpoint: str, target: str | None = None):
+        """
+        Time a request's stages, recorded and logged as one structured record when the block exits.
+
+        Args:
+            endpoint (str): The entrypoint serving the request.
+            target (str | None): The routed account the stages ran for, recorded apart from the request's own.
+        """
+        timer = StageTimer(self, endpoint, target)
+        try:
+            yield timer
+        finally:
+            timer.finish()
+
+    def export(self) -> dict:
+        """
+        Returns:
+            dict: Percentiles for each stage, along with breakdowns by ticker and by routed target.
+        """
+        with self._lock:
+            histograms = dict(self._histograms)
+
+        stages: dict[str, dict] = {}
+        tickers: dict[str, dict[str, dict]] = {}
+        targets: dict[str, dict[str, dict]] = {}
+        for (stage, ticker, target), histogram in sorted(
+            histograms.items(), key=lambda item: (item[0][0], item[0][1] or "", item[0][2] or "")
+        ):
+            if target is not None:
+                targets.setdefault(target, {})[stage] = histogram.export()
+            elif ticker is not None:
+                tickers.setdefault(ticker, {})[stage] = histogram.export()
+            else:
+                stages[stage] = histogram.export()
+
+        return {"stages": stages, "tickers": tickers, "targets": targets}
+
+
+recorder = LatencyRecorder()
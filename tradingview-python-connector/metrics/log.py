@@ -0,0 +1,54 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+
+import msgspec
+
+# Attributes present on every LogRecord, anything else was passed via `extra` and is emitted as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as a single JSON line, which Cloud Logging parses into structured fields.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "severity": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "time": record.created,
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+
+        return msgspec.json.encode(entry, enc_hook=str).decode()
+
+
+def configure_logging(level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """
+    Route log records through an in-memory queue, so request threads never block on writing to stdout.
+    A background listener formats and writes them. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter())
+
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    return _listener
@@ -0,0 +1,96 @@
+import pytest
+
+from metrics.capture import AlertCapture, CapturedAlert, read_capture
+
+
+def test_capture_round_trip(tmp_path):
+    path = str(tmp_path / "alerts.cap")
+    capture = AlertCapture(path)
+    capture.record("entrypoint", b'{"id": "1"}', arrived=1000.5)
+    capture.record("server_batch", b"[]", arrived=1001.0)
+    capture.close()
+    capture.close()
+
+    # Appended to by a later process
+    capture = AlertCapture(path)
+    capture.record("entrypoint", b"not json", arrived=1002.0)
+    capture.close()
+
+    assert list(read_capture(path)) == [
+        CapturedAlert(1000.5, "entrypoint", b'{"id": "1"}'),
+        CapturedAlert(1001.0, "server_batch", b"[]"),
+        CapturedAlert(1002.0, "entrypoint", b"not json"),
+    ]
+    assert capture.captured == 1
+
+
+def test_truncated_record_ends_capture(tmp_path):
+    path = tmp_path / "alerts.cap"
+    capture = AlertCapture(str(path))
+    capture.record("entrypoint", b'{"id": "1"}', arrived=1.0)
+    capture.record("entrypoint", b'{"id": "2"}', arrived=2.0)
+    capture.close()
+
+    path.write_bytes(path.read_bytes()[:-3])
+    assert [alert.body for alert in read_capture(str(path))] == [b'{"id": "1"}']
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "alerts.cap"
+    path.write_bytes(b"{}")
+
+    with pytest.raises(ValueError):
+        list(read_capture(str(path)))
+
+
+class ShortWrites:
+    """
+    Writes at most a few bytes per call, as an unbuffered file may.
+    """
+
+    def __init__(self, file, limit: int = 5):
+        self.file = file
+        self.limit = limit
+        self.writes = 0
+
+    def write(self, data) -> int:
+        self.writes += 1
+        return self.file.write(data[: self.limit])
+
+    @property
+    def closed(self) -> bool:
+        return self.file.closed
+
+    def close(self):
+        self.file.close()
+
+
+def test_short_writes_are_completed(tmp_path):
+    path = str(tmp_path / "alerts.cap")
+    capture = AlertCapture(path)
+    capture._file = file = ShortWrites(capture._file)
+    capture.record("entrypoint", b'{"id": "1"}', arrived=1.0)
+    capture.record("entrypoint", b'{"id": "2"}', arrived=2.0)
+    capture.close()
+
+    assert file.writes > 2
+    assert [alert.body for alert in read_capture(path)] == [b'{"id": "1"}', b'{"id": "2"}']
+
+
+class FailingWrites(ShortWrites):
+    def write(self, data) -> int:
+        raise OSError(28, "No space left on device")
+
+
+def test_failed_writes_disable_capture(tmp_path):
+    path = str(tmp_path / "alerts.cap")
+    capture = AlertCapture(path)
+    capture._file = FailingWrites(capture._file)
+    capture.record("entrypoint", b'{"id": "1"}', arrived=1.0)
+    capture._queue.put(None)
+    capture._thread.join(timeout=5)
+
+    assert capture.disabled and capture.captured == 0
+    capture.record("entrypoint", b'{"id": "2"}', arrived=2.0)
+    assert capture._queue.empty()
+    capture._file.close()
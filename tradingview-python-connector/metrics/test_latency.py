@@ -0,0 +1,54 @@
+from metrics.latency import Histogram, LatencyRecorder
+
+
+def test_histogram_percentiles():
+    histogram = Histogram(window=100)
+    for value in range(1, 201):
+        histogram.record(float(value))
+
+    exported = histogram.export()
+    assert exported["count"] == 200
+    assert exported["mean"] == 100.5
+    # Only the most recent 100 samples (101-200) are kept for percentiles
+    assert exported["p50"] == 151.0
+    assert exported["p95"] == 196.0
+    assert exported["p99"] == 200.0
+
+
+def test_recorder_stages_and_tickers():
+    recorder = LatencyRecorder()
+    with recorder.request("entrypoint") as timer:
+        timer.ticker = "SOL"
+        with timer.stage("decode"):
+            pass
+        with timer.stage("place"):
+            pass
+
+    with recorder.time("exchange"):
+        pass
+
+    exported = recorder.export()
+    assert set(exported["stages"]) == {"decode", "place", "total", "exchange"}
+    assert set(exported["tickers"]["SOL"]) == {"decode", "place", "total"}
+    assert exported["stages"]["total"]["count"] == 1
+
+
+def test_target_stages_are_recorded_apart():
+    recorder = LatencyRecorder()
+    with recorder.request("entrypoint") as timer:
+        timer.ticker = "SOL"
+        with timer.stage("route"):
+            for target in ("main", "sub"):
+                with recorder.request(timer.endpoint, target=target) as target_timer:
+                    target_timer.ticker = "SOL"
+                    with target_timer.stage("place"):
+                        pass
+
+    exported = recorder.export()
+    # Each target's place isn't counted as one of the alert's own
+    assert set(exported["stages"]) == {"route", "total"}
+    assert exported["stages"]["total"]["count"] == 1
+    assert set(exported["tickers"]["SOL"]) == {"route", "total"}
+    assert set(exported["targets"]) == {"main", "sub"}
+    assert exported["targets"]["main"]["place"]["count"] == 1
+    assert exported["targets"]["sub"]["total"]["count"] == 1
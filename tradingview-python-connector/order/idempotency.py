@@ -0,0 +1,234 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+import msgspec
+
+logger = logging.getLogger(__name__)
+
+NEW = "new"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+
+
+class Claim(msgspec.Struct, frozen=True):
+    """
+    Outcome of claiming an idempotency key.
+
+    Attributes:
+        state (str): NEW if the caller should execute the request, IN_FLIGHT if another caller is executing it,
+            or DONE if it was already executed.
+        response (dict | None): The cached response, when DONE.
+    """
+
+    state: str
+    response: dict | None = None
+
+
+class IdempotencyBackend(ABC):
+    """
+    Storage for idempotency keys. Implementations must make `claim` atomic, so exactly one caller gets NEW.
+    """
+
+    @abstractmethod
+    def claim(self, key: str, ttl: float) -> Claim:
+        """
+        Claim `key` for `ttl` seconds, unless it's already claimed or done and hasn't expired.
+        """
+        pass
+
+    @abstractmethod
+    def finish(self, key: str, response: bytes, ttl: float):
+        """
+        Store the response for a claimed key, kept for `ttl` seconds.
+        """
+        pass
+
+    @abstractmethod
+    def release(self, key: str):
+        """
+        Drop a claimed key without a response, e.g. the request failed and a retry should execute it again.
+        """
+        pass
+
+
+class MemoryBackend(IdempotencyBackend):
+    """
+    In-process backend, bounded to the `max_entries` most recently claimed keys.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        # key -> (expires_at, encoded response or None while in flight)
+        self._entries: OrderedDict[str, tuple[float, bytes | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, key: str, ttl: float) -> Claim:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return Claim(IN_FLIGHT) if entry[1] is None else Claim(DONE, msgspec.json.decode(entry[1]))
+
+            self._entries[key] = (now + ttl, None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return Claim(NEW)
+
+    def finish(self, key: str, response: bytes, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, response)
+
+    def release(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SqliteBackend(IdempotencyBackend):
+    """
+    Backend shared by every process on the host through a local SQLite database, e.g. the standalone server's
+    workers. Expired keys are purged as new ones are claimed.
+
+    Args:
+        path (str): SQLite database file, created if missing.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS idempotency (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, response BLOB)"
+        )
+        self._lock = threading.Lock()
+        self._claims = 0
+
+    def claim(self, key: str, ttl: float) -> Claim:
+        now = time.time()
+        with self._lock:
+            self._claims += 1
+            if self._claims % 256 == 0:
+                self._db.execute("DELETE FROM idempotency WHERE expires_at <= ?", (now,))
+
+            # Inserts, or takes over an expired key, in one statement, so concurrent processes can't both win
+            claimed = self._db.execute(
+                "INSERT INTO idempotency (key, expires_at, response) VALUES (?, ?, NULL) "
+                "ON CONFLICT (key) DO UPDATE SET expires_at = excluded.expires_at, response = NULL "
+                "WHERE idempotency.expires_at <= ? RETURNING key",
+                (key, now + ttl, now),
+            ).fetchone()
+            if claimed is not None:
+                return Claim(NEW)
+
+            row = self._db.execute("SELECT response FROM idempotency WHERE key = ?", (key,)).fetchone()
+
+        if row is None or row[0] is None:
+            return Claim(IN_FLIGHT)
+        return Claim(DONE, msgspec.json.decode(row[0]))
+
+    def finish(self, key: str, response: bytes, ttl: float):
+        with self._lock:
+            self._db.execute(
+                "UPDATE idempotency SET expires_at = ?, response = ? WHERE key = ?", (time.time() + ttl, response, key)
+            )
+
+    def release(self, key: str):
+        with self._lock:
+            self._db.execute("DELETE FROM idempotency WHERE key = ? AND response IS NULL", (key,))
+
+
+class IdempotencyStore:
+    """
+    Drops retried and duplicate webhooks before they reach the exchange.
+
+    Requests are keyed on the alert's `id` plus a hash of its raw payload: TradingView's order ids are the
+    strategy's entry names (e.g. "Long"), which repeat across genuinely different alerts. The first request for a
+    key executes, repeats within `ttl` seconds get its cached response, and repeats while it's still executing
+    are short-circuited straight away.
+
+    Args:
+        backend (IdempotencyBackend | None): Where keys are kept, in-process by default.
+        ttl (float): Seconds a key is remembered for.
+    """
+
+    def __init__(self, backend: IdempotencyBackend | None = None, ttl: float = 120.0):
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+        self.duplicates = 0
+
+    @staticmethod
+    def key(order_id: str, body: bytes) -> str:
+        return f"{order_id}:{hashlib.blake2b(body, digest_size=16).hexdigest()}"
+
+    def claim(self, key: str) -> Claim:
+        claim = self.backend.claim(key, self.ttl)
+        if claim.state != NEW:
+            self.duplicates += 1
+            logger.info(f"Dropping duplicate request {key} ({claim.state})")
+
+        return claim
+
+    def finish(self, key: str, response: dict, status: int):
+        # Only successes are remembered, a rejected or failed request can be retried
+        if status < 300:
+            self.backend.finish(key, msgspec.json.encode(response), self.ttl)
+        else:
+            self.backend.release(key)
+
+    def run(self, key: str, execute: Callable[[], tuple[dict, int]]) -> tuple[dict, int]:
+        """
+        Execute a request once per key.
+
+        Args:
+            key (str): See `key`.
+            execute (Callable[[], tuple[dict, int]]): Handles the request, returning the response body and status.
+
+        Returns:
+            tuple[dict, int]: The response, or the cached response marked as a duplicate.
+        """
+        claim = self.claim(key)
+        if claim.state != NEW:
+            return self._duplicate(claim), 200
+
+        try:
+            response, status = execute()
+        except BaseException:
+            self.backend.release(key)
+            raise
+
+        self.finish(key, response, status)
+        return response, status
+
+    async def run_async(self, key: str, execute: Callable[[], Awaitable[tuple[dict, int]]]) -> tuple[dict, int]:
+        """
+        `run` for requests handled on an event loop.
+        """
+        claim = self.claim(key)
+        if claim.state != NEW:
+            return self._duplicate(claim), 200
+
+        try:
+            response, status = await execute()
+        except BaseException:
+            self.backend.release(key)
+            raise
+
+        self.finish(key, response, status)
+        return response, status
+
+    @staticmethod
+    def _duplicate(claim: Claim) -> dict:
+        if claim.state == IN_FLIGHT:
+            return {"success": True, "duplicate": True, "in_flight": True}
+
+        return {**claim.response, "duplicate": True}
@@ -0,0 +1,329 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticker TEXT NOT NULL,
+    body BLOB NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    received_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    owner TEXT,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS alerts_status ON alerts (status, seq);
+"""
+# Journals created before claims had owners
+_MIGRATIONS = {
+    "owner": "ALTER TABLE alerts ADD COLUMN owner TEXT",
+    "lease_until": "ALTER TABLE alerts ADD COLUMN lease_until REAL",
+}
+
+
+def _boot_id() -> str:
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+BOOT_ID = _boot_id()
+
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+class OrderJournal:
+    """
+    Durable, append-only journal of accepted alerts, backed by SQLite in WAL mode.
+
+    An alert is appended (and fsynced) before it's acknowledged, then moves from pending to running to
+    done (or failed) as it's executed. Several processes may share a journal, e.g. the standalone server's workers,
+    so each claim records its owner (boot, process and journal) and holds a lease, renewed while it runs (see
+    `renew`). `recover` only returns running alerts to pending once their owner has exited or their lease has
+    expired, i.e. they were interrupted by a crash, so they're replayed without executing a sibling's alerts twice.
+
+    Alerts are claimed oldest first, but never while an earlier alert for the same ticker is running, so each
+    ticker's alerts execute in the order they were received.
+
+    Args:
+        path (str): SQLite database file, created if missing.
+        lease (float): Seconds a claim is held for without being renewed. Exited owners are detected straight away
+            when they ran on the same host (and in the same PID namespace), otherwise by their lease expiring.
+    """
+
+    def __init__(self, path: str, lease: float = 30.0):
+        self.path = path
+        self.lease = lease
+        self._token = uuid.uuid4().hex[:8]
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # FULL syncs the WAL on every commit, an acknowledged alert survives power loss, not just a crash
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.executescript(_SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(alerts)")}
+        for column, migration in _MIGRATIONS.items():
+            if column not in columns:
+                self._db.execute(migration)
+        self._lock = threading.Lock()
+
+    @property
+    def owner(self) -> str:
+        # Read per claim rather than once, a journal may be opened before the process forks
+        return f"{BOOT_ID}:{os.getpid()}:{self._token}"
+
+    def append(self, ticker: str, body: bytes) -> int:
+        """
+        Returns:
+            int: The alert's sequence number.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO alerts (ticker, body, status, received_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (ticker, body, PENDING, now, now),
+            )
+            return cursor.lastrowid
+
+    def claim(self) -> tuple[int, bytes, int] | None:
+        """
+        Mark the oldest executable alert as running.
+
+        Returns:
+            tuple[int, bytes, int] | None: Its sequence number, body and the number of times it's been claimed (more
+                than once when it's replayed), or None if nothing can run right now.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "UPDATE alerts SET status = ?, attempts = attempts + 1, updated_at = ?, owner = ?, lease_until = ? "
+                "WHERE seq = ("
+                "  SELECT seq FROM alerts WHERE status = ? AND ticker NOT IN ("
+                "    SELECT ticker FROM alerts WHERE status = ?"
+                "  ) ORDER BY seq LIMIT 1"
+                ") RETURNING seq, body, attempts",
+                (RUNNING, now, self.owner, now + self.lease, PENDING, RUNNING),
+            ).fetchone()
+
+        return (row[0], row[1], row[2]) if row is not None else None
+
+    def complete(self, seq: int, result: str, status: str = DONE):
+        with self._lock:
+            self._db.execute(
+                "UPDATE alerts SET status = ?, result = ?, updated_at = ? WHERE seq = ?",
+                (status, result, time.time(), seq),
+            )
+
+    def renew(self) -> int:
+        """
+        Extend the lease of every alert this journal is running.
+
+        Returns:
+            int: The number of leases renewed.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE alerts SET lease_until = ? WHERE status = ? AND owner = ?",
+                (now + self.lease, RUNNING, self.owner),
+            )
+            return cursor.rowcount
+
+    def recover(self) -> int:
+        """
+        Return alerts interrupted mid-execution to pending, i.e. running alerts whose owner has exited or whose
+        lease has expired. Alerts running in live processes, including sibling workers sharing the journal, are
+        left alone.
+
+        Returns:
+            int: The number of alerts to be replayed.
+        """
+        now = time.time()
+        with self._lock:
+            # Held from reading the claims to releasing them, so an owner can't renew one in between
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "SELECT seq, owner, lease_until FROM alerts WHERE status = ?", (RUNNING,)
+                ).fetchall()
+                interrupted = [
+                    (PENDING, now, seq)
+                    for seq, owner, lease_until in rows
+                    if self._interrupted(owner, lease_until, now)
+                ]
+                self._db.executemany(
+                    "UPDATE alerts SET status = ?, owner = NULL, lease_until = NULL, updated_at = ? WHERE seq = ?",
+                    interrupted,
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+        return len(interrupted)
+
+    @staticmethod
+    def _interrupted(owner: str | None, lease_until: float | None, now: float) -> bool:
+        if owner is None or lease_until is None or lease_until < now:
+            return True
+
+        boot_id, pid, _ = owner.rsplit(":", 2)
+        return boot_id == BOOT_ID and int(pid) != os.getpid() and not process_alive(int(pid))
+
+    def prune(self, older_than: float) -> int:
+        """
+        Delete finished alerts last updated more than `older_than` seconds ago.
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM alerts WHERE status IN (?, ?) AND updated_at < ?", (DONE, FAILED, time.time() - older_than)
+            )
+            return cursor.rowcount
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM alerts GROUP BY status").fetchall()
+
+        return {status: count for status, count in rows}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class JournalPipeline:
+    """
+    Bounded pool of worker threads draining an `OrderJournal` into the exchange.
+
+    While running, the leases of its claimed alerts are renewed, and alerts interrupted in other processes sharing
+    the journal (e.g. a crashed sibling worker) are replayed, see `OrderJournal.recover`.
+
+    Args:
+        journal (OrderJournal): The journal to drain.
+        execute (Callable[[bytes], str]): Executes an alert body, returning a summary of the outcome.
+            An exception marks the alert as failed, it isn't retried.
+        replay (Callable[[bytes], str] | None): Executes an alert interrupted by a crash, which may have placed its
+            order before it was, defaults to `execute`.
+        workers (int): Alerts executed at once.
+        retention (float): Seconds finished alerts are kept for, pruned as the pipeline runs.
+    """
+
+    def __init__(
+        self,
+        journal: OrderJournal,
+        execute: Callable[[bytes], str],
+        replay: Callable[[bytes], str] | None = None,
+        workers: int = 4,
+        retention: float = 86400.0,
+    ):
+        self.journal = journal
+        self.execute = execute
+        self.replay = replay or execute
+        self.workers = workers
+        self.retention = retention
+        self._wake = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> int:
+        """
+        Replay interrupted alerts and start the workers.
+
+        Returns:
+            int: The number of alerts replayed.
+        """
+        replayed = self.journal.recover()
+        if replayed:
+            logger.warning(f"Replaying {replayed} alerts interrupted before they completed")
+        self.journal.prune(self.retention)
+
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"journal-worker-{i}", daemon=True) for i in range(self.workers)
+        ]
+        self._threads.append(threading.Thread(target=self._keep_leases, name="journal-lease", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+        return replayed
+
+    def stop(self, timeout: float = 30.0):
+        """
+        Stop once in-flight alerts complete, pending alerts stay in the journal for the next start.
+        """
+        self._stop.set()
+        self.notify()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+
+    def submit(self, ticker: str, body: bytes) -> int:
+        """
+        Durably journal an alert and wake a worker to execute it.
+
+        Returns:
+            int: The alert's sequence number.
+        """
+        seq = self.journal.append(ticker, body)
+        self.notify()
+        return seq
+
+    def notify(self):
+        with self._wake:
+            self._wake.notify_all()
+
+    def _keep_leases(self):
+        while not self._stop.wait(self.journal.lease / 3):
+            try:
+                self.journal.renew()
+                replayed = self.journal.recover()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to renew journal leases: {e}")
+                continue
+
+            if replayed:
+                logger.warning(f"Replaying {replayed} alerts interrupted in another process")
+                self.notify()
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Claiming under the condition's lock means a notify can't slip in between an empty claim and waiting
+            with self._wake:
+                claimed = self.journal.claim()
+                if claimed is None:
+                    # Also woken when a running alert completes, which may unblock a later alert for its ticker
+                    self._wake.wait(timeout=1.0)
+                    continue
+
+            seq, body, attempts = claimed
+            execute = self.replay if attempts > 1 else self.execute
+            try:
+                self.journal.complete(seq, execute(body))
+            except Exception as e:
+                logger.exception(f"Journaled alert {seq} failed")
+                self.journal.complete(seq, repr(e), status=FAILED)
+            self.notify()
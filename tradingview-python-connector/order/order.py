@@ -1,8 +1,9 @@
-from enum import Enum
+from functools import lru_cache
 
 import msgspec
 
 from order.action import Action
+from order.precision import DEFAULT_RULE
 from order.position import Position
 
 
@@ -24,6 +25,9 @@ class Order(msgspec.Struct):
         previous_position (Position): The previous position of the order.
         position_size (float): The size of the current position.
         price (float): The price at which the order was executed.
+        stop_loss (float | None): Distance of a protective stop loss from `price`, as a percentage (e.g. 2.0 for 2%).
+            Placed with orders opening a position, set per ticker via the strategy's alert message.
+        take_profit (float | None): Distance of a take profit from `price`, as a percentage.
     """
 
     id: str
@@ -34,45 +38,50 @@ class Order(msgspec.Struct):
     previous_position: Position
     position_size: float
     price: float
+    stop_loss: float | None = None
+    take_profit: float | None = None
 
     def __post_init__(self):
         # Normalizes the price and size to the correct number of decimal places.
-        # For HL, Prices should be the lesser of 5 significant figures or 6 decimals.
-        # e.g. 1234.5 is valid but 1234.56 is not. 0.001234 is valid, but 0.0012345 is not.
-        self.price = round(float(f"{self.price:.5g}"), 6)
-
-        # Normalize contract precision, although this can be exchange and asset specific.
-        self.contracts = round(float(f"{self.contracts:.5g}"), 4)
+        # See `DEFAULT_RULE`, exchanges apply their asset specific rules again when placing orders.
+        self.price = DEFAULT_RULE.price(self.price)
+        self.contracts = DEFAULT_RULE.size(self.contracts)
 
         # Normalise the ticker to remove any suffixes and denominated asset (usually USD)
         self.ticker = self.normalise_ticker(self.ticker)
 
+        if self.stop_loss is not None and not 0 < self.stop_loss < 100:
+            raise ValueError("Stop loss must be a percentage between 0 and 100")
+        if self.take_profit is not None and self.take_profit <= 0:
+            raise ValueError("Take profit must be a positive percentage")
+
     def normalise_ticker(self, ticker: str) -> str:
-        if "USD" not in ticker:
-            raise Exception("Ticker must be denominated in USD")
-
-        # Remove USDC, USDT and USD suffixes from ticker
-        return (
-            ticker.replace(".P", "")
-            .replace("USDC", "")
-            .replace("USDT", "")
-            .replace("USD", "")
-            .replace("-", "")
-            .replace("/", "")
-        )
+        return normalise_ticker(ticker)
 
     def stop_loss_price(self) -> float:
         """
-        Calculates the stop loss price for the given asset and price.
+        Calculates the stop loss price for the given asset and price, `stop_loss` percent away if set.
         """
-        percent = 0.02  # 20% / 10x leverage
+        percent = self.stop_loss / 100 if self.stop_loss is not None else 0.02  # 20% / 10x leverage
         price: float
         if self.is_buy():
             price = self.price - (self.price * percent)
         else:
             price = self.price + (self.price * percent)
 
-        return round(float(f"{price:.5g}"), 6)
+        return DEFAULT_RULE.price(price)
+
+    def take_profit_price(self) -> float:
+        """
+        Calculates the take profit price, `take_profit` percent away from the order price.
+        """
+        percent = self.take_profit / 100
+        if self.is_buy():
+            price = self.price + (self.price * percent)
+        else:
+            price = self.price - (self.price * percent)
+
+        return DEFAULT_RULE.price(price)
 
     def to_str(self) -> str:
         return f"{self.action} {self.contracts} {self.ticker} @ {self.price}"
@@ -90,3 +99,29 @@ class Order(msgspec.Struct):
 
     def is_open_position(self) -> bool:
         return self.previous_position == Position.FLAT and self.position != Position.FLAT
+
+
+@lru_cache(maxsize=1024)
+def normalise_ticker(ticker: str) -> str:
+    """
+    Strip exchange suffixes and the denominated asset from a TradingView ticker, e.g. "SOLUSDT.P" -> "SOL".
+    Alerts only ever use a handful of tickers, so results are cached rather than rebuilt on every decode.
+    """
+    if "USD" not in ticker:
+        # ValueError is reported by msgspec as a ValidationError, like any other invalid field
+        raise ValueError("Ticker must be denominated in USD")
+
+    # Remove USDC, USDT and USD suffixes from ticker
+    return (
+        ticker.replace(".P", "")
+        .replace("USDC", "")
+        .replace("USDT", "")
+        .replace("USD", "")
+        .replace("-", "")
+        .replace("/", "")
+    )
+
+
+# Decoders are reusable and thread-safe, building them once avoids re-processing the type on every request
+order_decoder = msgspec.json.Decoder(Order)
+batch_decoder = msgspec.json.Decoder(list[Order])
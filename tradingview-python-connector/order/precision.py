@@ -0,0 +1,96 @@
+from decimal import ROUND_HALF_EVEN, Context, Decimal
+from functools import lru_cache
+from typing import Callable, Iterable
+
+import msgspec
+
+# Enough digits for any price or size, an exact float may have far more but its quantized form doesn't
+_CONTEXT = Context(prec=64, rounding=ROUND_HALF_EVEN)
+
+
+@lru_cache(maxsize=None)
+def _quantum(decimals: int) -> Decimal:
+    return Decimal(1).scaleb(-decimals)
+
+
+def quantize(value: float, decimals: int, sig_figs: int | None = None) -> float:
+    """
+    Round `value` to at most `decimals` decimal places and, optionally, `sig_figs` significant figures.
+
+    Rounds the float's exact decimal value half to even with decimal arithmetic, in a single step. Equivalent to
+    `round(float(f"{value:.{sig_figs}g}"), decimals)` without formatting and re-parsing a string.
+    """
+    exact = Decimal(value)
+    if sig_figs is not None and value != 0:
+        decimals = min(decimals, sig_figs - 1 - exact.adjusted())
+
+    return float(exact.quantize(_quantum(decimals), context=_CONTEXT))
+
+
+class PrecisionRule(msgspec.Struct, frozen=True):
+    """
+    Price tick and lot size constraints for an asset.
+
+    Attributes:
+        price_decimals (int): Maximum decimal places for prices.
+        size_decimals (int): Maximum decimal places for contract sizes.
+        price_sig_figs (int | None): Maximum significant figures for prices.
+        size_sig_figs (int | None): Maximum significant figures for contract sizes.
+    """
+
+    price_decimals: int
+    size_decimals: int
+    price_sig_figs: int | None = 5
+    size_sig_figs: int | None = None
+
+    def price(self, price: float) -> float:
+        return quantize(price, self.price_decimals, self.price_sig_figs)
+
+    def size(self, size: float) -> float:
+        return quantize(size, self.size_decimals, self.size_sig_figs)
+
+
+# Used before the asset is known, e.g. when decoding an alert.
+# For HL, Prices should be the lesser of 5 significant figures or 6 decimals.
+# e.g. 1234.5 is valid but 1234.56 is not. 0.001234 is valid, but 0.0012345 is not.
+DEFAULT_RULE = PrecisionRule(price_decimals=6, size_decimals=4, price_sig_figs=5, size_sig_figs=5)
+
+
+class Quantizer:
+    """
+    Applies per-asset precision rules, the single place prices and sizes are rounded before hitting an exchange.
+
+    Args:
+        lookup (Callable[[str], PrecisionRule | None]): Returns the rule for an asset, or None if unknown.
+        default (PrecisionRule): Rule applied to unknown assets.
+    """
+
+    def __init__(self, lookup: Callable[[str], PrecisionRule | None], default: PrecisionRule = DEFAULT_RULE):
+        self._lookup = lookup
+        self.default = default
+
+    def rule(self, asset: str) -> PrecisionRule:
+        return self._lookup(asset) or self.default
+
+    def price(self, asset: str, price: float) -> float:
+        return self.rule(asset).price(price)
+
+    def size(self, asset: str, size: float) -> float:
+        return self.rule(asset).size(size)
+
+    def quantize_many(self, items: Iterable[tuple[str, float, float]]) -> list[tuple[float, float]]:
+        """
+        Quantize many `(asset, price, size)` items at once, resolving each asset's rule only once.
+
+        Returns:
+            list[tuple[float, float]]: The quantized `(price, size)` of each item, in order.
+        """
+        rules: dict[str, PrecisionRule] = {}
+        quantized = []
+        for asset, price, size in items:
+            rule = rules.get(asset)
+            if rule is None:
+                rule = rules[asset] = self.rule(asset)
+            quantized.append((rule.price(price), rule.size(size)))
+
+        return quantized
@@ -0,0 +1,295 @@
+import asyncio
+import fcntl
+import os
+import re
+import threading
+from contextlib import asynccontextmanager, contextmanager, suppress
+from typing import Awaitable, Callable, TypeVar
+
+from order.action import Action
+from order.order import Order
+from order.position import Position
+from order.precision import DEFAULT_RULE
+
+R = TypeVar("R")
+
+
+def signed_size(position: Position, size: float) -> float:
+    return {Position.LONG: abs(size), Position.SHORT: -abs(size)}.get(position, 0.0)
+
+
+def coalesce(pending: Order, order: Order) -> Order | None:
+    """
+    Merge a signal that hasn't been executed yet into the newer signal superseding it, so only the latest
+    intended position is executed. The newer order is updated in place and returned.
+
+    The merged order moves from the pending order's previous position straight to the newer order's position,
+    e.g. a pending close (long -> flat) followed by a short (flat -> short) becomes a reversal (long -> short).
+    Opens and adjustments are sized from the position before the pending order to the newer order's
+    `position_size`, e.g. a pending open of 3 followed by an adjustment of 1 becomes an open of 4, and a pending
+    reversal followed by a reversal back to the same size cancels out.
+
+    Returns:
+        Order | None: The merged order, or None if the signals cancel out (e.g. an open followed by a close).
+    """
+    order.previous_position = pending.previous_position
+    if order.position == Position.FLAT:
+        if order.previous_position == Position.FLAT:
+            return None
+
+        # The side follows from the transition, a merged close may close the opposite side of the newer order
+        is_buy = order.previous_position == Position.SHORT
+        # Closes are placed reduce only, so oversizing can't open a position but undersizing would leave one
+        order.contracts = max(order.contracts, pending.contracts)
+    elif order.is_reverse_position():
+        # Reversals are sized as the new position, and doubled against the exchange's when placed (see `plan_order`)
+        is_buy = order.position == Position.LONG
+        order.contracts = DEFAULT_RULE.size(order.position_size)
+    else:
+        pending_contracts = pending.contracts if pending.is_buy() else -pending.contracts
+        if pending.is_reverse_position():
+            # A reversal holds the new position's size, doubled when placed to also close the old one
+            pending_contracts *= 2
+        current = signed_size(pending.position, pending.position_size) - pending_contracts
+        change = signed_size(order.position, order.position_size) - current
+        order.contracts = DEFAULT_RULE.size(abs(change))
+        if order.contracts == 0:
+            return None
+
+        is_buy = change > 0
+
+    order.action = Action.BUY if is_buy else Action.SELL
+    return order
+
+
+class TickerLocks:
+    """
+    Orders each ticker's signals across processes sharing `directory`, e.g. the standalone server's workers, in the
+    order they're submitted, so each still decides against the state the previous one left.
+
+    A signal takes the ticker's next ticket when submitted, a lock file it holds until it has executed, and executes
+    once the previous ticket's file is gone. A process exiting releases its locks, so its tickets don't hold up later
+    ones.
+
+    Args:
+        directory (str): Where the ticket files are kept, created if missing. Every process must use the same one.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def _path(self, ticker: str, name: str) -> str:
+        ticker = re.sub(r"[^\w-]", "_", ticker)
+        return os.path.join(self.directory, f"{ticker}.{name}")
+
+    def take(self, ticker: str) -> tuple[int, int]:
+        """
+        Returns:
+            tuple[int, int]: The ticket, and the descriptor holding its lock until `release`.
+        """
+        counter = os.open(self._path(ticker, "next"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(counter, fcntl.LOCK_EX)
+            ticket = int(os.pread(counter, 20, 0) or b"0")
+            # Locked before the counter moves on, so a later ticket never finds it unlocked while it's live
+            fd = os.open(self._path(ticker, str(ticket)), os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            os.pwrite(counter, str(ticket + 1).encode().ljust(20), 0)
+        finally:
+            os.close(counter)
+
+        return ticket, fd
+
+    def ready(self, ticker: str, ticket: int, block: bool = True) -> bool:
+        """
+        Whether every earlier ticket has executed, or was abandoned by its process exiting.
+
+        Args:
+            block (bool): Wait for the tickets still executing rather than returning False.
+        """
+        previous = ticket - 1
+        while previous >= 0:
+            path = self._path(ticker, str(previous))
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                # Released, which a ticket only is once the one before it was
+                return True
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_SH | (0 if block else fcntl.LOCK_NB))
+                except BlockingIOError:
+                    return False
+                if os.fstat(fd).st_nlink == 0:
+                    return True
+            finally:
+                os.close(fd)
+
+            # Unlocked but never released, its process exited. The ticket before it may still be executing.
+            with suppress(FileNotFoundError):
+                os.unlink(path)
+            previous -= 1
+
+        return True
+
+    def release(self, ticker: str, ticket: int, fd: int):
+        # Unlinked before unlocking, so a waiter can tell a released ticket from an abandoned one
+        with suppress(FileNotFoundError):
+            os.unlink(self._path(ticker, str(ticket)))
+        os.close(fd)
+
+    @contextmanager
+    def turn(self, ticker: str):
+        ticket, fd = self.take(ticker)
+        try:
+            self.ready(ticker, ticket)
+            yield
+        finally:
+            self.release(ticker, ticket, fd)
+
+    @asynccontextmanager
+    async def turn_async(self, ticker: str):
+        ticket, fd = self.take(ticker)
+        try:
+            # Polled rather than blocking a thread, so a cancelled request gives up its ticket
+            delay = 0.001
+            while not self.ready(ticker, ticket, block=False):
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 0.02)
+            yield
+        finally:
+            self.release(ticker, ticket, fd)
+
+
+class _Slot:
+    def __init__(self, order: Order, event):
+        self.order: Order | None = order
+        self.event = event
+        self.superseded = False
+
+
+class _Queue:
+    def __init__(self):
+        self.running = False
+        self.pending: _Slot | None = None
+
+
+class _Sequencer:
+    """
+    Shared bookkeeping for `TickerSequencer` and `AsyncTickerSequencer`, all under a lock that's never held
+    while waiting or executing.
+
+    Args:
+        locks (TickerLocks | None): Order signals across processes executing for the same account instead. Each
+            signal then waits for its turn, in the order signals reached any of the processes, and none are
+            coalesced, as a process only sees its own.
+    """
+
+    def __init__(self, locks: TickerLocks | None = None):
+        self.locks = locks
+        self._queues: dict[str, _Queue] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def _claim(self, order: Order, event) -> _Slot | None:
+        """
+        Returns:
+            _Slot | None: None if the caller can execute right away, otherwise its slot to wait on.
+        """
+        with self._lock:
+            queue = self._queues.setdefault(order.ticker, _Queue())
+            if not queue.running:
+                queue.running = True
+                return None
+
+            slot = _Slot(order, event)
+            if queue.pending is not None:
+                previous = queue.pending
+                slot.order = coalesce(previous.order, order) if previous.order is not None else order
+                previous.superseded = True
+                previous.order = None
+                previous.event.set()
+                self.coalesced += 1
+            queue.pending = slot
+            return slot
+
+    def _release(self, ticker: str):
+        """
+        Hand the ticker over to the pending signal, if any.
+        """
+        with self._lock:
+            queue = self._queues[ticker]
+            if queue.pending is None:
+                queue.running = False
+                del self._queues[ticker]
+                return
+
+            queue.pending.event.set()
+            queue.pending = None
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for queue in self._queues.values() if queue.pending is not None)
+
+
+class TickerSequencer(_Sequencer):
+    """
+    Per-ticker execution queue for concurrent alerts handled on threads.
+
+    Signals for the same ticker execute one at a time, in arrival order, so each sees the account state left by
+    the previous one. Different tickers run in parallel. At most one signal waits per ticker: a newer signal
+    supersedes the waiting one and the two are merged (see `coalesce`), skipping orders that would be
+    immediately undone.
+    """
+
+    def submit(self, order: Order, execute: Callable[[Order], R]) -> R | None:
+        """
+        Execute `order` once no other signal for its ticker is executing.
+
+        Returns:
+            R | None: The result of `execute`, or None if the signal was coalesced into a newer one
+                (or cancelled out by it) and nothing was executed for it.
+        """
+        if self.locks is not None:
+            with self.locks.turn(order.ticker):
+                return execute(order)
+
+        slot = self._claim(order, threading.Event())
+        if slot is not None:
+            slot.event.wait()
+            if slot.superseded:
+                return None
+            if slot.order is None:
+                self._release(order.ticker)
+                return None
+
+        try:
+            return execute(order if slot is None else slot.order)
+        finally:
+            self._release(order.ticker)
+
+
+class AsyncTickerSequencer(_Sequencer):
+    """
+    `TickerSequencer` for alerts handled on a single event loop.
+    """
+
+    async def submit(self, order: Order, execute: Callable[[Order], Awaitable[R]]) -> R | None:
+        if self.locks is not None:
+            async with self.locks.turn_async(order.ticker):
+                return await execute(order)
+
+        slot = self._claim(order, asyncio.Event())
+        if slot is not None:
+            await slot.event.wait()
+            if slot.superseded:
+                return None
+            if slot.order is None:
+                self._release(order.ticker)
+                return None
+
+        try:
+            return await execute(order if slot is None else slot.order)
+        finally:
+            self._release(order.ticker)
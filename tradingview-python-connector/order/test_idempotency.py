@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from order.idempotency import DONE, IN_FLIGHT, NEW, IdempotencyStore, MemoryBackend, SqliteBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path) -> IdempotencyStore:
+    backend = MemoryBackend() if request.param == "memory" else SqliteBackend(str(tmp_path / "keys.db"))
+    return IdempotencyStore(backend, ttl=60)
+
+
+def test_key_covers_id_and_payload():
+    key = IdempotencyStore.key("Long", b'{"price": 1}')
+
+    assert key == IdempotencyStore.key("Long", b'{"price": 1}')
+    assert key != IdempotencyStore.key("Long", b'{"price": 2}')
+    assert key != IdempotencyStore.key("Short", b'{"price": 1}')
+
+
+def test_repeats_get_the_cached_response(store: IdempotencyStore):
+    calls = []
+
+    def execute():
+        calls.append(1)
+        return {"success": True}, 200
+
+    assert store.run("a", execute) == ({"success": True}, 200)
+    assert store.run("a", execute) == ({"success": True, "duplicate": True}, 200)
+    assert len(calls) == 1
+    assert store.duplicates == 1
+
+
+def test_in_flight_duplicates_are_short_circuited(store: IdempotencyStore):
+    started, release = threading.Event(), threading.Event()
+
+    def execute():
+        started.set()
+        release.wait()
+        return {"success": True}, 200
+
+    thread = threading.Thread(target=store.run, args=("a", execute))
+    thread.start()
+    started.wait()
+
+    assert store.run("a", execute) == ({"success": True, "duplicate": True, "in_flight": True}, 200)
+    release.set()
+    thread.join()
+    assert store.claim("a").state == DONE
+
+
+def test_failures_can_be_retried(store: IdempotencyStore):
+    def execute():
+        raise RuntimeError("exchange unavailable")
+
+    with pytest.raises(RuntimeError):
+        store.run("a", execute)
+    assert store.run("b", lambda: ({"success": False}, 500)) == ({"success": False}, 500)
+
+    assert store.claim("a").state == NEW
+    assert store.claim("b").state == NEW
+
+
+def test_keys_expire(store: IdempotencyStore):
+    store.ttl = 0.05
+    store.run("a", lambda: ({"success": True}, 200))
+    assert store.claim("a").state == DONE
+
+    time.sleep(0.1)
+    assert store.claim("a").state == NEW
+
+
+def test_memory_backend_is_bounded():
+    backend = MemoryBackend(max_entries=2)
+    for key in ("a", "b", "c"):
+        backend.claim(key, 60)
+
+    assert len(backend) == 2
+    assert backend.claim("a", 60).state == NEW
+    assert backend.claim("c", 60).state == IN_FLIGHT
+
+
+def test_sqlite_backend_is_shared(tmp_path):
+    path = str(tmp_path / "keys.db")
+    first, second = IdempotencyStore(SqliteBackend(path)), IdempotencyStore(SqliteBackend(path))
+
+    assert first.claim("a").state == NEW
+    assert second.claim("a").state == IN_FLIGHT
+    first.finish("a", {"success": True}, 200)
+    assert second.claim("a").response == {"success": True}
+
+
+def test_async_run(store: IdempotencyStore):
+    async def execute():
+        await asyncio.sleep(0.02)
+        return {"success": True}, 200
+
+    async def run():
+        return await asyncio.gather(store.run_async("a", execute), store.run_async("a", execute))
+
+    assert asyncio.run(run()) == [
+        ({"success": True}, 200),
+        ({"success": True, "duplicate": True, "in_flight": True}, 200),
+    ]
@@ -0,0 +1,149 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from order.journal import DONE, FAILED, JournalPipeline, OrderJournal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def journal(tmp_path) -> OrderJournal:
+    journal = OrderJournal(str(tmp_path / "journal.db"))
+    yield journal
+    journal.close()
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise TimeoutError("Condition not met in time")
+        time.sleep(0.01)
+
+
+def test_claims_oldest_without_overtaking_a_running_ticker(journal: OrderJournal):
+    journal.append("SOL", b"1")
+    journal.append("SOL", b"2")
+    journal.append("ETH", b"3")
+
+    assert journal.claim() == (1, b"1", 1)
+    assert journal.claim() == (3, b"3", 1)
+    assert journal.claim() is None
+
+    journal.complete(1, "ok")
+    assert journal.claim() == (2, b"2", 1)
+    assert journal.counts() == {DONE: 1, "running": 2}
+
+
+def test_interrupted_alerts_are_replayed(tmp_path):
+    path = str(tmp_path / "journal.db")
+    journal = OrderJournal(path)
+    journal.append("SOL", b"1")
+    journal.append("ETH", b"2")
+    # A worker process claims an alert and crashes before completing it
+    code = f"import os; from order.journal import OrderJournal; OrderJournal({path!r}).claim(); os._exit(1)"
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=False)
+    assert journal.counts() == {"pending": 1, "running": 1}
+
+    assert journal.recover() == 1
+    assert journal.claim() == (1, b"1", 2)
+    assert journal.claim() == (2, b"2", 1)
+    journal.close()
+
+
+def test_sibling_claims_are_not_recovered(tmp_path):
+    path = str(tmp_path / "journal.db")
+    first, second = OrderJournal(path), OrderJournal(path)
+    first.append("SOL", b"1")
+    first.append("ETH", b"2")
+
+    assert first.claim() == (1, b"1", 1)
+    # E.g. a sibling worker starting its pipeline, while the first is executing
+    assert second.recover() == 0
+    assert second.claim() == (2, b"2", 1)
+    assert first.counts() == {"running": 2}
+    first.close()
+    second.close()
+
+
+def test_expired_leases_are_recovered(tmp_path):
+    path = str(tmp_path / "journal.db")
+    first, second = OrderJournal(path, lease=0.5), OrderJournal(path)
+    first.append("SOL", b"1")
+    assert first.claim() == (1, b"1", 1)
+
+    time.sleep(0.3)
+    assert first.renew() == 1
+    time.sleep(0.3)
+    assert second.recover() == 0
+
+    # A hung or partitioned owner stops renewing
+    time.sleep(0.35)
+    assert second.recover() == 1
+    assert second.claim() == (1, b"1", 2)
+    first.close()
+    second.close()
+
+
+def test_pipeline_drains_in_order_per_ticker(journal: OrderJournal):
+    executed: dict[str, list[bytes]] = {}
+    lock = threading.Lock()
+
+    def execute(body: bytes) -> str:
+        ticker, _ = body.split(b"-")
+        time.sleep(0.01)
+        with lock:
+            executed.setdefault(ticker.decode(), []).append(body)
+        return "ok"
+
+    pipeline = JournalPipeline(journal, execute, workers=4)
+    pipeline.start()
+    for i in range(10):
+        for ticker in ("SOL", "ETH", "BTC"):
+            pipeline.submit(ticker, f"{ticker}-{i}".encode())
+
+    wait_until(lambda: journal.counts() == {DONE: 30})
+    pipeline.stop()
+
+    for ticker, bodies in executed.items():
+        assert bodies == [f"{ticker}-{i}".encode() for i in range(10)]
+
+
+def test_pipeline_marks_failures(journal: OrderJournal):
+    def execute(body: bytes) -> str:
+        raise RuntimeError("exchange unavailable")
+
+    pipeline = JournalPipeline(journal, execute, workers=1)
+    pipeline.start()
+    pipeline.submit("SOL", b"1")
+
+    wait_until(lambda: journal.counts() == {FAILED: 1})
+    pipeline.stop()
+
+
+def test_pipeline_replays_interrupted_alerts_with_replay(tmp_path):
+    path = str(tmp_path / "journal.db")
+    crashed, journal = OrderJournal(path, lease=0.0), OrderJournal(path)
+    crashed.append("SOL", b"1")
+    assert crashed.claim() == (1, b"1", 1)
+    executed: list[tuple[str, bytes]] = []
+
+    pipeline = JournalPipeline(
+        journal,
+        lambda body: executed.append(("execute", body)) or "ok",
+        replay=lambda body: executed.append(("replay", body)) or "ok",
+        workers=1,
+    )
+    assert pipeline.start() == 1
+    pipeline.submit("SOL", b"2")
+
+    wait_until(lambda: journal.counts() == {DONE: 2})
+    pipeline.stop()
+    assert executed == [("replay", b"1"), ("execute", b"2")]
+    crashed.close()
+    journal.close()
@@ -2,7 +2,7 @@ import msgspec
 import pytest
 
 from order.action import Action
-from order.order import Order
+from order.order import Order, normalise_ticker, order_decoder
 from order.position import Position
 
 order_data = {
@@ -55,6 +55,48 @@ def test_decode_failure():
     assert "missing required field" in str(e.value)
 
 
+def test_order_decoder():
+    order = order_decoder.decode(
+        b"""{
+            "id": "Test Order",
+            "action": "SELL",
+            "contracts": 1.5,
+            "position": "FLAT",
+            "previous_position": "LONG",
+            "ticker": "SOLUSDT.P",
+            "position_size": 0,
+            "price": 197.8
+        }"""
+    )
+
+    assert order.ticker == "SOL"
+    assert order.is_close_position()
+
+
+def test_decode_invalid_ticker():
+    with pytest.raises(msgspec.ValidationError) as e:
+        order_decoder.decode(
+            b"""{
+                "id": "Test Order",
+                "action": "BUY",
+                "contracts": 1,
+                "position": "LONG",
+                "previous_position": "FLAT",
+                "ticker": "ETHBTC",
+                "position_size": 0,
+                "price": 0.05
+            }"""
+        )
+    assert "denominated in USD" in str(e.value)
+
+
+def test_normalise_ticker_cached():
+    normalise_ticker.cache_clear()
+    normalise_ticker("AVAXUSDT")
+    normalise_ticker("AVAXUSDT")
+    assert normalise_ticker.cache_info().hits == 1
+
+
 @pytest.mark.parametrize(
     "ticker,expected",
     [
@@ -146,3 +188,41 @@ def test_is_open_position(previous_position: Position, position: Position, expec
     order_data["position"] = position
     order = Order(**order_data)
     assert order.is_open_position() == expected
+
+
+def test_decode_protection():
+    order = order_decoder.decode(
+        b"""{
+            "id": "Test Order",
+            "action": "SELL",
+            "contracts": 1,
+            "position": "SHORT",
+            "previous_position": "FLAT",
+            "ticker": "SOLUSDT.P",
+            "position_size": 1,
+            "price": 200,
+            "stop_loss": 1.5,
+            "take_profit": 3
+        }"""
+    )
+
+    assert order.stop_loss_price() == 203.0
+    assert order.take_profit_price() == 194.0
+
+
+def test_decode_invalid_stop_loss():
+    with pytest.raises(msgspec.ValidationError) as e:
+        order_decoder.decode(
+            b"""{
+                "id": "Test Order",
+                "action": "BUY",
+                "contracts": 1,
+                "position": "LONG",
+                "previous_position": "FLAT",
+                "ticker": "SOLUSD",
+                "position_size": 1,
+                "price": 200,
+                "stop_loss": 120
+            }"""
+        )
+    assert "Stop loss" in str(e.value)
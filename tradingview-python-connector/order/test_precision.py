@@ -0,0 +1,48 @@
+import pytest
+
+from order.precision import DEFAULT_RULE, PrecisionRule, Quantizer, quantize
+
+rules = {
+    "BTC": PrecisionRule(price_decimals=1, size_decimals=5),
+    "WIF": PrecisionRule(price_decimals=6, size_decimals=0),
+}
+
+
+@pytest.mark.parametrize(
+    "value,decimals,sig_figs,expected",
+    [
+        (3500.345, 6, 5, 3500.3),
+        (0.0012345678, 6, 5, 0.001235),
+        (123456.7, 6, 5, 123460.0),
+        (0.165112, 4, 5, 0.1651),
+        (1.23456, 2, None, 1.23),
+        (0.0, 6, 5, 0.0),
+        (-197.5845, 6, 5, -197.58),
+    ],
+)
+def test_quantize(value: float, decimals: int, sig_figs: int | None, expected: float):
+    assert quantize(value, decimals, sig_figs) == expected
+
+
+@pytest.mark.parametrize("value", [0.000123456, 0.99999, 1.23456, 197.5845, 3500.345, 65432.12])
+def test_default_rule_matches_string_rounding(value: float):
+    assert DEFAULT_RULE.price(value) == round(float(f"{value:.5g}"), 6)
+
+
+def test_quantizer_per_asset():
+    quantizer = Quantizer(rules.get)
+
+    assert quantizer.price("BTC", 65432.57) == 65433.0
+    assert quantizer.size("BTC", 0.0123456) == 0.01235
+    assert quantizer.size("WIF", 1234.6) == 1235.0
+    assert quantizer.rule("UNKNOWN") is DEFAULT_RULE
+
+
+def test_quantize_many():
+    quantizer = Quantizer(rules.get)
+
+    assert quantizer.quantize_many([("BTC", 65432.57, 0.0123456), ("WIF", 2.123456, 10.6), ("BTC", 100.04, 1)]) == [
+        (65433.0, 0.01235),
+        (2.1235, 11.0),
+        (100.0, 1.0),
+    ]
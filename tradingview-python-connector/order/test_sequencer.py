@@ -0,0 +1,262 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from order.action import Action
+from order.order import Order
+from order.position import Position
+from order.sequencer import AsyncTickerSequencer, TickerLocks, TickerSequencer, coalesce
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def order(id: str, previous: Position, position: Position, ticker: str = "SOLUSD", contracts: float = 1.0) -> Order:
+    closing_long = position == Position.FLAT and previous == Position.LONG
+    return Order(
+        id=id,
+        action=Action.SELL if position == Position.SHORT or closing_long else Action.BUY,
+        contracts=contracts,
+        ticker=ticker,
+        position=position,
+        previous_position=previous,
+        position_size=0.0 if position == Position.FLAT else contracts,
+        price=100.0,
+    )
+
+
+@pytest.mark.parametrize(
+    "first, second, expected",
+    [
+        # close, then open short: reverse
+        ((Position.LONG, Position.FLAT), (Position.FLAT, Position.SHORT), (Position.LONG, Position.SHORT, Action.SELL)),
+        # reverse, then close: close the original long
+        ((Position.LONG, Position.SHORT), (Position.SHORT, Position.FLAT), (Position.LONG, Position.FLAT, Action.SELL)),
+        # open, then close: nothing to do
+        ((Position.FLAT, Position.LONG), (Position.LONG, Position.FLAT), None),
+    ],
+)
+def test_coalesce(first, second, expected):
+    merged = coalesce(order("1", *first, contracts=3.0), order("2", *second))
+
+    if expected is None:
+        assert merged is None
+    else:
+        assert (merged.previous_position, merged.position, merged.action) == expected
+        assert merged.id == "2"
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        ((Position.LONG, Position.SHORT), (Position.SHORT, Position.LONG)),
+        ((Position.SHORT, Position.LONG), (Position.LONG, Position.SHORT)),
+    ],
+)
+def test_coalesced_reversal_and_back(first, second):
+    # Reversing and reversing back to the same size leaves the position where it was
+    assert coalesce(order("1", *first, contracts=3.0), order("2", *second, contracts=3.0)) is None
+
+    # To a smaller size, only the difference is traded
+    merged = coalesce(order("1", *first, contracts=3.0), order("2", *second, contracts=1.0))
+    assert (merged.previous_position, merged.position) == (second[1], second[1])
+    assert merged.contracts == 2.0
+    assert merged.is_buy() == (second[1] == Position.SHORT)
+
+
+def test_coalesced_close_keeps_largest_size():
+    merged = coalesce(
+        order("1", Position.LONG, Position.SHORT, contracts=2.0), order("2", Position.SHORT, Position.FLAT)
+    )
+
+    assert merged.contracts == 2.0
+
+
+def test_same_ticker_is_serialized_other_tickers_run_in_parallel():
+    sequencer = TickerSequencer()
+    running: dict[str, int] = {"SOL": 0, "ETH": 0}
+    overlap = {"same": 0, "other": 0}
+    lock = threading.Lock()
+
+    def execute(o: Order):
+        with lock:
+            running[o.ticker] += 1
+            overlap["same"] = max(overlap["same"], running[o.ticker])
+            overlap["other"] = max(overlap["other"], sum(1 for count in running.values() if count))
+        time.sleep(0.05)
+        with lock:
+            running[o.ticker] -= 1
+        return o.id
+
+    orders = [
+        order("1", Position.FLAT, Position.LONG),
+        order("2", Position.FLAT, Position.LONG, ticker="ETHUSD"),
+        order("3", Position.LONG, Position.SHORT),
+    ]
+    threads = [threading.Thread(target=sequencer.submit, args=(o, execute)) for o in orders]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join()
+
+    assert overlap == {"same": 1, "other": 2}
+
+
+def test_pending_signals_are_coalesced():
+    sequencer = TickerSequencer()
+    release = threading.Event()
+    executed: list[Order] = []
+    results: dict[str, str | None] = {}
+
+    def execute(o: Order):
+        if not executed:
+            release.wait()
+        executed.append(o)
+        return o.id
+
+    def submit(o: Order):
+        results[o.id] = sequencer.submit(o, execute)
+
+    first = threading.Thread(target=submit, args=(order("1", Position.FLAT, Position.LONG),))
+    first.start()
+    time.sleep(0.02)
+    waiting = [
+        threading.Thread(target=submit, args=(order("2", Position.LONG, Position.FLAT),)),
+        threading.Thread(target=submit, args=(order("3", Position.FLAT, Position.SHORT),)),
+    ]
+    for thread in waiting:
+        thread.start()
+        time.sleep(0.02)
+
+    assert sequencer.pending() == 1
+    release.set()
+    for thread in [first, *waiting]:
+        thread.join()
+
+    assert results == {"1": "1", "2": None, "3": "3"}
+    assert [(o.id, o.previous_position, o.position) for o in executed] == [
+        ("1", Position.FLAT, Position.LONG),
+        ("3", Position.LONG, Position.SHORT),
+    ]
+    assert sequencer.coalesced == 1
+
+
+def test_async_signals_that_cancel_out_are_skipped():
+    sequencer = AsyncTickerSequencer()
+    executed: list[str] = []
+
+    async def execute(o: Order):
+        await asyncio.sleep(0.02)
+        executed.append(o.id)
+        return o.id
+
+    async def run():
+        return await asyncio.gather(
+            sequencer.submit(order("1", Position.FLAT, Position.LONG), execute),
+            sequencer.submit(order("2", Position.LONG, Position.FLAT), execute),
+            sequencer.submit(order("3", Position.FLAT, Position.LONG), execute),
+        )
+
+    assert asyncio.run(run()) == ["1", None, None]
+    assert executed == ["1"]
+
+
+def adjustment(id: str, action: Action, contracts: float, position_size: float) -> Order:
+    return Order(
+        id=id,
+        action=action,
+        contracts=contracts,
+        ticker="SOLUSD",
+        position=Position.LONG,
+        previous_position=Position.LONG,
+        position_size=position_size,
+        price=100.0,
+    )
+
+
+def test_coalesced_open_and_adjustment_keep_both_sizes():
+    merged = coalesce(order("1", Position.FLAT, Position.LONG, contracts=3.0), adjustment("2", Action.BUY, 1.0, 4.0))
+
+    assert (merged.previous_position, merged.position, merged.action, merged.contracts) == (
+        Position.FLAT,
+        Position.LONG,
+        Action.BUY,
+        4.0,
+    )
+
+
+def test_coalesced_adjustments():
+    # 3 -> 4 -> 6
+    merged = coalesce(adjustment("1", Action.BUY, 1.0, 4.0), adjustment("2", Action.BUY, 2.0, 6.0))
+    assert (merged.previous_position, merged.action, merged.contracts) == (Position.LONG, Action.BUY, 3.0)
+
+    # 3 -> 4 -> 1
+    merged = coalesce(adjustment("1", Action.BUY, 1.0, 4.0), adjustment("2", Action.SELL, 3.0, 1.0))
+    assert (merged.action, merged.contracts) == (Action.SELL, 2.0)
+
+    # 3 -> 4 -> 3
+    assert coalesce(adjustment("1", Action.BUY, 1.0, 4.0), adjustment("2", Action.SELL, 1.0, 3.0)) is None
+
+
+def test_ticker_locks_order_signals_across_processes(tmp_path):
+    # One sequencer per worker process, sharing the lock directory
+    workers = [TickerSequencer(TickerLocks(str(tmp_path))) for _ in range(2)]
+    release = threading.Event()
+    executed: list[str] = []
+
+    def execute(o: Order):
+        if not executed:
+            release.wait()
+        executed.append(o.id)
+        return o.id
+
+    threads = [
+        threading.Thread(target=workers[i % 2].submit, args=(order(str(i), Position.FLAT, Position.LONG), execute))
+        for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+    assert executed == []
+
+    release.set()
+    for thread in threads:
+        thread.join()
+    # In submission order, none coalesced
+    assert executed == ["0", "1", "2", "3"]
+
+
+def test_ticker_locks_skip_tickets_of_exited_processes(tmp_path):
+    locks = TickerLocks(str(tmp_path))
+    code = f"from order.sequencer import TickerLocks; TickerLocks({str(tmp_path)!r}).take('SOL')"
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+    ticket, fd = locks.take("SOL")
+    assert ticket == 1
+    assert locks.ready("SOL", ticket, block=False)
+    locks.release("SOL", ticket, fd)
+
+
+def test_async_ticker_locks_wait_their_turn(tmp_path):
+    locks = TickerLocks(str(tmp_path))
+    sequencer = AsyncTickerSequencer(locks)
+    signal = order("1", Position.FLAT, Position.LONG)
+
+    async def execute(o: Order):
+        return o.id
+
+    async def run():
+        first, fd = locks.take(signal.ticker)
+        task = asyncio.create_task(sequencer.submit(signal, execute))
+        await asyncio.sleep(0.05)
+        assert not task.done()
+
+        locks.release(signal.ticker, first, fd)
+        return await asyncio.wait_for(task, timeout=1.0)
+
+    assert asyncio.run(run()) == "1"
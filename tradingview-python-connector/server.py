@@ -0,0 +1,271 @@
+"""
+Standalone server for the connector, for running it outside Cloud Functions (e.g. on a host near the exchange).
+
+Preforks worker processes, each running its own event loop and binding the same port with SO_REUSEPORT, so the
+kernel spreads connections across them. Every worker warms its exchange client and asset metadata before it starts
+accepting, and reuses them for every alert it serves. Business logic is shared with the functions in `main.py`.
+Alerts for a ticker may reach any worker, so with several workers each ticker's alerts are also ordered across them
+by lock files (`HYPERLIQUID_TICKER_LOCKS`, see `TickerLocks`), in a temporary directory unless already set.
+
+Signals (sent to the supervisor):
+    SIGTERM / SIGINT: Stop accepting, drain in-flight requests (up to `--drain-timeout`), then exit.
+    SIGHUP: Rolling restart, new workers are started and warmed before the old ones drain.
+
+With `--bar-interval`, each worker refreshes its account snapshot, asset metadata and connections `--prefetch-lead`
+seconds before every bar boundary, so the alerts that follow skip those round trips (see `exchange/prefetch.py`).
+
+Usage (from `tradingview-python-connector/`):
+
+    python server.py --workers 4 --port 8080
+    python server.py --bar-interval 3600 --prefetch-lead 3 --prefetch-max-age 10
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import time
+
+from exchange.prefetch import PrefetchSchedule
+
+logger = logging.getLogger("server")
+
+# Worker processes are spawned rather than forked: `main` starts logging and I/O threads on import, which don't
+# survive a fork. The supervisor itself never imports it.
+_context = multiprocessing.get_context("spawn")
+
+
+async def serve(
+    host: str, port: int, drain_timeout: float, mirror: bool, prefetch: PrefetchSchedule | None, ready
+) -> None:
+    from aiohttp import web
+
+    import main
+    from exchange.prefetch import PrefetchScheduler
+
+    draining = False
+    scheduler: PrefetchScheduler | None = None
+
+    async def alert(request: web.Request) -> web.Response:
+        response, status = await main.handle_alert(await request.read(), "server")
+        return web.json_response(response, status=status)
+
+    async def batch(request: web.Request) -> web.Response:
+        # The batch flow is synchronous, run it off the event loop so single alerts aren't held up
+        response, status = await asyncio.to_thread(main.handle_batch, await request.read(), "server_batch")
+        return web.json_response(response, status=status)
+
+    async def ack(request: web.Request) -> web.Response:
+        # Journaling waits on an fsync, keep it off the event loop
+        body = await request.read()
+        response, status = await asyncio.to_thread(main.handle_ack, body, "server_ack")
+        return web.json_response(response, status=status)
+
+    async def flatten(request: web.Request) -> web.Response:
+        body = await request.read()
+        authorization = request.headers.get("Authorization")
+        response, status = await asyncio.to_thread(main.handle_flatten, body, authorization, "server_flatten")
+        return web.json_response(response, status=status)
+
+    async def metrics(_request: web.Request) -> web.Response:
+        return web.json_response(main.export_metrics())
+
+    async def health(_request: web.Request) -> web.Response:
+        # Load balancers stop routing to a draining worker
+        return web.json_response({"draining": draining}, status=503 if draining else 200)
+
+    async def warm(_app: web.Application):
+        try:
+            client = await main.async_registry.get(main.SECRET_FILE, main.INSTANCE_URL)
+            await asyncio.to_thread(client.client.metadata.universe)
+            if mirror:
+                client.client.start_mirror()
+        except Exception as e:
+            logger.warning(f"Failed to warm exchange client, it will be created on first request: {e}")
+
+    async def start_prefetch(_app: web.Application):
+        nonlocal scheduler
+        loop = asyncio.get_running_loop()
+
+        async def run():
+            client = await main.async_registry.get(main.SECRET_FILE, main.INSTANCE_URL)
+            await asyncio.to_thread(client.client.prefetch, prefetch.max_age)
+            # Alerts are served from this loop's connection pool, not the synchronous client's
+            await client.warm()
+
+        scheduler = PrefetchScheduler(lambda: asyncio.run_coroutine_threadsafe(run(), loop).result(), prefetch).start()
+
+    async def close_clients(_app: web.Application):
+        if scheduler is not None:
+            await asyncio.to_thread(scheduler.stop)
+        # Alerts still pending stay journaled and are replayed by the next worker to start
+        await asyncio.to_thread(main.stop_pipeline, drain_timeout)
+        await main.async_registry.close()
+
+    app = web.Application()
+    app.add_routes(
+        [
+            web.post("/", alert),
+            web.post("/batch", batch),
+            web.post("/flatten", flatten),
+            web.post("/ack", ack),
+            web.get("/metrics", metrics),
+            web.get("/healthz", health),
+        ]
+    )
+    app.on_startup.append(warm)
+    if prefetch is not None:
+        app.on_startup.append(start_prefetch)
+    app.on_cleanup.append(close_clients)
+
+    runner = web.AppRunner(app, shutdown_timeout=drain_timeout, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port, reuse_port=True, backlog=1024).start()
+    logger.info("Worker ready", extra={"pid": os.getpid(), "port": port})
+    ready.set()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+    await stop.wait()
+
+    # Closes the listening socket first, then waits for in-flight requests before running cleanup
+    draining = True
+    logger.info("Worker draining", extra={"pid": os.getpid()})
+    await runner.cleanup()
+
+
+def worker(host: str, port: int, drain_timeout: float, mirror: bool, prefetch: PrefetchSchedule | None, ready):
+    asyncio.run(serve(host, port, drain_timeout, mirror, prefetch, ready))
+
+
+class Supervisor:
+    """
+    Keeps `workers` processes serving, restarting any that exit unexpectedly.
+
+    Args:
+        workers (int): Number of worker processes.
+        host (str): Interface to listen on.
+        port (int): Port shared by every worker.
+        drain_timeout (float): Seconds workers wait for in-flight requests when stopping.
+        mirror (bool): Keep account state in memory from the websocket in each worker, see `AccountMirror`.
+        prefetch (PrefetchSchedule | None): Refresh state in each worker ahead of bar boundaries.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        host: str,
+        port: int,
+        drain_timeout: float,
+        mirror: bool = False,
+        prefetch: PrefetchSchedule | None = None,
+    ):
+        self.workers = workers
+        self.args = (host, port, drain_timeout, mirror, prefetch)
+        self.drain_timeout = drain_timeout
+        self.processes: list[multiprocessing.Process] = []
+        self._stopping = False
+        self._reloading = False
+
+    def spawn(self) -> tuple[multiprocessing.Process, object]:
+        ready = _context.Event()
+        process = _context.Process(target=worker, args=(*self.args, ready), daemon=False)
+        process.start()
+        return process, ready
+
+    def start_workers(self, count: int) -> list[multiprocessing.Process]:
+        started = [self.spawn() for _ in range(count)]
+        # Warming includes fetching exchange metadata, allow for a slow exchange
+        deadline = time.monotonic() + 60
+        for process, ready in started:
+            while not ready.wait(timeout=0.1):
+                if not process.is_alive() or time.monotonic() > deadline:
+                    logger.warning("Worker didn't become ready", extra={"pid": process.pid})
+                    break
+
+        return [process for process, _ in started]
+
+    def stop_workers(self, processes: list[multiprocessing.Process]):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+        deadline = time.monotonic() + self.drain_timeout + 5
+        for process in processes:
+            process.join(timeout=max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning("Worker didn't drain in time, killing it", extra={"pid": process.pid})
+                process.kill()
+                process.join()
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGHUP, self._reload)
+
+        self.processes = self.start_workers(self.workers)
+        logger.info("Server started", extra={"workers": self.workers, "port": self.args[1]})
+        while not self._stopping:
+            if self._reloading:
+                self._reloading = False
+                previous = self.processes
+                # Both generations share the port, so there's no gap in accepting connections
+                self.processes = self.start_workers(self.workers)
+                self.stop_workers(previous)
+                logger.info("Workers restarted")
+
+            for i, process in enumerate(self.processes):
+                if not process.is_alive() and not self._stopping:
+                    logger.warning("Worker exited, restarting", extra={"pid": process.pid, "code": process.exitcode})
+                    self.processes[i] = self.start_workers(1)[0]
+
+            time.sleep(0.2)
+
+        self.stop_workers(self.processes)
+        logger.info("Server stopped")
+        return 0
+
+    def _stop(self, *_args):
+        self._stopping = True
+
+    def _reload(self, *_args):
+        self._reloading = True
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8080)))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--drain-timeout", type=float, default=30.0)
+    parser.add_argument("--mirror", action="store_true", help="Mirror account state from the websocket per worker")
+    parser.add_argument(
+        "--bar-interval", type=float, default=0, help="Strategies' bar length in seconds, enables prefetching"
+    )
+    parser.add_argument("--bar-offset", type=float, default=0, help="Seconds bar boundaries are offset from UTC")
+    parser.add_argument("--prefetch-lead", type=float, default=3.0, help="Seconds before each bar boundary to prefetch")
+    parser.add_argument("--prefetch-max-age", type=float, default=10.0, help="Seconds prefetched state serves alerts")
+    args = parser.parse_args(argv)
+
+    prefetch = None
+    if args.bar_interval > 0:
+        prefetch = PrefetchSchedule(args.bar_interval, args.prefetch_lead, args.prefetch_max_age, args.bar_offset)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    if args.workers == 1 or os.environ.get("HYPERLIQUID_TICKER_LOCKS"):
+        return Supervisor(args.workers, args.host, args.port, args.drain_timeout, args.mirror, prefetch).run()
+
+    with tempfile.TemporaryDirectory(prefix="connector-locks-") as locks:
+        # Inherited by the workers, which are spawned with the supervisor's environment
+        os.environ["HYPERLIQUID_TICKER_LOCKS"] = locks
+        return Supervisor(args.workers, args.host, args.port, args.drain_timeout, args.mirror, prefetch).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
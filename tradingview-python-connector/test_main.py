@@ -0,0 +1,153 @@
+import json
+
+import pytest
+
+import main
+from exchange.snapshot import AccountSnapshot
+from metrics.latency import LatencyRecorder, StageTimer
+from order.order import Order
+from order.position import Position
+
+
+class FakeExchange:
+    """
+    Records batch calls, orders fill straight away unless their ticker is in `rejected`.
+    """
+
+    def __init__(self, positions: dict[str, float] | None = None, open_orders: list[dict] | None = None):
+        self.positions = dict(positions or {})
+        self.open_orders = list(open_orders or [])
+        self.rejected: set[str] = set()
+        self.calls: list[tuple] = []
+
+    def account_snapshot(self, open_orders: bool = True, assets: list[str] | None = None) -> AccountSnapshot:
+        self.calls.append(("snapshot", sorted(assets or [])))
+        return AccountSnapshot(positions=dict(self.positions), open_orders=list(self.open_orders))
+
+    def cancel_orders(self, cancels: list[dict]) -> dict[int, str]:
+        self.calls.append(("cancel", sorted(cancel["oid"] for cancel in cancels)))
+        return {cancel["oid"]: "success" for cancel in cancels}
+
+    def place_orders(self, orders: list[tuple[Order, bool]]) -> list[dict]:
+        self.calls.append(("place", [(order.ticker, order.contracts, reduce_only) for order, reduce_only in orders]))
+        statuses = []
+        for order, _ in orders:
+            if order.ticker in self.rejected:
+                statuses.append({"error": "Insufficient margin to place order."})
+                continue
+            self.positions[order.ticker] = self.positions.get(order.ticker, 0.0) + (
+                order.contracts if order.is_buy() else -order.contracts
+            )
+            statuses.append({"filled": {"totalSz": str(order.contracts)}})
+
+        return statuses
+
+
+def alert(id: str, ticker: str, position: Position, previous_position: Position, contracts: float = 1.0) -> dict:
+    return {
+        "id": id,
+        "action": "buy" if position == Position.LONG or previous_position == Position.SHORT else "sell",
+        "contracts": contracts,
+        "ticker": f"{ticker}USD",
+        "position": position.value,
+        "previous_position": previous_position.value,
+        "position_size": 0.0 if position == Position.FLAT else contracts,
+        "price": 100.0,
+    }
+
+
+def run_batch(exchange: FakeExchange, alerts: list[dict]) -> tuple[dict, int]:
+    orders = [Order(**item) for item in alerts]
+    return main.run_batch(exchange, orders, StageTimer(LatencyRecorder(), "test"))
+
+
+def test_batch_sequences_each_ticker_across_waves():
+    exchange = FakeExchange(positions={"SOL": 1.0}, open_orders=[{"coin": "SOL", "oid": 7}, {"coin": "BTC", "oid": 8}])
+
+    response, status = run_batch(
+        exchange,
+        [
+            alert("1", "SOL", Position.FLAT, Position.LONG),
+            alert("2", "BTC", Position.LONG, Position.FLAT),
+            alert("3", "SOL", Position.SHORT, Position.FLAT, contracts=2.0),
+        ],
+    )
+
+    assert status == 200
+    # One order per ticker per wave, SOL's open waits for its close
+    assert exchange.calls == [
+        ("snapshot", ["BTC", "SOL"]),
+        ("cancel", [7]),
+        ("place", [("SOL", 1.0, True), ("BTC", 1.0, False)]),
+        ("cancel", []),
+        ("place", [("SOL", 2.0, False)]),
+    ]
+    assert exchange.positions == {"SOL": -2.0, "BTC": 1.0}
+    assert [result["id"] for result in response["results"]] == ["1", "2", "3"]
+
+
+def test_batch_reverses_against_state_left_by_earlier_waves():
+    exchange = FakeExchange(positions={"SOL": -1.0})
+
+    response, _ = run_batch(
+        exchange,
+        [
+            alert("1", "SOL", Position.FLAT, Position.SHORT),
+            alert("2", "SOL", Position.LONG, Position.SHORT),
+            alert("3", "SOL", Position.FLAT, Position.LONG),
+        ],
+    )
+
+    # The reversal sees the flat position left by the close, so isn't doubled, and the last close has a long to close
+    assert [call for call in exchange.calls if call[0] == "place"] == [
+        ("place", [("SOL", 1.0, True)]),
+        ("place", [("SOL", 1.0, False)]),
+        ("place", [("SOL", 1.0, True)]),
+    ]
+    assert [call[0] for call in exchange.calls].count("snapshot") == 3
+    assert all("filled" in result["status"] for result in response["results"])
+
+
+def test_batch_reports_partial_failures_and_skips():
+    exchange = FakeExchange()
+    exchange.rejected.add("BTC")
+
+    response, status = run_batch(
+        exchange,
+        [
+            alert("1", "BTC", Position.LONG, Position.FLAT),
+            # Nothing open to close
+            alert("2", "ETH", Position.FLAT, Position.LONG),
+            alert("3", "SOL", Position.LONG, Position.FLAT),
+        ],
+    )
+
+    assert status == 200
+    assert response == {
+        "success": True,
+        # In the order received, whether placed or skipped
+        "results": [
+            {"id": "1", "ticker": "BTC", "status": {"error": "Insufficient margin to place order."}},
+            {"id": "2", "ticker": "ETH", "status": "skipped"},
+            {"id": "3", "ticker": "SOL", "status": {"filled": {"totalSz": "1.0"}}},
+        ],
+    }
+    assert exchange.positions == {"SOL": 1.0}
+
+
+def test_handle_batch_response(monkeypatch: pytest.MonkeyPatch):
+    exchange = FakeExchange()
+    monkeypatch.setattr(main.registry, "get", lambda *args: exchange)
+
+    body = json.dumps([alert("batch-1", "SOL", Position.LONG, Position.FLAT)]).encode()
+    assert main.handle_batch(body, "test") == (
+        {"success": True, "results": [{"id": "batch-1", "ticker": "SOL", "status": {"filled": {"totalSz": "1.0"}}}]},
+        200,
+    )
+    # A retried delivery is answered without placing the orders again
+    assert main.handle_batch(body, "test")[0]["results"][0]["id"] == "batch-1"
+    assert len([call for call in exchange.calls if call[0] == "place"]) == 1
+
+    response, status = main.handle_batch(b'[{"id": "1"}]', "test")
+    assert status == 400
+    assert response["success"] is False